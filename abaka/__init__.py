@@ -1,6 +1,37 @@
-from .engine import GameEngine
-from .models import Category, Die, roll_dice
-from .scoring import score_category
-from .player import PlayerState
+from __future__ import annotations
 
-__all__ = ["GameEngine", "Category", "Die", "roll_dice", "score_category", "PlayerState"]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public API is resolved on first attribute access (PEP 562) so that
+# `import abaka` stays cheap for CLI startup and pool workers.
+_LAZY = {
+    "GameEngine": ".engine",
+    "Category": ".models",
+    "Die": ".models",
+    "Roll": ".models",
+    "roll_dice": ".models",
+    "score_category": ".scoring",
+    "PlayerState": ".player",
+}
+
+__all__ = ["GameEngine", "Category", "Die", "Roll", "roll_dice", "score_category", "PlayerState"]
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
+    from .models import Category, Die, Roll, roll_dice
+    from .player import PlayerState
+    from .scoring import score_category
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
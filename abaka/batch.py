@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from typing import Iterable, Iterator, List, Optional
+
+from .cli import _parse_category
+from .engine import GameEngine
+from .models import RandomDice, Roll
+from .results import ResultsStore
+from .rules import RuleSet
+
+# Move script, one command per line (or several separated by ';'), '#' comments:
+#   game A,B            start a new game (the previous one is reported)
+#   seed 42             reseed the random dice of the current game
+#   roll 3 1 3 j2 5     start the turn with fixed dice ('j' marks the joker)
+#   r 024               reroll dice 0, 2 and 4 (random faces)
+#   r 024 = 6 6 1       reroll them to fixed faces (die 0 -> 6, die 2 -> 6, die 4 -> 1)
+#   s sum | x d         score / cross (aliases as in the interactive CLI)
+#   end                 finish the game early
+# A turn starts with random dice when the first r/s/x of the turn comes
+# without a preceding roll.
+
+_FACE = re.compile(r"(j)?\(?([1-6])\)?", re.IGNORECASE)
+
+
+class ScriptError(ValueError):
+    pass
+
+
+def parse_faces(raw: str) -> Roll:
+    """'3 1 3 j2 5' or '313J(2)5' -> dice; exactly one die must be marked as the joker."""
+    found = _FACE.findall(raw)
+    jokers = [i for i, (j, _) in enumerate(found) if j]
+    if len(found) != 5 or len(jokers) != 1:
+        raise ScriptError(f"expected 5 faces with one joker, got {raw!r}")
+    return Roll.of([int(v) for _, v in found], jokers[0])
+
+
+def _digits(raw: str, lo: int, hi: int, what: str) -> List[int]:
+    """Single digits in written order; blanks and commas separate them."""
+    out = []
+    for ch in raw:
+        if ch.isspace() or ch == ",":
+            continue
+        if not ch.isdigit() or not lo <= int(ch) <= hi:
+            raise ScriptError(f"bad {what} {ch!r} in {raw.strip()!r}")
+        out.append(int(ch))
+    return out
+
+
+def parse_reroll(arg: str, n: int = 5):
+    """'40 = 6 1' -> ([4, 0], [6, 1]): die 4 shows 6, die 0 shows 1; no faces -> None."""
+    mask, _, faces = arg.partition("=")
+    idxs = _digits(mask, 0, n - 1, "die index")
+    if not idxs:
+        raise ScriptError(f"no dice to reroll in {arg!r}")
+    if len(set(idxs)) != len(idxs):
+        raise ScriptError(f"die rerolled twice in {arg!r}")
+    if not faces.strip():
+        return idxs, None
+    return idxs, _digits(faces, 1, 6, "face")
+
+
+class QueuedDice(RandomDice):
+    """Random dice unless the script queued fixed faces for the next roll/reroll."""
+
+    def __init__(self, rng: random.Random) -> None:
+        super().__init__(rng)
+        self.pending = None
+
+    def roll(self):
+        dice, self.pending = self.pending, None
+        return dice if dice is not None else super().roll()
+
+    def reroll(self, dice, indices) -> Roll:
+        faces, self.pending = self.pending, None
+        if faces is None:
+            return super().reroll(dice, indices)
+        if len(faces) != len(indices):
+            raise ScriptError(f"{len(indices)} dice rerolled but {len(faces)} faces given")
+        return dice.replace(indices, faces)
+
+
+class _Game:
+    __slots__ = ("index", "engine", "dice", "in_turn", "moves", "error")
+
+    def __init__(self, index: int, players: List[str], seed: int, rules=None) -> None:
+        self.index = index
+        self.dice = QueuedDice(random.Random(seed))
+        self.engine = GameEngine(players, dice_source=self.dice, rules=rules)
+        self.in_turn = False
+        self.moves = 0
+        self.error: Optional[dict] = None
+
+    def result(self) -> dict:
+        g = self.engine
+        scores = [p.calculate_score() for p in g.players]
+        over = g.is_game_over()
+        out = {
+            "game": self.index,
+            "players": [p.name for p in g.players],
+            "scores": scores,
+            "complete": over,
+            "winner": g.players[scores.index(max(scores))].name if over else None,
+            "moves": self.moves,
+        }
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+def run_script(lines: Iterable[str], players: Optional[List[str]] = None, seed: int = 0,
+               board=None, rules=None, results=None) -> Iterator[dict]:
+    """
+    Play the games of a move script and yield one result dict per game. An
+    invalid command aborts its game (reported with "error") and the script
+    continues with the next `game`. `board` is a scoreboard view from
+    abaka.tui updated after every move (None: no rendering). `rules` is an
+    abaka.rules.RuleSet used by every game (None: the standard rules).
+    Finished games are also recorded in `results` (abaka.results.ResultsStore).
+    """
+    players = players or ["P1", "P2"]
+    game: Optional[_Game] = None
+    count = 0
+
+    def new_game(names: List[str]) -> _Game:
+        nonlocal count
+        count += 1
+        return _Game(count, names, seed + count, rules)
+
+    def report(game: _Game) -> dict:
+        if results is not None and game.engine.is_game_over():
+            results.record(game.engine, source="script")
+        return game.result()
+
+    for lineno, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0]
+        for cmd in line.split(";"):
+            parts = cmd.split(None, 1)
+            if not parts:
+                continue
+            op = parts[0].lower()
+            arg = parts[1].strip() if len(parts) > 1 else ""
+
+            if op == "game":
+                if game is not None:
+                    yield report(game)
+                names = [n.strip() for n in arg.split(",") if n.strip()]
+                game = new_game(names or players)
+                continue
+            if game is None:
+                game = new_game(players)
+            if game.error is not None:
+                continue  # skip the rest of an aborted game
+            if op == "end":
+                yield report(game)
+                game = None
+                continue
+            try:
+                _step(game, op, arg, board)
+            except (ScriptError, ValueError, IndexError, RuntimeError, KeyError) as e:
+                game.error = {"line": lineno, "command": cmd.strip(), "message": str(e)}
+
+    if game is not None:
+        yield report(game)
+
+
+def _begin_turn(game: _Game, dice: Optional[Roll]) -> None:
+    # the game can only end between turns, so this is the one place to check
+    if game.engine.is_game_over():
+        raise ScriptError("game is already over")
+    game.dice.pending = dice
+    game.engine.start_turn()
+    game.in_turn = True
+
+
+def _step(game: _Game, op: str, arg: str, board) -> None:
+    g = game.engine
+    if op == "seed":
+        game.dice.rng = random.Random(int(arg))
+        return
+    if op == "roll":
+        if game.in_turn:
+            raise ScriptError("roll inside a turn; use 'r' to reroll")
+        _begin_turn(game, parse_faces(arg) if arg else None)
+        return
+    if not game.in_turn:
+        _begin_turn(game, None)
+    if op in ("r", "reroll"):
+        idxs, game.dice.pending = parse_reroll(arg, n=len(g.dice))
+        try:
+            g.reroll(idxs)
+        finally:
+            game.dice.pending = None
+        return
+    if op in ("s", "score", "x", "cross"):
+        player = g.players[g.current]
+        cat = _parse_category(arg)
+        slot = g.leftmost_slot(player, cat)
+        if op[0] == "s":
+            g.record_score(cat, slot)
+        else:
+            g.record_cross(cat, slot)
+        game.in_turn = False
+        game.moves += 1
+        if board is not None:
+            board.update(g, (cat,))
+        return
+    raise ScriptError(f"unknown command {op!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m abaka play",
+                                 description="Play games from a move script without prompts.")
+    ap.add_argument("script", nargs="?", default="-", help="script file ('-' for stdin)")
+    ap.add_argument("--players", default="P1,P2", help="default player names (comma-separated)")
+    ap.add_argument("--seed", type=int, default=0, help="seed for dice not fixed by the script")
+    ap.add_argument("--rules", metavar="PATH", help="rule variant file (.toml or .json), see abaka.rules")
+    ap.add_argument("--format", choices=("jsonl", "text"), default="jsonl")
+    ap.add_argument("--board", action="store_true", help="print the scoreboard to stderr after every move")
+    ap.add_argument("--tui", action="store_true", help="redraw the scoreboard in place on stderr (ANSI terminal)")
+    ap.add_argument("--results", metavar="PATH", default=os.environ.get("ABAKA_RESULTS"),
+                    help="record finished games in this results database (default: $ABAKA_RESULTS)")
+    args = ap.parse_args(argv)
+
+    players = [n.strip() for n in args.players.split(",") if n.strip()]
+    rules = RuleSet.load(args.rules) if args.rules else None
+    src = sys.stdin if args.script == "-" else open(args.script, encoding="utf-8")
+    failed = 0
+    results = ResultsStore(args.results) if args.results else None
+    try:
+        board = None
+        if args.tui or args.board:
+            from .tui import LineScoreboard, TerminalScoreboard
+            board = TerminalScoreboard(sys.stderr) if args.tui else LineScoreboard(sys.stderr)
+        for res in run_script(src, players, args.seed, board, rules, results):
+            failed += "error" in res
+            if args.format == "jsonl":
+                sys.stdout.write(json.dumps(res, ensure_ascii=False, separators=(",", ":")) + "\n")
+            else:
+                scores = ", ".join(f"{n}: {s}" for n, s in zip(res["players"], res["scores"]))
+                status = f"error at line {res['error']['line']}: {res['error']['message']}" \
+                    if "error" in res else ("winner " + res["winner"] if res["complete"] else "unfinished")
+                print(f"game {res['game']}: {scores} ({status})")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if results is not None:
+            results.close()
+    return 1 if failed else 0
@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from .bonus import after_record
+from .engine import GameEngine
+from .models import Category, RandomDice, Roll, roll_dice
+from .probability import state_index
+from .render import render_scoreboard
+from .scoring import score_category
+from .sim import greedy_policy, legal_moves, play_game, play_turn
+
+# Each case factory gets a seeded RNG and returns a zero-argument callable
+# performing one operation. Factories raise ImportError to be skipped.
+CaseFactory = Callable[[random.Random], Callable[[], None]]
+CASES: Dict[str, CaseFactory] = {}
+
+SEED = 12345
+
+
+def case(name: str):
+    def deco(fn: CaseFactory) -> CaseFactory:
+        CASES[name] = fn
+        return fn
+    return deco
+
+
+def _midgame(rng: random.Random, n_players: int = 2) -> GameEngine:
+    """A half-played game (reproducible: run() seeds the global dice RNG)."""
+    g = GameEngine([f"P{i + 1}" for i in range(n_players)])
+    for _ in range(20 * n_players):
+        play_turn(g, greedy_policy, rng)
+    g.start_turn()
+    return g
+
+
+@case("score_category")
+def _score_category(rng: random.Random):
+    rolls = [roll_dice() for _ in range(256)]
+    cats = list(Category)
+    it = [0]
+
+    def op() -> None:
+        i = it[0] = (it[0] + 1) & 255
+        score_category(rolls[i], cats[i % len(cats)], first_roll=bool(i & 1))
+    return op
+
+
+@case("score_category_variant")
+def _score_category_variant(rng: random.Random):
+    # a house-rule variant must score as fast as the standard rules
+    from .rules import RuleSet
+    rules = RuleSet(name="bench", kare_bonus=30, joker_wild=6, first_roll_multiplier=3)
+    rolls = [roll_dice() for _ in range(256)]
+    cats = list(Category)
+    it = [0]
+
+    def op() -> None:
+        i = it[0] = (it[0] + 1) & 255
+        score_category(rolls[i], cats[i % len(cats)], first_roll=bool(i & 1), rules=rules)
+    return op
+
+
+@case("roll_reroll")
+def _roll_reroll(rng: random.Random):
+    # one turn of dice: roll, two rerolls and the canonical state lookup
+    src = RandomDice(rng)
+    keeps = [(0, 2), (1, 3, 4), (4,), (0, 1, 2, 3)]
+    it = [0]
+
+    def op() -> None:
+        i = it[0] = (it[0] + 1) & 3
+        dice = src.roll()
+        dice = src.reroll(dice, keeps[i])
+        dice = src.reroll(dice, keeps[3 - i])
+        state_index(dice)
+    return op
+
+
+@case("roll_reroll_monitored")
+def _roll_reroll_monitored(rng: random.Random):
+    from .fairness import DiceMonitor
+    # roll_reroll through an engine's dice source watched by a DiceMonitor
+    g = GameEngine(["A", "B"], dice_source=RandomDice(rng))
+    DiceMonitor().attach(g)
+    src = g.dice_source
+    keeps = [(0, 2), (1, 3, 4), (4,), (0, 1, 2, 3)]
+    it = [0]
+
+    def op() -> None:
+        i = it[0] = (it[0] + 1) & 3
+        dice = g._dice = src.roll()
+        dice = g._dice = src.reroll(dice, keeps[i])
+        dice = g._dice = src.reroll(dice, keeps[3 - i])
+        state_index(dice)
+    return op
+
+
+@case("record_score")
+def _record_score(rng: random.Random):
+    g = GameEngine(["A", "B"])
+    dice = roll_dice()
+    p = g.players[0]
+
+    def op() -> None:
+        g.dice = dice
+        g.current = 0
+        g.record_score(Category.SUM, 0)
+        p.table[Category.SUM][0] = None
+    return op
+
+
+@case("record_school")
+def _record_school(rng: random.Random):
+    g = GameEngine(["A", "B"])
+    dice = Roll.of((4, 4, 4, 4, 2), joker=4)
+    p = g.players[0]
+
+    def op() -> None:
+        g.dice = dice
+        g.current = 0
+        g.record_score(Category.SCHOOL_4, 0)
+        p.table[Category.SCHOOL_4][0] = None
+        p.school_balance = 0
+        p.school_balance_loc = None
+    return op
+
+
+@case("after_record")
+def _after_record(rng: random.Random):
+    g = _midgame(rng)
+    g.current = 0
+    cats = list(Category)
+    it = [0]
+
+    def op() -> None:
+        i = it[0] = (it[0] + 1) % len(cats)
+        after_record(g, cats[i], i % 3)
+    return op
+
+
+@case("calculate_score")
+def _calculate_score(rng: random.Random):
+    p = _midgame(rng).players[0]
+    return p.calculate_score
+
+
+@case("render_scoreboard")
+def _render_scoreboard(rng: random.Random):
+    g = _midgame(rng)
+    return lambda: render_scoreboard(g)
+
+
+@case("ui_scoreboard_html")
+def _ui_scoreboard_html(rng: random.Random):
+    from ui_components.scoreboard import _build_scoreboard_html  # needs streamlit
+    g = _midgame(rng)
+    return lambda: _build_scoreboard_html(g)
+
+
+def _startup(code: str):
+    # whole-process cost, as paid by short CLI runs and freshly spawned pool workers
+    cmd = [sys.executable, "-c", code]
+    return lambda: subprocess.run(cmd, check=True)
+
+
+@case("startup_import")
+def _startup_import(rng: random.Random):
+    return _startup("import abaka")
+
+
+@case("startup_engine")
+def _startup_engine(rng: random.Random):
+    return _startup("from abaka import GameEngine; GameEngine(['A', 'B']).start_turn()")
+
+
+@case("snapshot_dumps")
+def _snapshot_dumps(rng: random.Random):
+    return _midgame(rng, 4).to_bytes
+
+
+@case("snapshot_loads")
+def _snapshot_loads(rng: random.Random):
+    blob = _midgame(rng, 4).to_bytes()
+    return lambda: GameEngine.from_bytes(blob)
+
+
+@case("decision_cache_hit")
+def _decision_cache_hit(rng: random.Random):
+    from .bots.cache import CachedPolicy, DecisionCache
+    # a cached bot decision: canonical key, LRU hit and decoding for the dice
+    g = _midgame(rng)
+    bot = CachedPolicy(greedy_policy, DecisionCache())
+    bot(g, rng)
+    return lambda: bot(g, rng)
+
+
+@case("endgame_solve")
+def _endgame_solve(rng: random.Random):
+    from .endgame import EndgameSolver
+    # exact search of a two-player finish: one Kare cell left each
+    g = GameEngine(["A", "B"])
+    for p in g.players:
+        for cat, slots in p.table.items():
+            slots[:3] = [10, 10, None] if cat is Category.KARE else ["X", "X", "X"]
+    return lambda: EndgameSolver().value(g)
+
+
+@case("vecenv_step")
+def _vecenv_step(rng: random.Random):
+    from .vecenv import N_ACTIONS, VectorEnv
+    # one lockstep step of 8 in-process games (random legal actions, greedy opponent)
+    env = VectorEnv(8, workers=0, seed=SEED)
+    env.reset()
+    masks = env.masks
+
+    def op() -> None:
+        env.step([rng.choice([a for a in range(N_ACTIONS) if masks[i, a]]) for i in range(8)])
+    return op
+
+
+@case("router_turns")
+def _router_turns(rng: random.Random):
+    from .server import TableRouter
+    # one greedy turn at each of 32 tables routed over 4 in-process shards
+    router = TableRouter(workers=4, seed=SEED, in_process=True)
+    ids = [f"t{i}" for i in range(32)]
+    router.run([(t, "create", (["A", "B"], None)) for t in ids])
+
+    def op() -> None:
+        over = [t for t, done in zip(ids, router.run([(t, "turn", ("greedy",)) for t in ids])) if done]
+        if over:
+            router.run([(t, "drop", ()) for t in over] + [(t, "create", (["A", "B"], None)) for t in over])
+    return op
+
+
+@case("results_record")
+def _results_record(rng: random.Random):
+    import os
+    import tempfile
+    from .results import ResultsStore
+    # one finished 2-player game into a temporary results database, batched by 256
+    g = play_game(["A", "B"], [greedy_policy, greedy_policy], rng)
+    store = ResultsStore(os.path.join(tempfile.mkdtemp(), "results.sqlite3"), batch_size=256)
+
+    def op() -> None:
+        for p in g.players:
+            p.name = f"P{rng.randrange(1000)}"
+        store.record(g)
+    return op
+
+
+@case("results_leaderboard")
+def _results_leaderboard(rng: random.Random):
+    import os
+    import tempfile
+    from .results import ResultsStore
+    # top 10 by average score among 1000 players (aggregate table, no scan of the games)
+    g = play_game(["A", "B"], [greedy_policy, greedy_policy], rng)
+    store = ResultsStore(os.path.join(tempfile.mkdtemp(), "results.sqlite3"), batch_size=1024)
+    for _ in range(5000):
+        for p in g.players:
+            p.name = f"P{rng.randrange(1000)}"
+        store.record(g)
+    store.flush()
+    return lambda: store.leaderboard(by="avg_score", limit=10, min_games=3)
+
+
+@case("full_game")
+def _full_game(rng: random.Random):
+    policies = [greedy_policy, greedy_policy]
+
+    def op() -> None:
+        play_game(["A", "B"], policies, rng)
+    return op
+
+
+def _table_move(n_players: int):
+    def factory(rng: random.Random):
+        # one greedy turn (dice, policy, write, bonuses) at an n-player table
+        names = [f"P{i + 1}" for i in range(n_players)]
+        g = [_midgame(rng, n_players)]
+
+        def op() -> None:
+            if g[0].is_game_over():
+                g[0] = GameEngine(names)
+            play_turn(g[0], greedy_policy, rng)
+        return op
+    return factory
+
+
+def _table_render(n_players: int):
+    def factory(rng: random.Random):
+        # one page of players plus the standings summary
+        g = _midgame(rng, n_players)
+        return lambda: render_scoreboard(g, count=6)
+    return factory
+
+
+for _n in (2, 10, 50):
+    case(f"table_move_{_n}")(_table_move(_n))
+    case(f"table_render_{_n}")(_table_render(_n))
+
+
+@case("script_game")
+def _script_game(rng: random.Random):
+    from .batch import run_script
+    # one full two-player game replayed from a move script with fixed dice
+    lines = []
+    g = GameEngine(["A", "B"])
+    while not g.is_game_over():
+        g.start_turn()
+        lines.append("roll " + " ".join(f"j{d.value}" if d.is_joker else str(d.value) for d in g.dice))
+        move = max(legal_moves(g), key=lambda m: m[0] == "score")
+        lines.append(("s " if move[0] == "score" else "x ") + move[1].name.lower())
+        (g.record_score if move[0] == "score" else g.record_cross)(move[1], move[2])
+
+    def op() -> None:
+        for _ in run_script(lines):
+            pass
+    return op
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+def measure(op: Callable[[], None], min_time: float = 0.5, warmup: float = 0.1,
+            samples: int = 50) -> Dict[str, float]:
+    """
+    Time `op` in batches sized so that each batch takes about min_time/samples.
+    Per-op latency percentiles are taken over batch means (timer overhead
+    would otherwise dominate sub-microsecond operations).
+    """
+    end = time.perf_counter() + warmup
+    calls = 0
+    while time.perf_counter() < end or calls == 0:
+        op()
+        calls += 1
+    per_call = warmup / calls
+    batch = max(1, int(min_time / samples / max(per_call, 1e-9)))
+
+    lat: List[float] = []
+    total_ops = 0
+    total_time = 0.0
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        for _ in range(batch):
+            op()
+        dt = time.perf_counter() - t0
+        lat.append(dt / batch)
+        total_ops += batch
+        total_time += dt
+    lat.sort()
+    return {
+        "ops_per_sec": total_ops / total_time if total_time else 0.0,
+        "p50_us": _percentile(lat, 0.50) * 1e6,
+        "p90_us": _percentile(lat, 0.90) * 1e6,
+        "p99_us": _percentile(lat, 0.99) * 1e6,
+        "ops": total_ops,
+    }
+
+
+def run(names: Optional[List[str]] = None, min_time: float = 0.5, warmup: float = 0.1,
+        seed: int = SEED) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, factory in CASES.items():
+        if names and name not in names:
+            continue
+        state = random.getstate()
+        random.seed(seed)  # engine dice use the global RNG
+        try:
+            op = factory(random.Random(seed))
+            results[name] = measure(op, min_time=min_time, warmup=warmup)
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}
+        finally:
+            random.setstate(state)
+    return results
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Names of cases whose throughput fell more than `threshold` below baseline."""
+    regressions = []
+    for name, res in current.items():
+        base = baseline.get(name)
+        if not base or "ops_per_sec" not in base or "ops_per_sec" not in res:
+            continue
+        if res["ops_per_sec"] < base["ops_per_sec"] * (1.0 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def _format(results: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None) -> List[str]:
+    lines = [f"{'case':<20} {'ops/sec':>12} {'p50 µs':>10} {'p90 µs':>10} {'p99 µs':>10} {'vs base':>8}"]
+    for name, r in results.items():
+        if "skipped" in r:
+            lines.append(f"{name:<20} skipped ({r['skipped']})")
+            continue
+        rel = ""
+        if baseline and name in baseline and baseline[name].get("ops_per_sec"):
+            rel = f"{r['ops_per_sec'] / baseline[name]['ops_per_sec']:>7.2f}x"
+        lines.append(f"{name:<20} {r['ops_per_sec']:>12,.0f} {r['p50_us']:>10.2f} "
+                     f"{r['p90_us']:>10.2f} {r['p99_us']:>10.2f} {rel:>8}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m abaka bench",
+                                 description="Benchmark Abaka engine hot paths.")
+    ap.add_argument("cases", nargs="*", help=f"subset of: {', '.join(CASES)}")
+    ap.add_argument("--time", type=float, default=0.5, help="seconds measured per case")
+    ap.add_argument("--warmup", type=float, default=0.1, help="warmup seconds per case")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="PATH", help="fail if slower than this baseline")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed throughput drop vs baseline (fraction, default 0.25)")
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(unknown)}")
+
+    results = run(args.cases or None, min_time=args.time, warmup=args.warmup, seed=args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for line in _format(results, baseline):
+            print(line)
+
+    if args.save:
+        doc = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"REGRESSION (> {args.threshold:.0%} slower): {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+    return 0
@@ -1,7 +1,7 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Tuple
 from .models import Category
-from .constants import SCHOOL_CATS, COMBO_CATS
+from .constants import CATS, SCHOOL_CATS, COMBO_CATS, DENOM, IS_SCHOOL
 
 def after_record(engine, category: Category, slot_index: int) -> None:
     _check_row_bonus(engine, engine.current, category)
@@ -19,8 +19,8 @@ def _check_row_bonus(engine, player_idx: int, category: Category) -> None:
 
     engine.row_bonus_claimed[category] = True
 
-    if category.name.startswith("SCHOOL_"):
-        num = int(category.name.split('_')[1])
+    num = DENOM[category.index]
+    if num:
         # minus in school cancels the school *row* bonus only
         val = 'X' if engine.school_minus_used.get((player_idx, category), False) else num * 3
         if p.table[category][3] is None:
@@ -35,10 +35,8 @@ def _check_row_bonus(engine, player_idx: int, category: Category) -> None:
             val = max(nums) if nums else 'X'
         p.table[category][3] = val
 
-    # Others in this row get X
-    for i, other in enumerate(engine.players):
-        if i != player_idx and other.table[category][3] is None:
-            other.table[category][3] = 'X'
+    # Others in this row are locked out through the claim registry
+    # (engine.row_bonus_claimed); see row_cells() for how their cell reads.
 
 # ---------- COLUMN BONUS (fixed per your new rules) ----------
 def _check_col_bonus(engine, player_idx: int, col: int) -> None:
@@ -58,7 +56,7 @@ def _check_col_bonus(engine, player_idx: int, col: int) -> None:
     p = engine.players[player_idx]
 
     # Gather column values for this player
-    col_vals_all = {cat: p.table[cat][col] for cat in Category}
+    col_vals_all = {cat: p.table[cat][col] for cat in CATS}
     col_complete = all(v is not None for v in col_vals_all.values())
     if not col_complete:
         return
@@ -78,10 +76,56 @@ def _check_col_bonus(engine, player_idx: int, col: int) -> None:
     if engine.col_bonus_claimed[col]:
         return  # someone already claimed; others should have X set when it was claimed
 
-    # First claimant
+    # First claimant; the registry locks everyone else out (see column_bonus_cells)
     engine.col_bonus_claimed[col] = True
     p.column_bonus[col] = val
-    # Lock out others
-    for i, other in enumerate(engine.players):
-        if i != player_idx and other.column_bonus[col] is None:
-            other.column_bonus[col] = 'X'
+
+
+# ---------- CLAIM REGISTRY VIEWS ----------
+# A claim is recorded once in engine.row_bonus_claimed / col_bonus_claimed
+# instead of writing 'X' into every other player's sheet, so a claim costs
+# the same at 2 or 50 players. Anything that *shows* a sheet reads through
+# these helpers: an empty bonus cell of a claimed row/column reads as 'X'.
+
+def row_cells(engine, player_idx: int, category: Category) -> list:
+    """The row's 3 cells + bonus cell as displayed."""
+    slots = engine.players[player_idx].table[category]
+    if slots[3] is None and engine.row_bonus_claimed.get(category):
+        return [slots[0], slots[1], slots[2], 'X']
+    return slots
+
+
+def column_bonus_cells(engine, player_idx: int) -> list:
+    """The 3 column bonus cells as displayed."""
+    vals = engine.players[player_idx].column_bonus
+    claimed = engine.col_bonus_claimed
+    if (vals[0] is None and claimed[0]) or (vals[1] is None and claimed[1]):
+        return ['X' if v is None and claimed[c] else v for c, v in enumerate(vals)]
+    return vals
+
+
+def open_bonuses(engine, player_idx: int) -> Tuple[List[bool], List[bool]]:
+    """
+    Bonuses the player can still earn: per row (Category.index order) and per
+    column. A row is lost to a claim, a cross (combo rows) or a school minus;
+    a column to a claim (columns 0 and 1) or a cross in the bottom half.
+    """
+    p = engine.players[player_idx]
+    table = p.table
+    claimed = engine.row_bonus_claimed
+    rows = []
+    for cat in CATS:
+        slots = table[cat]
+        if slots[3] is not None or claimed[cat]:
+            rows.append(False)
+        elif IS_SCHOOL[cat.index]:
+            rows.append(not engine.school_minus_used.get((player_idx, cat)))
+        else:
+            rows.append(not engine.row_bonus_blocked.get((player_idx, cat)) and 'X' not in slots[:3])
+    cols = []
+    for c in range(3):
+        if p.column_bonus[c] is not None or (c < 2 and engine.col_bonus_claimed[c]):
+            cols.append(False)
+        else:
+            cols.append(all(table[cat][c] != 'X' for cat in COMBO_CATS))
+    return rows, cols
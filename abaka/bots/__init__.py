@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, List
+
+from ..sim import Policy, greedy_policy, random_policy
+
+# Name -> factory returning a fresh policy. Tournament workers look policies up
+# by name so nothing but strings crosses process boundaries.
+POLICIES: Dict[str, Callable[[], Policy]] = {}
+
+
+def register_policy(name: str):
+    """Register a zero-argument policy factory under `name`."""
+    def deco(factory: Callable[[], Policy]) -> Callable[[], Policy]:
+        POLICIES[name] = factory
+        return factory
+    return deco
+
+
+def get_policy(name: str) -> Policy:
+    try:
+        factory = POLICIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown policy {name!r}; known: {', '.join(sorted(POLICIES))}") from None
+    return factory()
+
+
+def policy_names() -> List[str]:
+    return sorted(POLICIES)
+
+
+register_policy("random")(lambda: random_policy)
+register_policy("greedy")(lambda: greedy_policy)
+
+
+@register_policy("mcts")
+def _mcts():
+    from .mcts import MCTSPolicy
+    return MCTSPolicy(budget_ms=50)
+
+
+@register_policy("mcts-fast")
+def _mcts_fast():
+    from .mcts import MCTSPolicy
+    return MCTSPolicy(budget_ms=5)
+
+
+@register_policy("mcts-cached")
+def _mcts_cached():
+    # decisions persist in $ABAKA_DECISION_CACHE (shared by all workers) when set
+    from .cache import CachedPolicy, DecisionCache
+    from .mcts import MCTSPolicy
+    return CachedPolicy(MCTSPolicy(budget_ms=50), DecisionCache(os.environ.get("ABAKA_DECISION_CACHE")))
+
+
+@register_policy("endgame")
+def _endgame():
+    # greedy, then exact once one cell is left each; solved positions persist in $ABAKA_TABLEBASE
+    from ..endgame import EndgameSolver, Tablebase
+    from .endgame import EndgamePolicy
+    path = os.environ.get("ABAKA_TABLEBASE")
+    return EndgamePolicy(greedy_policy, EndgameSolver(tablebase=Tablebase(path) if path else None))
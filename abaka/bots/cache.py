@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..bonus import open_bonuses
+from ..constants import CATS
+from ..probability import KEPT, KEPT_INDEX
+from ..rules import DEFAULT_RULES
+from ..models import Roll
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer per file
+    fcntl = None
+
+# Decisions are keyed by a 64-bit digest of everything a turn decision can
+# depend on, for the player to move:
+#
+#   rules    : 8-byte tag of the rule set (0 = standard rules)
+#   rows     : one byte per Category.index: filled cells (0..3) | bonus still open << 2
+#   columns  : bits 0..2, column bonus still open
+#   balance  : school balance (i32)
+#   turn     : dice state (abaka.probability index, u16), rolls left, first roll
+#
+# Names, written values and other players' sheets do not enter the key.
+_KEY = struct.Struct(f"<8s{len(CATS)}sBiHbB")
+
+# Actions fit in a u16: kind << 14 | argument
+#   score / cross : Category.index << 2 | slot
+#   reroll        : KEPT_INDEX of the kept normal faces << 1 | keep joker
+SCORE, CROSS, REROLL = 1, 2, 3
+_KINDS = {"score": SCORE, "cross": CROSS, "reroll": REROLL}
+
+_RULE_TAGS: Dict[object, bytes] = {DEFAULT_RULES: bytes(8)}
+
+
+def _rule_tag(rules) -> bytes:
+    tag = _RULE_TAGS.get(rules)
+    if tag is None:
+        raw = json.dumps({k: v for k, v in rules.to_dict().items() if k != "name"},
+                         sort_keys=True).encode("utf-8")
+        tag = _RULE_TAGS[rules] = hashlib.blake2b(raw, digest_size=8).digest()
+    return tag
+
+
+def decision_key(engine) -> int:
+    """Canonical 64-bit key of the current player's decision (never 0)."""
+    p = engine.players[engine.current]
+    row_open, col_open = open_bonuses(engine, engine.current)
+    rows = bytes(3 - slots[:3].count(None) | o << 2
+                 for slots, o in zip(map(p.table.__getitem__, CATS), row_open))
+    cols = col_open[0] | col_open[1] << 1 | col_open[2] << 2
+
+    raw = _KEY.pack(_rule_tag(engine.rules), rows, cols, p.school_balance,
+                    _state(engine.dice), engine.rolls_left, 1 if engine.first_roll else 0)
+    key = int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+    return key or 1
+
+
+def _state(dice) -> int:
+    packed = dice if type(dice) is Roll else Roll.pack(dice) if dice else None
+    if packed is None or packed.state < 0:
+        raise ValueError("decisions are keyed by a 4 + joker roll")
+    return packed.state
+
+
+def encode_action(action: tuple, dice) -> int:
+    """u16 form of a policy action; rerolls are stored as what is kept, not positions."""
+    kind = _KINDS[action[0]]
+    if kind == REROLL:
+        rerolled = set(action[1])
+        kept = tuple(sorted(d.value for i, d in enumerate(dice) if i not in rerolled and not d.is_joker))
+        keep_joker = any(d.is_joker for i, d in enumerate(dice) if i not in rerolled)
+        return kind << 14 | KEPT_INDEX[kept] << 1 | keep_joker
+    return kind << 14 | action[1].index << 2 | action[2]
+
+
+def decode_action(code: int, dice) -> tuple:
+    """Inverse of encode_action for the dice on the table (any order of the same state)."""
+    kind, arg = code >> 14, code & 0x3FFF
+    if kind == REROLL:
+        pool = list(KEPT[arg >> 1])
+        keep_joker = arg & 1
+        idxs = []
+        for i, d in enumerate(dice):
+            if d.is_joker:
+                if not keep_joker:
+                    idxs.append(i)
+            elif d.value in pool:
+                pool.remove(d.value)
+            else:
+                idxs.append(i)
+        return ("reroll", idxs)
+    return ("score" if kind == SCORE else "cross", CATS[arg >> 2], arg & 3)
+
+
+# On-disk table: header, then `capacity` (a power of two) slots of
+#   key u64 (0 = empty), value f32, action u16, check u16 (crc32 of the first 14 bytes)
+# probed linearly from key & (capacity - 1). Readers never lock: a slot torn by
+# a concurrent writer fails its check and reads as a miss.
+_MAGIC = b"ABDC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBxxxI")
+_SLOT = struct.Struct("<QfHH")
+_ENTRY = struct.Struct("<QfH")
+MAX_PROBE = 16
+
+
+class DiskDecisionTable:
+    """
+    Fixed-size open-addressing hash table in a memory-mapped file. Any number
+    of processes may map the same file; writes take an exclusive flock. When
+    every slot a key may use is taken, the entry is dropped: it is a cache.
+    """
+
+    def __init__(self, path: str, capacity: int = 1 << 20, readonly: bool = False) -> None:
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._file = open(path, "rb")
+        else:
+            self._file = open(path, "a+b")
+            with self._locked():
+                self._file.seek(0, os.SEEK_END)
+                if self._file.tell() == 0:
+                    self._file.write(_HEADER.pack(_MAGIC, _VERSION, capacity))
+                    self._file.truncate(_HEADER.size + capacity * _SLOT.size)
+                    self._file.flush()
+        self._file.seek(0)
+        magic, version, cap = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a decision cache")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported decision cache version {version}")
+        self.capacity = cap  # an existing file keeps its own size
+        self._mask = cap - 1
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self._map = mmap.mmap(self._file.fileno(), _HEADER.size + cap * _SLOT.size, access=access)
+
+    def _locked(self):
+        return _FileLock(self._file)
+
+    def _slots(self, key: int):
+        base = _HEADER.size
+        i = key & self._mask
+        for _ in range(min(MAX_PROBE, self.capacity)):
+            yield base + i * _SLOT.size
+            i = (i + 1) & self._mask
+
+    def get(self, key: int) -> Optional[Tuple[int, float]]:
+        m = self._map
+        for off in self._slots(key):
+            raw = m[off:off + _SLOT.size]
+            k, value, action, check = _SLOT.unpack(raw)
+            if k == 0:
+                return None
+            if k == key:
+                if zlib.crc32(raw[:_ENTRY.size]) & 0xFFFF != check:
+                    return None  # being written right now
+                return action, value
+        return None
+
+    def put(self, key: int, action: int, value: float) -> bool:
+        """Store an entry; False when the table is read-only or the probe run is full."""
+        if self.readonly:
+            return False
+        entry = _ENTRY.pack(key, value, action)
+        raw = entry + struct.pack("<H", zlib.crc32(entry) & 0xFFFF)
+        m = self._map
+        with self._locked():
+            for off in self._slots(key):
+                k = _SLOT.unpack_from(m, off)[0]
+                if k == 0 or k == key:
+                    m[off:off + _SLOT.size] = raw
+                    return True
+        return False
+
+    def __len__(self) -> int:
+        return sum(1 for i in range(self.capacity)
+                   if _SLOT.unpack_from(self._map, _HEADER.size + i * _SLOT.size)[0])
+
+    def flush(self) -> None:
+        if not self.readonly:
+            self._map.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+
+class _FileLock:
+    def __init__(self, f) -> None:
+        self._f = f
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+
+
+class DecisionCache:
+    """
+    Two-level decision cache: an in-process LRU of up to `capacity` entries
+    in front of an optional DiskDecisionTable at `path`, which persists across
+    restarts and is shared by every process that opens it. Entries are
+    (encoded action, value) by decision_key().
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1 << 16,
+                 disk_capacity: int = 1 << 20, readonly: bool = False) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.disk = DiskDecisionTable(path, disk_capacity, readonly) if path else None
+        self._hot: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[Tuple[int, float]]:
+        hit = self._hot.get(key)
+        if hit is not None:
+            self._hot.move_to_end(key)
+            self.hits += 1
+            return hit
+        if self.disk is not None:
+            hit = self.disk.get(key)
+            if hit is not None:
+                self.disk_hits += 1
+                self._insert(key, hit)
+                return hit
+        self.misses += 1
+        return None
+
+    def put(self, key: int, action: int, value: float) -> None:
+        self._insert(key, (action, value))
+        if self.disk is not None:
+            self.disk.put(key, action, value)
+
+    def _insert(self, key: int, entry: Tuple[int, float]) -> None:
+        self._hot[key] = entry
+        self._hot.move_to_end(key)
+        if len(self._hot) > self.capacity:
+            self._hot.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hot)
+
+    def flush(self) -> None:
+        if self.disk is not None:
+            self.disk.flush()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+class CachedPolicy:
+    """
+    Wraps a policy so each decision is solved once per canonical position.
+    Meant for deterministic or search policies (the cache keeps the first
+    answer); the wrapped policy's `last_value`, if it has one, is stored too.
+    """
+
+    def __init__(self, policy, cache: DecisionCache) -> None:
+        self.policy = policy
+        self.cache = cache
+        self.last_value = 0.0
+
+    def __call__(self, engine, rng=None) -> tuple:
+        key = decision_key(engine)
+        hit = self.cache.get(key)
+        if hit is not None:
+            self.last_value = hit[1]
+            return decode_action(hit[0], engine.dice)
+        action = self.policy(engine, rng)
+        self.last_value = float(getattr(self.policy, "last_value", 0.0))
+        self.cache.put(key, encode_action(action, engine.dice), self.last_value)
+        return action
+
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import random
+from typing import Optional
+
+from ..endgame import EndgameSolver
+from ..sim import Policy, greedy_policy
+
+
+class EndgamePolicy:
+    """
+    Plays `fallback` until every player has at most `solver.max_open` open
+    cells, then plays exactly: each reroll and write maximises the mover's
+    win probability (abaka.endgame).
+    """
+
+    def __init__(self, fallback: Policy = greedy_policy,
+                 solver: Optional[EndgameSolver] = None) -> None:
+        self.fallback = fallback
+        self.solver = solver if solver is not None else EndgameSolver()
+
+    def __call__(self, engine, rng: Optional[random.Random] = None) -> tuple:
+        if self.solver.in_range(engine):
+            return self.solver.best_action(engine)
+        return self.fallback(engine, rng)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+from ..constants import DENOM, IS_SCHOOL, STRICT
+from ..models import Category
+from ..probability import NORMALS_INDEX, keep_options, reroll_indices, state_index, state_of
+from ..rules import CompiledRules
+from ..school import SchoolTable, school_tables
+
+# Rough value of an average write in each combo row. A move is worth what it
+# scores above par; crossing forfeits the par value (and the row bonus).
+PAR: Dict[Category, float] = {
+    Category.PAIR: 8, Category.TWO_PAIRS: 14, Category.TRIPS: 10,
+    Category.SMALL_STRAIGHT: 12, Category.LARGE_STRAIGHT: 14,
+    Category.FULL: 18, Category.KARE: 30, Category.ABAKA: 40, Category.SUM: 20,
+}
+CROSS_PENALTY = 5.0
+# School rows must all be written eventually and a negative final balance costs
+# 100 per point, so free writes are rewarded and balance is valued above face.
+SCHOOL_EXACT = 8.0
+SCHOOL_SURPLUS_WEIGHT = 2.0
+SCHOOL_MINUS_WEIGHT = 2.0
+NEGATIVE_BALANCE_COST = 100.0  # calculate_score: -100 per negative school point
+
+_COMBO_CATS = [cat for cat in Category if not IS_SCHOOL[cat.index]]
+
+# (rule tables, sorted normal faces, joker face) -> {category: base+bonus, not doubled}
+_SCORE_CACHE: Dict[tuple, Dict[Category, int]] = {}
+
+State = Tuple[Tuple[int, ...], int]   # (sorted non-joker faces, joker face)
+Keep = Tuple[Tuple[int, ...], bool]   # (kept non-joker faces, keep joker)
+
+
+def _scores(state: State, c: CompiledRules) -> Dict[Category, int]:
+    key = (id(c), state)
+    sc = _SCORE_CACHE.get(key)
+    if sc is None:
+        normals, joker = state
+        s = NORMALS_INDEX[normals] * 6 + joker - 1
+        sc = {cat: c.table[cat][s] for cat in _COMBO_CATS}
+        _SCORE_CACHE[key] = sc
+    return sc
+
+
+def _state_of(dice) -> State:
+    return state_of(state_index(dice))
+
+
+class _Node:
+    __slots__ = ("state", "rolls", "first", "visits", "stop_value", "stop_move", "keeps")
+
+    def __init__(self, state: State, rolls: int, first: bool) -> None:
+        self.state = state
+        self.rolls = rolls
+        self.first = first
+        self.visits = 0
+        self.stop_value: float = -math.inf
+        self.stop_move: Optional[tuple] = None
+        # keep -> [visits, total value, {outcome state: child node}]
+        self.keeps: Dict[Keep, list] = {}
+
+
+class MCTSPolicy:
+    """
+    Anytime Monte-Carlo tree search over the current turn.
+
+    Decision nodes are canonical dice states (sorted normal faces + joker face)
+    with the rerolls left; actions are "stop" (best legal write, valued exactly)
+    or a keep-set whose reroll outcome is sampled (determinized) per iteration.
+    The tree is kept between calls and re-rooted after the engine rerolls, so
+    search effort carries over within the turn. The policy returns its best
+    action when `budget_ms` runs out.
+    """
+
+    def __init__(self, budget_ms: float = 50.0, exploration: float = 15.0,
+                 seed: Optional[int] = None) -> None:
+        self.budget = budget_ms / 1000.0
+        self.c = exploration
+        self.rng = random.Random(seed)
+        self.last_iterations = 0
+        self.last_reused_visits = 0
+        self.last_value = 0.0
+        self._root: Optional[_Node] = None
+        self._pending: Optional[Tuple[int, _Node, Keep]] = None
+        self._ctx: Optional[tuple] = None
+
+    # ----- policy protocol -----
+    def __call__(self, engine, rng: Optional[random.Random] = None) -> tuple:
+        root = self._reroot(engine)
+        deadline = time.perf_counter() + self.budget
+        iters = 0
+        while True:
+            self._simulate(root)
+            iters += 1
+            if (iters & 15) == 0 and time.perf_counter() >= deadline:
+                break
+            if root.rolls == 0:
+                break  # nothing uncertain left: stop value is exact
+        self.last_iterations = iters
+
+        keep, mean = self._best_keep(root)
+        if keep is not None and mean > root.stop_value:
+            self._pending = (engine.current, root, keep)
+            self.last_value = mean
+            return ("reroll", reroll_indices(engine.dice, keep))
+        self._pending = None
+        self.last_value = root.stop_value
+        return root.stop_move
+
+    # ----- tree -----
+    def _reroot(self, engine) -> _Node:
+        state = _state_of(engine.dice)
+        p = engine.players[engine.current]
+        self._ctx = self._context(p, engine.rules.compiled)
+        if self._pending is not None:
+            player, parent, keep = self._pending
+            self._pending = None
+            entry = parent.keeps.get(keep)
+            child = entry[2].get(state) if entry else None
+            if (player == engine.current and child is not None
+                    and child.rolls == engine.rolls_left and child.first == engine.first_roll):
+                self.last_reused_visits = child.visits
+                self._root = child
+                return child
+        self.last_reused_visits = 0
+        self._root = _Node(state, engine.rolls_left, engine.first_roll)
+        return self._root
+
+    def _context(self, p, c: CompiledRules) -> tuple:
+        open_rows = []
+        for cat, slots in p.table.items():
+            for s in range(3):
+                if slots[s] is None:
+                    open_rows.append((cat, s))
+                    break
+        return open_rows, p.school_balance, p.non_school_complete(), c, school_tables(c.rules)
+
+    def _expand(self, node: _Node) -> None:
+        open_rows, balance, endgame, c, school = self._ctx
+        sc = _scores(node.state, c)
+        mult = c.multiplier if node.first else 1
+        normals, joker = node.state
+        s_index = NORMALS_INDEX[normals] * 6 + joker - 1
+        best_v, best_m = -math.inf, None
+        for cat, slot in open_rows:
+            denom = DENOM[cat.index]
+            if denom:
+                v = self._school_value(school[denom], s_index, balance, endgame)
+                if v is not None and v > best_v:
+                    best_v, best_m = v, ("score", cat, slot)
+                continue
+            s = sc[cat] * mult
+            if s > 0 or not STRICT[cat.index]:
+                v = s - PAR[cat]
+                if v > best_v:
+                    best_v, best_m = v, ("score", cat, slot)
+            v = -PAR[cat] - CROSS_PENALTY
+            if v > best_v:
+                best_v, best_m = v, ("cross", cat, slot)
+        node.stop_value, node.stop_move = best_v, best_m
+        if node.rolls > 0:
+            for keep in keep_options(s_index):
+                node.keeps[keep] = [0, 0.0, {}]
+
+    @staticmethod
+    def _school_value(table: SchoolTable, s: int, balance, endgame) -> Optional[float]:
+        if table.exact[s]:
+            return SCHOOL_EXACT
+        if not table.minus[s]:
+            return SCHOOL_EXACT + SCHOOL_SURPLUS_WEIGHT * table.delta[s]
+        if table.empty[s] and not endgame:
+            return None
+        required = table.required[s]
+        if balance >= required:
+            return -SCHOOL_MINUS_WEIGHT * required
+        if endgame:
+            return float(-required - NEGATIVE_BALANCE_COST * (required - max(balance, 0)))
+        return None
+
+    def _simulate(self, node: _Node) -> float:
+        if node.visits == 0:
+            self._expand(node)
+        node.visits += 1
+        if not node.keeps:
+            return node.stop_value
+
+        # UCB1 over keep-sets; "stop" competes with its exact value
+        best_keep, best_ucb = None, node.stop_value
+        log_n = math.log(node.visits)
+        for keep, entry in node.keeps.items():
+            n = entry[0]
+            if n == 0:
+                best_keep = keep
+                break
+            ucb = entry[1] / n + self.c * math.sqrt(log_n / n)
+            if ucb > best_ucb:
+                best_keep, best_ucb = keep, ucb
+        if best_keep is None:
+            return node.stop_value
+
+        entry = node.keeps[best_keep]
+        outcome = self._sample(node.state, best_keep)
+        child = entry[2].get(outcome)
+        if child is None:
+            child = entry[2][outcome] = _Node(outcome, node.rolls - 1, False)
+        value = self._simulate(child)
+        entry[0] += 1
+        entry[1] += value
+        return value
+
+    def _sample(self, state: State, keep: Keep) -> State:
+        normals, joker = state
+        kept, keep_joker = keep
+        r = self.rng.randint
+        new = kept + tuple(r(1, 6) for _ in range(len(normals) - len(kept)))
+        return tuple(sorted(new)), (joker if keep_joker else r(1, 6))
+
+    def _best_keep(self, node: _Node) -> Tuple[Optional[Keep], float]:
+        best, best_mean = None, -math.inf
+        for keep, (n, total, _) in node.keeps.items():
+            if n >= 8 and total / n > best_mean:
+                best, best_mean = keep, total / n
+        return best, best_mean
+
@@ -1,7 +1,12 @@
-from .engine import GameEngine
+from __future__ import annotations
+
 from .models import Category
 import re
-from typing import List  # <-- add this
+import sys
+from typing import List, TYPE_CHECKING  # <-- add this
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
 
 def _parse_indices(raw: str, n: int) -> List[int]:  # <-- List[int], not list[int]
     # accept digits anywhere; e.g. "012", "0 1,2", "0;1:2"
@@ -9,19 +14,21 @@ def _parse_indices(raw: str, n: int) -> List[int]:  # <-- List[int], not list[in
     idxs = [i for i in idxs if 0 <= i < n]
     return idxs
 
+_CATEGORY_ALIASES = {
+    'd': Category.PAIR, 'pair': Category.PAIR,
+    'dd': Category.TWO_PAIRS, 'two_pairs': Category.TWO_PAIRS, '2pair': Category.TWO_PAIRS,
+    't': Category.TRIPS, 'trips': Category.TRIPS,
+    'ls': Category.SMALL_STRAIGHT, 'small': Category.SMALL_STRAIGHT,
+    'bs': Category.LARGE_STRAIGHT, 'large': Category.LARGE_STRAIGHT,
+    'f': Category.FULL, 'full': Category.FULL,
+    'c': Category.KARE, 'kare': Category.KARE,
+    'a': Category.ABAKA, 'abaka': Category.ABAKA,
+    'sum': Category.SUM, 'σ': Category.SUM, 'sigma': Category.SUM,
+}
+
 def _parse_category(s: str) -> Category:
     s = s.strip().lower()
-    aliases = {
-        'd': Category.PAIR, 'pair': Category.PAIR,
-        'dd': Category.TWO_PAIRS, 'two_pairs': Category.TWO_PAIRS, '2pair': Category.TWO_PAIRS,
-        't': Category.TRIPS, 'trips': Category.TRIPS,
-        'ls': Category.SMALL_STRAIGHT, 'small': Category.SMALL_STRAIGHT,
-        'bs': Category.LARGE_STRAIGHT, 'large': Category.LARGE_STRAIGHT,
-        'f': Category.FULL, 'full': Category.FULL,
-        'c': Category.KARE, 'kare': Category.KARE,
-        'a': Category.ABAKA, 'abaka': Category.ABAKA,
-        'sum': Category.SUM, 'σ': Category.SUM, 'sigma': Category.SUM,
-    }
+    aliases = _CATEGORY_ALIASES
     if s in aliases: return aliases[s]
     if s.startswith('school') or s.startswith('школа'):
         num = ''.join(ch for ch in s if ch.isdigit())
@@ -32,7 +39,21 @@ def _parse_category(s: str) -> Category:
 def _available_rows(engine: GameEngine, player):
     return [cat for cat, slots in player.table.items() if any(v is None for v in slots[:3])]
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "bench":
+        from .bench import main as bench_main
+        return bench_main(argv[1:])
+    if argv and argv[0] == "tournament":
+        from .tournament import main as tournament_main
+        return tournament_main(argv[1:])
+    if argv and argv[0] == "play":
+        from .batch import main as batch_main
+        return batch_main(argv[1:])
+    return play_interactive()
+
+def play_interactive():
+    from .engine import GameEngine
     names = input("Enter player names (comma-separated): ").strip()
     players = [n.strip() for n in names.split(',') if n.strip()] or ["Player1", "Player2"]
     g = GameEngine(players)
@@ -91,3 +112,8 @@ def main():
     for name, sc in scores.items():
         print(f"{name}: {sc}")
     print("Winner:", max(scores.items(), key=lambda kv: kv[1])[0])
+    from .results import open_default
+    results = open_default()
+    if results is not None:
+        with results:
+            results.record(g, source="cli")
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List
+from typing import Dict, List
 from .models import Category
 
 ROW_W = 6
@@ -15,3 +15,38 @@ COMBO_CATS: List[Category] = [
     Category.SMALL_STRAIGHT, Category.LARGE_STRAIGHT,
     Category.FULL, Category.KARE, Category.ABAKA, Category.SUM,
 ]
+
+# Per-category metadata as dense arrays indexed by `cat.index` (definition
+# order), so dispatch is a list lookup rather than parsing `cat.name`.
+CATS: List[Category] = list(Category)
+N_CATS = len(CATS)
+
+# combo rows where writing a zero is rejected (the combination must be met)
+NON_SCHOOL_STRICT = {
+    Category.PAIR, Category.TWO_PAIRS, Category.TRIPS,
+    Category.SMALL_STRAIGHT, Category.LARGE_STRAIGHT,
+    Category.FULL, Category.KARE, Category.ABAKA,
+}
+
+# face of a school row, 0 for combo rows
+DENOM: List[int] = [SCHOOL_CATS.index(c) + 1 if c in SCHOOL_CATS else 0 for c in CATS]
+IS_SCHOOL: List[bool] = [d > 0 for d in DENOM]
+STRICT: List[bool] = [c in NON_SCHOOL_STRICT for c in CATS]
+SCHOOL_INDEX: List[int] = [c.index for c in SCHOOL_CATS]
+COMBO_INDEX: List[int] = [c.index for c in COMBO_CATS]
+# school row of each face (SCHOOL_BY_DENOM[0] unused)
+SCHOOL_BY_DENOM: List[Category] = [Category.SCHOOL_1] + SCHOOL_CATS
+
+_COMBO_LABELS: Dict[Category, str] = {
+    Category.PAIR: "D",
+    Category.TWO_PAIRS: "DD",
+    Category.TRIPS: "T",
+    Category.SMALL_STRAIGHT: "LS",
+    Category.LARGE_STRAIGHT: "BS",
+    Category.FULL: "F",
+    Category.KARE: "C",
+    Category.ABAKA: "A",
+    Category.SUM: "Σ",
+}
+# scoreboard row label: the face for school rows
+LABELS: List[str] = [str(d) if d else _COMBO_LABELS[c] for c, d in zip(CATS, DENOM)]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .engine import GameEngine
+from .models import Roll
+
+# One turn of a dice script: initial faces, joker position, and for each of the
+# two rerolls the face every die position would get if it were rerolled.
+Turn = Tuple[Tuple[int, ...], int, Tuple[Tuple[int, ...], ...]]
+
+TURNS_PER_PLAYER = 45  # 15 rows × 3 slots; every turn fills exactly one cell
+
+
+def generate_script(turns: int, rng: random.Random) -> List[Turn]:
+    """A reproducible dice script long enough for `turns` turns."""
+    script: List[Turn] = []
+    for _ in range(turns):
+        faces = tuple(rng.randint(1, 6) for _ in range(5))
+        joker = rng.randrange(5)
+        rerolls = tuple(tuple(rng.randint(1, 6) for _ in range(5)) for _ in range(2))
+        script.append((faces, joker, rerolls))
+    return script
+
+
+class ScriptedDice:
+    """
+    Dice source that replays a script instead of drawing from `random`.
+
+    Turn t always starts with the same faces, and the k-th reroll of die
+    position i always yields rerolls[k][i], whatever else was kept. Every
+    strategy replayed on a script therefore faces exactly the same luck.
+    """
+
+    packed = True
+
+    def __init__(self, script: Sequence[Turn]) -> None:
+        self.script = script
+        self.turn = -1
+        self._rerolls_used = 0
+
+    def roll(self) -> Roll:
+        self.turn += 1
+        if self.turn >= len(self.script):
+            raise RuntimeError("Dice script exhausted")
+        faces, joker, _ = self.script[self.turn]
+        self._rerolls_used = 0
+        return Roll.of(faces, joker)
+
+    def reroll(self, dice: Roll, indices) -> Roll:
+        faces = self.script[self.turn][2][self._rerolls_used]
+        self._rerolls_used += 1
+        return dice.replace(indices, [faces[i] for i in indices])
+
+
+def play_scripted(policy_names: Sequence[str], script: Sequence[Turn], seed: int) -> List[int]:
+    """
+    Play one game on a dice script. Each seat's policy gets its own RNG seeded
+    from (seed, seat), so opponents behave identically across replays too.
+    """
+    from .bots import get_policy
+    from .sim import play_turn
+
+    policies = [get_policy(n) for n in policy_names]
+    rngs = [random.Random(seed * 1009 + s) for s in range(len(policies))]
+    g = GameEngine([f"S{i}" for i in range(len(policies))], dice_source=ScriptedDice(script))
+    while not g.is_game_over():
+        seat = g.current
+        play_turn(g, policies[seat], rngs[seat])
+    return [p.calculate_score() for p in g.players]
+
+
+def paired_stats(xs: Sequence[float], ys: Sequence[float]) -> Dict[str, float]:
+    """
+    Mean of x - y with its standard error when paired by deal, next to the
+    standard error an unpaired comparison of the same samples would have.
+    """
+    n = len(xs)
+    diffs = [x - y for x, y in zip(xs, ys)]
+    mean = sum(diffs) / n if n else 0.0
+
+    def var(v: Sequence[float]) -> float:
+        if len(v) < 2:
+            return 0.0
+        m = sum(v) / len(v)
+        return sum((a - m) ** 2 for a in v) / (len(v) - 1)
+
+    paired_se = math.sqrt(var(diffs) / n) if n else 0.0
+    unpaired_se = math.sqrt((var(xs) + var(ys)) / n) if n else 0.0
+    return {
+        "n": n,
+        "mean_diff": mean,
+        "paired_se": paired_se,
+        "unpaired_se": unpaired_se,
+        # games an unpaired test would need for the same precision, per paired game
+        "variance_reduction": (unpaired_se / paired_se) ** 2 if paired_se else float("inf"),
+    }
+
+
+def evaluate(policies: Sequence[str], deals: int, opponents: Sequence[str] = ("greedy",),
+             seed: int = 0) -> Dict[str, List[int]]:
+    """
+    Each candidate plays seat 0 against the same opponents on the same deals.
+    Returns the candidate's score per deal; compare with paired_stats().
+    """
+    n_seats = 1 + len(opponents)
+    rng = random.Random(seed)
+    scores: Dict[str, List[int]] = {p: [] for p in policies}
+    for d in range(deals):
+        script = generate_script(TURNS_PER_PLAYER * n_seats, rng)
+        for p in policies:
+            scores[p].append(play_scripted([p, *opponents], script, seed + d)[0])
+    return scores
+
+
+def duplicate_match(a: str, b: str, deals: int, seed: int = 0,
+                    scripts: Optional[List[List[Turn]]] = None) -> Dict[str, float]:
+    """
+    Heads-up duplicate: every deal is played twice with seats swapped, so A and
+    B each receive both seats' dice. Reports A's mean margin over B per deal.
+    """
+    rng = random.Random(seed)
+    a_scores: List[float] = []
+    b_scores: List[float] = []
+    for d in range(deals):
+        script = scripts[d] if scripts else generate_script(TURNS_PER_PLAYER * 2, rng)
+        s1 = play_scripted([a, b], script, seed + d)
+        s2 = play_scripted([b, a], script, seed + d)
+        # same seat, same dice: compare A's seat-0 game with B's seat-0 game and so on
+        a_scores.append((s1[0] + s2[1]) / 2)
+        b_scores.append((s2[0] + s1[1]) / 2)
+    return paired_stats(a_scores, b_scores)
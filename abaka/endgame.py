@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from . import probability as P
+from . import snapshot
+from .constants import DENOM, STRICT
+from .school import school_tables
+
+# Exact endgame solver.
+#
+# Once every player has at most `max_open` cells left, the rest of the game
+# is searched exhaustively: each turn is a chance node over the roll (756
+# canonical dice states), two reroll layers where the mover keeps whatever
+# maximises its own win probability (probability.solve_vector), and a write
+# into one of its open rows. Children are real GameEngine positions, so
+# first-come column bonuses, row bonus lockouts and the -100 per negative
+# school point all come from the engine itself. Values are win shares per
+# player (ties split), memoized per turn-start position and optionally kept
+# in an on-disk Tablebase.
+
+Vector = List[float]
+
+
+def open_cells(engine) -> List[int]:
+    """Unwritten cells (of the first three per row) for every player."""
+    return [sum(slots[:3].count(None) for slots in p.table.values()) for p in engine.players]
+
+
+def win_shares(engine) -> Vector:
+    scores = [p.calculate_score() for p in engine.players]
+    best = max(scores)
+    share = 1.0 / scores.count(best)
+    return [share if s == best else 0.0 for s in scores]
+
+
+def position_key(engine) -> int:
+    """Signed 64-bit key of a canonical turn-start position (see _canonical)."""
+    return int.from_bytes(hashlib.blake2b(snapshot.dumps(engine), digest_size=8).digest(),
+                          "little", signed=True)
+
+
+def _skip_finished(g) -> None:
+    while g.players[g.current].is_complete():
+        g.next_player()
+
+
+def _canonical(engine):
+    """Private copy with the mover about to roll; names do not affect values."""
+    g = snapshot.loads(snapshot.dumps(engine))
+    for p in g.players:
+        p.name = ""
+    _skip_finished(g)
+    g.dice = []
+    g.rolls_left = 0
+    g.first_roll = True
+    return g
+
+
+class Tablebase:
+    """Solved turn-start positions: position_key -> win shares (f64 each), in SQLite."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            " key INTEGER PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> Optional[Vector]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM positions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        raw = bytes(row[0])
+        return list(struct.unpack(f"<{len(raw) // 8}d", raw))
+
+    def put_many(self, values: Dict[int, Vector]) -> None:
+        rows = [(k, struct.pack(f"<{len(v)}d", *v)) for k, v in values.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO positions (key, value) VALUES (?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# one solved turn: stop vectors/moves per state (first roll, later rolls) and the reroll layers
+_Turn = Tuple[List[Vector], List[Vector], List[tuple], List[tuple], List[List[Vector]]]
+
+
+class EndgameSolver:
+    """
+    Expectiminimax over dice chance nodes for positions where every player
+    has at most `max_open` open cells. The tree grows with the number of
+    distinct scores each write can take, so keep max_open small (1-2) and
+    let a Tablebase carry solved positions across runs.
+    """
+
+    def __init__(self, max_open: int = 1, tablebase: Optional[Tablebase] = None,
+                 turns: int = 64) -> None:
+        self.max_open = max_open
+        self.tablebase = tablebase
+        self.nodes = 0  # turn-start positions actually searched
+        self._memo: Dict[int, Vector] = {}
+        self._new: Dict[int, Vector] = {}
+        # full per-state tables of the last `turns` positions asked for a move
+        self._turns: "OrderedDict[int, _Turn]" = OrderedDict()
+        self._turns_capacity = turns
+
+    def in_range(self, engine) -> bool:
+        return not engine.is_game_over() and max(open_cells(engine)) <= self.max_open
+
+    def _check(self, engine) -> None:
+        if not self.in_range(engine):
+            raise ValueError(f"Not an endgame position: open cells {open_cells(engine)}, "
+                             f"solver handles up to {self.max_open}")
+
+    # ----- public queries -----
+    def value(self, engine) -> Vector:
+        """Exact win shares with the current player about to roll."""
+        self._check(engine)
+        v = self._value(_canonical(engine))
+        self._commit()
+        return v
+
+    def value_now(self, engine) -> Vector:
+        """Exact win shares with the dice on the table and engine.rolls_left."""
+        layers = self._turn_of(engine)[4]
+        return list(layers[engine.rolls_left][P.state_index(engine.dice)])
+
+    def best_action(self, engine) -> tuple:
+        """The move (or reroll) maximising the current player's win probability."""
+        stops_f, stops_nf, moves_f, moves_nf, layers = self._turn_of(engine)
+        s = P.state_index(engine.dice)
+        r = engine.rolls_left
+        m = engine.current
+        if engine.first_roll:
+            stop, move = stops_f[s], moves_f[s]
+        else:
+            stop, move = stops_nf[s], moves_nf[s]
+        if r > 0:
+            nxt = [v[m] for v in layers[r - 1]]
+            keep, ev = max(((k, P.keep_value(s, k, nxt)) for k in P.keep_options(s)),
+                           key=lambda kv: kv[1])
+            if ev > stop[m]:
+                return ("reroll", P.reroll_indices(engine.dice, keep))
+        return move
+
+    # ----- search -----
+    def _turn_of(self, engine) -> _Turn:
+        self._check(engine)
+        if engine.players[engine.current].is_complete():
+            raise ValueError("The current player has no open cell")
+        g = _canonical(engine)
+        key = position_key(g)
+        turn = self._turns.get(key)
+        if turn is None:
+            turn = self._turns[key] = self._turn(g)
+            self._commit()
+            if len(self._turns) > self._turns_capacity:
+                self._turns.popitem(last=False)
+        else:
+            self._turns.move_to_end(key)
+        return turn
+
+    def _commit(self) -> None:
+        if self.tablebase is not None and self._new:
+            self.tablebase.put_many(self._new)
+        self._new.clear()
+
+    def _value(self, g) -> Vector:
+        key = position_key(g)
+        v = self._memo.get(key)
+        if v is None and self.tablebase is not None:
+            v = self.tablebase.get(key)
+        if v is None:
+            layers = self._turn(g)[4]
+            top = layers[2]
+            v = [min(1.0, sum(pr * vec[i] for pr, vec in zip(P.ROLL_PROB, top)))
+                 for i in range(len(g.players))]
+            self._new[key] = v
+        self._memo[key] = v
+        return v
+
+    def _child(self, base: bytes, move: tuple, dice, first: bool) -> Vector:
+        g = snapshot.loads(base)
+        g.dice = dice
+        g.rolls_left = 0
+        g.first_roll = first
+        if move[0] == "score":
+            g.record_score(move[1], move[2])
+        else:
+            g.record_cross(move[1], move[2])
+        if g.is_game_over():
+            return win_shares(g)
+        _skip_finished(g)
+        g.dice = []
+        g.first_roll = True
+        return self._value(g)
+
+    def _turn(self, g) -> _Turn:
+        self.nodes += 1
+        m = g.current
+        p = g.players[m]
+        c = g.rules.compiled
+        schools = school_tables(g.rules)
+        endgame = p.non_school_complete()
+        base = snapshot.dumps(g)
+        n = P.N_STATES
+        # candidate (vector, move) per state, for a first-roll write and a later one
+        cand_f: List[list] = [[] for _ in range(n)]
+        cand_nf: List[list] = [[] for _ in range(n)]
+
+        for cat, slots in p.table.items():
+            try:
+                slot = slots.index(None, 0, 3)
+            except ValueError:
+                continue
+            move = ("score", cat, slot)
+            face = DENOM[cat.index]
+            if face:
+                # the outcome only depends on k; school writes are never doubled
+                table = schools[face]
+                groups: Dict[int, List[int]] = {}
+                for s in range(n):
+                    if table.is_legal(s, p.school_balance, endgame):
+                        groups.setdefault(table.k[s], []).append(s)
+                for states in groups.values():
+                    v = self._child(base, move, P.state_dice(states[0]), False)
+                    for s in states:
+                        cand_f[s].append((v, move))
+                        cand_nf[s].append((v, move))
+                continue
+            col = c.table[cat]
+            by_score: Dict[int, Vector] = {}
+            for first, cand in ((True, cand_f), (False, cand_nf)):
+                mult = c.multiplier if first else 1
+                for s in range(n):
+                    if col[s] <= 0 and STRICT[cat.index]:
+                        continue
+                    score = col[s] * mult
+                    v = by_score.get(score)
+                    if v is None:
+                        v = by_score[score] = self._child(base, move, P.state_dice(s), first)
+                    cand[s].append((v, move))
+            cross = ("cross", cat, slot)
+            v = self._child(base, cross, P.state_dice(0), False)
+            for s in range(n):
+                cand_f[s].append((v, cross))
+                cand_nf[s].append((v, cross))
+
+        stops_f, moves_f = _pick(cand_f, m)
+        stops_nf, moves_nf = _pick(cand_nf, m)
+        layers = P.solve_vector([stops_nf, stops_nf, stops_f], m)
+        return stops_f, stops_nf, moves_f, moves_nf, layers
+
+
+def _pick(cands: List[list], m: int) -> Tuple[List[Vector], List[tuple]]:
+    stops, moves = [], []
+    for options in cands:
+        v, move = max(options, key=lambda vm: vm[0][m])
+        stops.append(v)
+        moves.append(move)
+    return stops, moves
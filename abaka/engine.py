@@ -1,49 +1,61 @@
 from __future__ import annotations
 
-import random
-from typing import Dict, List
+from typing import Dict, List, Optional
 from collections import Counter  # <-- for helpful mismatch messages
 
-from .models import Category, roll_dice
+from .models import Category, Die, RandomDice, Roll
+from .rules import DEFAULT_RULES
 from .scoring import score_category
 from .player import PlayerState
-# from .constants import ROW_W, COL_W, SCHOOL_CATS, COMBO_CATS
+from .constants import CATS, IS_SCHOOL, NON_SCHOOL_STRICT
 from .render import render_scoreboard, label_for
 from .school import record_school
 from .bonus import after_record as _after_record_bonus
-
-
-# Categories where writing a zero should be rejected (must meet the combo)
-NON_SCHOOL_STRICT = {
-    Category.PAIR, Category.TWO_PAIRS, Category.TRIPS,
-    Category.SMALL_STRAIGHT, Category.LARGE_STRAIGHT,
-    Category.FULL, Category.KARE, Category.ABAKA,
-}
+from .view import GameView
+from . import snapshot
 
 
 class GameEngine:
     """Turn flow + thin facades to school/bonus/rendering."""
 
-    def __init__(self, player_names: List[str]) -> None:
+    def __init__(self, player_names: List[str], dice_source=None, rules=None) -> None:
         self.players: List[PlayerState] = [PlayerState(n) for n in player_names]
+        # anything with roll() -> dice and reroll(dice, indices); see abaka.duplicate
+        self.dice_source = dice_source if dice_source is not None else RandomDice()
+        # house rules (abaka.rules.RuleSet); scoring goes through its compiled tables
+        self.rules = rules if rules is not None else DEFAULT_RULES
         self.current: int = 0
-        self.dice = []
+        self._dice = []
         self.rolls_left: int = 0
         self.first_roll: bool = True
 
-        self.row_bonus_claimed: Dict[Category, bool] = {cat: False for cat in Category}
+        self.row_bonus_claimed: Dict[Category, bool] = dict.fromkeys(CATS, False)
         self.col_bonus_claimed: List[bool] = [False, False, False]
         self.school_minus_used: Dict[tuple[int, Category], bool] = {}
         self.row_bonus_blocked: Dict[tuple[int, Category], bool] = {}
+        # latest immutable version (abaka.view), replaced after every committed change
+        self.view: GameView = GameView(self)
+
+    @property
+    def dice(self):
+        """The current roll: a packed models.Roll (reads like a list of Die), or [] before a roll."""
+        return self._dice
+
+    @dice.setter
+    def dice(self, value) -> None:
+        # Die lists (tests, tools, older dice sources) are packed when they can be
+        packed = Roll.pack(value) if value else None
+        self._dice = packed if packed is not None else list(value)
 
     # ----- turn flow -----
     def next_player(self) -> None:
         self.current = (self.current + 1) % len(self.players)
 
     def start_turn(self) -> None:
-        self.dice = roll_dice()
+        self.dice = self.dice_source.roll()
         self.rolls_left = 2
         self.first_roll = True
+        self.view = self.view.rolled(self)
 
     def reroll(self, indices: List[int]) -> None:
         if self.rolls_left <= 0:
@@ -51,10 +63,17 @@ class GameEngine:
         for i in indices:
             if i < 0 or i >= len(self.dice):
                 raise IndexError("Bad die index")
-            self.dice[i].value = random.randint(1, 6)
+        if getattr(self.dice_source, "packed", False) and isinstance(self._dice, Roll):
+            self._dice = self.dice_source.reroll(self._dice, indices)
+        else:
+            # sources that change Die objects in place get a private mutable copy
+            dice = [Die(d.value, d.is_joker) for d in self._dice]
+            self.dice_source.reroll(dice, indices)
+            self.dice = dice
         self.rolls_left -= 1
         if self.rolls_left < 2:
             self.first_roll = False
+        self.view = self.view.rolled(self)
 
     # ----- scoring -----
     def _explain_mismatch(self, category: Category) -> str:
@@ -87,10 +106,12 @@ class GameEngine:
         return f"{category.name} conditions not met for this roll."
 
     def record_score(self, category: Category, slot_index: int) -> None:
-        if category.name.startswith("SCHOOL_"):
-            record_school(self, category, slot_index)
+        mover = self.current
+        loc = self.players[mover].school_balance_loc  # a school write crosses this cell
+        if IS_SCHOOL[category.index]:
+            self._record_school(category, slot_index)
         else:
-            score = score_category(self.dice, category, first_roll=self.first_roll)
+            score = score_category(self.dice, category, first_roll=self.first_roll, rules=self.rules)
             # Disallow accidental zero on strict rows (forces player to cross instead)
             if category in NON_SCHOOL_STRICT and score == 0:
                 raise ValueError(self._explain_mismatch(category))
@@ -98,9 +119,10 @@ class GameEngine:
 
         self._after_record(category, slot_index)
         self.next_player()
+        self.view = GameView(self, self.view, mover, (category,) if loc is None else (category, loc[0]))
 
     def record_cross(self, category: Category, slot_index: int) -> None:
-        if category.name.startswith("SCHOOL_"):
+        if IS_SCHOOL[category.index]:
             raise ValueError("You can't cross out school directly. Use 'school n' scoring.")
         self.players[self.current].cross(category, slot_index)
         # cancel row & column bonus immediately for this player
@@ -109,8 +131,10 @@ class GameEngine:
             self.players[self.current].table[category][3] = 'X'
         if self.players[self.current].column_bonus[slot_index] is None:
             self.players[self.current].column_bonus[slot_index] = 'X'
+        mover = self.current
         self._after_record(category, slot_index)
         self.next_player()
+        self.view = GameView(self, self.view, mover, (category,))
 
     def is_game_over(self) -> bool:
         return all(p.is_complete() for p in self.players)
@@ -118,13 +142,32 @@ class GameEngine:
     def calculate_final_scores(self):
         return {p.name: p.calculate_score() for p in self.players}
 
+    # ----- published versions -----
+    def publish(self) -> GameView:
+        """Publish a new version after changing engine state directly (tools, tests)."""
+        self.view = GameView(self, self.view)
+        return self.view
+
+    # ----- snapshots -----
+    def to_bytes(self) -> bytes:
+        """Versioned binary snapshot of the whole game (see abaka.snapshot)."""
+        return snapshot.dumps(self)
+
+    @classmethod
+    def from_bytes(cls, buf, offset: int = 0) -> "GameEngine":
+        """Rebuild a game from to_bytes() output; `buf` may be a memoryview or mmap."""
+        return snapshot.loads(buf, offset)
+
     # ----- rendering -----
     def _category_label(self, cat: Category) -> str:
         # kept for CLI compatibility
         return label_for(cat)
 
-    def print_scoreboard(self) -> None:
-        for line in render_scoreboard(self):
+    def render(self, start: Optional[int] = None, count: Optional[int] = None) -> List[str]:
+        return render_scoreboard(self, start, count)
+
+    def print_scoreboard(self, start: Optional[int] = None, count: Optional[int] = None) -> None:
+        for line in self.render(start, count):
             print(line)
 
     # ----- utilities -----
@@ -135,6 +178,29 @@ class GameEngine:
                 return i
         raise ValueError("Row already complete")
 
-    # ----- bonuses -----
+    # ----- school / bonuses -----
+    def _record_school(self, category: Category, slot_index: int) -> None:
+        record_school(self, category, slot_index)
+
     def _after_record(self, category: Category, slot_index: int) -> None:
         _after_record_bonus(self, category, slot_index)
+
+    # ----- instrumentation (opt-in; no cost unless enabled) -----
+    def enable_instrumentation(self, instr=None):
+        from .instrument import attach
+        return attach(self, instr)
+
+    def disable_instrumentation(self) -> None:
+        from .instrument import detach
+        detach(self)
+
+    def enable_dice_monitor(self, monitor=None):
+        """Report every roll to an abaka.fairness.DiceMonitor (default: fairness.DEFAULT)."""
+        from . import fairness
+        monitor = monitor or fairness.DEFAULT
+        monitor.attach(self)
+        return monitor
+
+    def disable_dice_monitor(self) -> None:
+        from .fairness import DiceMonitor
+        DiceMonitor.detach(self)
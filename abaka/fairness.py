@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from .constants import COMBO_CATS
+from .models import Roll
+
+# Streaming dice fairness monitor.
+#
+# A DiceMonitor watches every die that engines draw through their dice
+# source (attach() wraps engine.dice_source, so start_turn, reroll and UI
+# rolls are all seen). The hot path only queues the Roll; every `window`
+# rolls the queue is folded into fixed-size counters:
+#   faces[pos][face-1]   fresh faces by die position (rolls and rerolled dice)
+#   joker_faces[face-1]  fresh faces of the joker die
+#   joker_pos[pos]       where the joker landed on a roll
+# and tested: chi-square on the last window and on the lifetime counts, and
+# a two-sided Bernoulli CUSUM per face that accumulates across windows.
+#
+# Per player (bounded LRU, `max_players`) the monitor keeps a CUSUM of the
+# standardized quality of their turn-start rolls (roll_quality(): how the best
+# combo-row score the roll offers ranks under fair dice, exact over
+# probability.ROLL_PROB). Injected good rolls drive it up whatever the
+# player's strategy.
+# It also counts tampering: dice that changed between two draws of the same
+# engine without passing through its dice source.
+
+
+def chi2_sf(x: float, df: int) -> float:
+    """P(X >= x) for a chi-square variable with integer `df`."""
+    if x <= 0:
+        return 1.0
+    h = x / 2.0
+    if df % 2 == 0:
+        term = total = math.exp(-h)
+        for i in range(1, df // 2):
+            term *= h / i
+            total += term
+        return min(1.0, total)
+    total = math.erfc(math.sqrt(h))
+    term = math.exp(-h) * math.sqrt(h) / math.gamma(1.5)
+    for i in range(1, (df - 1) // 2 + 1):
+        total += term
+        term *= h / (i + 0.5)
+    return min(1.0, total)
+
+
+def chi2_uniform(counts: List[int]) -> Dict[str, float]:
+    """Chi-square goodness of fit of `counts` against the uniform distribution."""
+    n = sum(counts)
+    k = len(counts)
+    if n == 0:
+        return {"n": 0, "chi2": 0.0, "df": k - 1, "p": 1.0}
+    e = n / k
+    chi2 = sum((c - e) ** 2 for c in counts) / e
+    return {"n": n, "chi2": chi2, "df": k - 1, "p": chi2_sf(chi2, k - 1)}
+
+
+_QUALITY: Dict[object, List[float]] = {}
+
+
+def roll_quality(rules) -> List[float]:
+    """
+    Per dice state: standardized quality of a turn-start roll under fair dice.
+    Quality is the best combo-row score the roll offers; its mid-rank in the
+    exact distribution is mapped to a normal score, so rare big rolls do not
+    dominate the player CUSUM.
+    """
+    z = _QUALITY.get(rules)
+    if z is None:
+        from statistics import NormalDist
+        from .probability import ROLL_PROB
+        c = rules.compiled
+        best = [max(c.table[cat][s] for cat in COMBO_CATS) for s in range(len(ROLL_PROB))]
+        mass: Dict[int, float] = {}
+        for pr, v in zip(ROLL_PROB, best):
+            mass[v] = mass.get(v, 0.0) + pr
+        below = 0.0
+        score: Dict[int, float] = {}
+        inv = NormalDist().inv_cdf
+        for v in sorted(mass):
+            score[v] = inv(min(max(below + mass[v] / 2, 1e-12), 1 - 1e-12))
+            below += mass[v]
+        raw = [score[v] for v in best]
+        mean = sum(pr * x for pr, x in zip(ROLL_PROB, raw))
+        sd = math.sqrt(sum(pr * (x - mean) ** 2 for pr, x in zip(ROLL_PROB, raw)))
+        z = _QUALITY[rules] = [(x - mean) / sd for x in raw]
+    return z
+
+
+class PlayerLuck:
+    """CUSUM of one player's standardized turn-start roll quality."""
+
+    __slots__ = ("rolls", "cusum", "peak", "flagged", "tampered")
+
+    def __init__(self) -> None:
+        self.rolls = 0
+        self.cusum = 0.0
+        self.peak = 0.0
+        self.flagged = False
+        self.tampered = 0
+
+
+class DiceMonitor:
+    """
+    Counters and running tests for all dice drawn by attached engines.
+    Memory is fixed: the window queue holds at most `window` rolls and at most
+    `max_players` players are tracked (least recently seen dropped).
+
+    `alpha` is the p-value below which a chi-square test alarms; `shift` is
+    the relative face-frequency change the per-face CUSUM looks for, `h` its
+    decision threshold (log-likelihood). `luck_k` / `luck_h` are the
+    reference value and threshold of the per-player quality CUSUM, in
+    standard deviations. Like abaka.instrument, the hot path takes no lock: a
+    roll queued while another thread folds the window may go uncounted.
+    """
+
+    def __init__(self, window: int = 4096, alpha: float = 1e-4, shift: float = 0.05,
+                 h: float = 12.0, luck_k: float = 0.5, luck_h: float = 14.0,
+                 max_players: int = 10000) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.alpha = alpha
+        self.h = h
+        self.luck_k = luck_k
+        self.luck_h = luck_h
+        self.max_players = max_players
+        self.faces = [[0] * 6 for _ in range(5)]
+        self.joker_faces = [0] * 6
+        self.joker_pos = [0] * 5
+        self.rolls = 0
+        self.rerolls = 0
+        self.tampered = 0
+        self.last_window: Optional[Dict[str, dict]] = None
+        self.alarms: "deque[str]" = deque(maxlen=100)  # the latest alarms
+        self.players: "OrderedDict[str, PlayerLuck]" = OrderedDict()
+        # per face: log-likelihood steps of a hit / miss, for a frequency up and down
+        p0 = 1 / 6
+        self._llr = [(math.log(p1 / p0), math.log((1 - p1) / (1 - p0)))
+                     for p1 in (p0 * (1 + shift), p0 * (1 - shift))]
+        self._cusum = [[0.0, 0.0] for _ in range(6)]
+        self._rolls: List[Roll] = []
+        self._rerolls: List[tuple] = []
+        self._lock = threading.Lock()
+
+    # ----- hot path -----
+    def _player(self, name: str) -> PlayerLuck:
+        players = self.players
+        p = players.get(name)
+        if p is None:
+            p = players[name] = PlayerLuck()
+            if len(players) > self.max_players:
+                players.popitem(last=False)
+        else:
+            players.move_to_end(name)
+        return p
+
+    def observe_roll(self, roll: Roll, player: str, quality: List[float]) -> None:
+        """A turn-start roll of `player` (quality: roll_quality() of the table's rules)."""
+        queue = self._rolls
+        queue.append(roll)
+        s = roll.state
+        if s >= 0:
+            p = self._player(player)
+            p.rolls += 1
+            c = p.cusum + quality[s] - self.luck_k
+            p.cusum = c = c if c > 0.0 else 0.0
+            if c > p.peak:
+                p.peak = c
+                if c > self.luck_h and not p.flagged:
+                    p.flagged = True
+                    self.alarms.append(f"player {player!r}: turn-start rolls too good "
+                                       f"(CUSUM {c:.1f} after {p.rolls} rolls)")
+        if len(queue) >= self.window:
+            self.check()
+
+    def observe_reroll(self, roll: Roll, indices) -> None:
+        """The roll after rerolling die `indices`."""
+        queue = self._rerolls
+        queue.append((roll, indices))
+        if len(queue) >= 2 * self.window:
+            self.check()
+
+    def observe_tamper(self, player: str) -> None:
+        self.tampered += 1
+        p = self._player(player)
+        p.tampered += 1
+        if p.tampered == 1:
+            self.alarms.append(f"player {player!r}: dice changed outside the dice source")
+
+    # ----- folding and tests -----
+    def check(self) -> Dict[str, dict]:
+        """Fold queued rolls into the counters and run the window tests; returns them."""
+        with self._lock:
+            rolls, self._rolls = self._rolls, []
+            rerolls, self._rerolls = self._rerolls, []
+            if not rolls and not rerolls:
+                return self.last_window or {}
+            # rolls: transpose once, then count in C
+            faces = [[col.count(v) for v in range(1, 7)] for col in zip(*[r.faces for r in rolls])] \
+                or [[0] * 6 for _ in range(5)]
+            jokers = [r.joker for r in rolls]
+            joker_pos = [jokers.count(i) for i in range(5)]
+            jokers = [r.joker_face for r in rolls]
+            joker_faces = [jokers.count(v) for v in range(1, 7)]
+            for roll, indices in rerolls:
+                f = roll.faces
+                j = roll.joker
+                for i in set(indices):
+                    faces[i][f[i] - 1] += 1
+                    if i == j:
+                        joker_faces[f[j] - 1] += 1
+            self.rolls += len(rolls)
+            self.rerolls += len(rerolls)
+            for life, win in zip(self.faces, faces):
+                for k in range(6):
+                    life[k] += win[k]
+            for k in range(6):
+                self.joker_faces[k] += joker_faces[k]
+            for k in range(5):
+                self.joker_pos[k] += joker_pos[k]
+
+            totals = [sum(row[k] for row in faces) for k in range(6)]
+            n = sum(totals)
+            for k in range(6):
+                cus = self._cusum[k]
+                for d, (hit, miss) in enumerate(self._llr):
+                    v = cus[d] + totals[k] * hit + (n - totals[k]) * miss
+                    cus[d] = v if v > 0.0 else 0.0
+                    if cus[d] > self.h:
+                        self.alarms.append(f"face {k + 1} comes up too {'often' if d == 0 else 'rarely'} "
+                                           f"(CUSUM {cus[d]:.1f})")
+                        cus[d] = 0.0  # restart, so a persisting bias alarms again
+
+            tests = _tests(faces, joker_faces, joker_pos)
+            for name, t in tests.items():
+                if t["p"] < self.alpha:
+                    self.alarms.append(f"window {name}: chi2 {t['chi2']:.1f}, p {t['p']:.2g}")
+            self.last_window = tests
+            return tests
+
+    def report(self) -> dict:
+        """Lifetime tests, last window tests, CUSUMs, flagged players and alarms."""
+        self.check()
+        return {
+            "rolls": self.rolls,
+            "rerolls": self.rerolls,
+            "tampered": self.tampered,
+            "lifetime": _tests(self.faces, self.joker_faces, self.joker_pos),
+            "window": self.last_window or {},
+            "face_cusum": [tuple(c) for c in self._cusum],
+            "flagged_players": {name: {"rolls": p.rolls, "cusum": p.cusum, "tampered": p.tampered}
+                                for name, p in self.players.items() if p.flagged or p.tampered},
+            "alarms": list(self.alarms),
+        }
+
+    # ----- engines -----
+    def attach(self, engine) -> None:
+        """Observe every roll of `engine` (wraps its dice source)."""
+        if isinstance(engine.dice_source, MonitoredDice):
+            engine.dice_source = engine.dice_source.source
+        engine.dice_source = MonitoredDice(engine.dice_source, self, engine)
+
+    @staticmethod
+    def detach(engine) -> None:
+        if isinstance(engine.dice_source, MonitoredDice):
+            engine.dice_source = engine.dice_source.source
+
+
+def _tests(faces, joker_faces, joker_pos) -> Dict[str, dict]:
+    out = {"faces": chi2_uniform([sum(row[k] for row in faces) for k in range(6)])}
+    for i, row in enumerate(faces):
+        out[f"position_{i}"] = chi2_uniform(row)
+    out["joker_faces"] = chi2_uniform(joker_faces)
+    out["joker_position"] = chi2_uniform(joker_pos)
+    return out
+
+
+class MonitoredDice:
+    """A dice source that reports what the wrapped source draws to a DiceMonitor."""
+
+    def __init__(self, source, monitor: DiceMonitor, engine) -> None:
+        self.source = source
+        self.monitor = monitor
+        self.engine = engine
+        self.packed = getattr(source, "packed", False)
+        self._quality = roll_quality(engine.rules)
+        self._last = None  # the last Roll this source handed out
+        self._last_player = ""
+
+    def __getattr__(self, name):
+        # rng and other attributes of the wrapped source
+        if name == "source":
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def _check_table(self) -> None:
+        dice = self.engine.dice
+        if dice and self._last is not None and dice is not self._last:
+            if Roll.pack(dice) is not self._last:
+                self.monitor.observe_tamper(self._last_player)
+
+    def roll(self):
+        self._check_table()
+        dice = self.source.roll()
+        roll = Roll.pack(dice)
+        if roll is not None:
+            g = self.engine
+            player = g.players[g.current].name
+            self.monitor.observe_roll(roll, player, self._quality)
+            self._last, self._last_player = roll, player
+        return dice
+
+    def reroll(self, dice, indices):
+        last = self._last
+        if dice is not last and last is not None and Roll.pack(dice) is not last:
+            self.monitor.observe_tamper(self._last_player)
+        out = self.source.reroll(dice, indices)
+        roll = Roll.pack(out if out is not None else dice)
+        if roll is not None:
+            self.monitor.observe_reroll(roll, indices)
+            self._last = roll
+        return out
+
+
+DEFAULT = DiceMonitor()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from . import probability as P
+from . import snapshot
+from .constants import DENOM, IS_SCHOOL, STRICT
+from .models import Category
+from .rules import DEFAULT_RULES, RuleSet
+from .school import school_layers, school_outcome, school_tables
+from .scoring import score_category
+
+
+# Per-category tables that do not depend on the player's sheet, built once
+# per rule set: (category, rules) -> (score per state, [P(hit) per state for 0..2 rerolls left],
+#              [expected score when chasing the category for 0..2 rerolls left])
+_TABLES: Dict[Tuple[Category, RuleSet], tuple] = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def _category_tables(cat: Category, rules: RuleSet = DEFAULT_RULES) -> tuple:
+    key = (cat, rules)
+    t = _TABLES.get(key)
+    if t is None:
+        with _TABLES_LOCK:
+            t = _TABLES.get(key)
+            if t is None:
+                face = DENOM[cat.index]
+                if face:
+                    # school rows: balance change, and a write without a minus as the hit
+                    scores = school_tables(rules)[face].delta
+                    chase, hit, _ = school_layers(rules, face, 0, True)
+                else:
+                    scores = [score_category(P.state_dice(s), cat, rules=rules) for s in range(P.N_STATES)]
+                    hit = P.solve([1.0 if v > 0 else 0.0 for v in scores], 2)
+                    chase = P.solve([float(v) for v in scores], 2)
+                t = _TABLES[key] = (scores, hit, chase)
+    return t
+
+
+def sheet_key(engine) -> str:
+    """Hash of everything in the current player's position a hint depends on."""
+    p = engine.players[engine.current]
+    parts = [f"{engine.rolls_left}:{int(engine.first_roll)}:{p.school_balance}:{int(p.non_school_complete())}"]
+    for cat, slots in p.table.items():
+        parts.append(f"{cat.name}={slots[:3].count(None)}")
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+
+def _open_rows(p) -> List[Category]:
+    return [cat for cat, slots in p.table.items() if None in slots[:3]]
+
+
+def _stop_points(p, dice, cat: Category, rules: RuleSet = DEFAULT_RULES) -> Optional[float]:
+    """Points the best write into `cat` is worth (crossing counts 0); None if illegal."""
+    denom = DENOM[cat.index]
+    if denom:
+        try:
+            delta, _ = school_outcome(p, dice, denom, rules)
+        except ValueError:
+            return None
+        return 0.0 if delta is None else float(delta)
+    return float(max(score_category(dice, cat, rules=rules), 0))
+
+
+def _stop_column(p, cat: Category, rules: RuleSet) -> List[Optional[float]]:
+    """_stop_points for every dice state at once (no first-roll doubling)."""
+    face = DENOM[cat.index]
+    if face:
+        table = school_tables(rules)[face]
+        endgame = p.non_school_complete()
+        return [float(d) if table.is_legal(s, p.school_balance, endgame) else None
+                for s, d in enumerate(table.delta)]
+    return [float(max(v, 0)) for v in _category_tables(cat, rules)[0]]
+
+
+def compute_hints(engine) -> Dict[str, object]:
+    """
+    Exact expected values for the current turn.
+
+    "moves" maps each open category to its value now (first-roll doubling
+    included), the probability of hitting it on the remaining rerolls and the
+    expected score when chasing it. "keeps" lists every keep option with the
+    expected best write after optimal play, and per-category hit chances.
+    """
+    p = engine.players[engine.current]
+    state = P.state_index(engine.dice)
+    rolls = engine.rolls_left
+    cats = _open_rows(p)
+    rules = engine.rules
+
+    moves: Dict[Category, dict] = {}
+    for cat in cats:
+        scores, hit, chase = _category_tables(cat, rules)
+        school = IS_SCHOOL[cat.index]
+        if school:
+            now = _stop_points(p, engine.dice, cat, rules)
+        else:
+            s = score_category(engine.dice, cat, first_roll=engine.first_roll, rules=rules)
+            now = float(s) if s > 0 or not STRICT[cat.index] else None
+        if school:
+            chase_ev = chase[rolls][state]  # expected balance change, see school_layers
+        else:
+            # stopping now may be worth more than chasing thanks to first-roll doubling
+            chase_ev = max(chase[rolls][state], now or 0.0)
+        moves[cat] = {"now": now, "p_hit": min(1.0, hit[rolls][state]), "chase_ev": chase_ev}
+
+    # value of stopping in each state: best write over the open rows
+    stop: List[Optional[float]] = [None] * P.N_STATES
+    for cat in cats:
+        for s, v in enumerate(_stop_column(p, cat, rules)):
+            if v is not None and (stop[s] is None or v > stop[s]):
+                stop[s] = v
+    stop = [0.0 if v is None else v for v in stop]
+    layers = P.solve(stop, rolls)
+
+    keeps = []
+    if rolls > 0:
+        for keep in P.keep_options(state):
+            keeps.append({
+                "keep": keep,
+                "ev": P.keep_value(state, keep, layers[rolls - 1]),
+                "p_hit": {cat: min(1.0, P.keep_value(state, keep, _category_tables(cat, rules)[1][rolls - 1]))
+                          for cat in cats},
+            })
+        keeps.sort(key=lambda k: -k["ev"])
+
+    now_best = max((m["now"] for m in moves.values() if m["now"] is not None), default=0.0)
+    return {
+        "rolls_left": rolls,
+        "stop_ev": now_best,
+        "turn_ev": max(now_best, layers[rolls][state]),
+        "moves": moves,
+        "keeps": keeps,
+    }
+
+
+class HintService:
+    """
+    Computes hints off the caller's thread and caches them per (sheet hash,
+    dice state). lookup() never blocks: it returns the cached hints or None
+    while the computation runs, so a UI can rerun and pick the result up later.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, capacity: int = 256) -> None:
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="abaka-hints")
+        self.capacity = capacity
+        self._cache: "OrderedDict[Tuple[str, int, RuleSet], dict]" = OrderedDict()
+        self._pending: Dict[Tuple[str, int, RuleSet], Future] = {}
+        self._lock = threading.RLock()  # done callbacks may fire inside lookup()
+
+    @staticmethod
+    def key(engine) -> Tuple[str, int, RuleSet]:
+        return sheet_key(engine), P.state_index(engine.dice), engine.rules
+
+    def lookup(self, engine) -> Optional[dict]:
+        if not engine.dice:
+            return None
+        key = self.key(engine)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+            if key not in self._pending:
+                # work on a copy so later moves on the live engine cannot race the thread
+                fut = self._executor.submit(_compute_blob, snapshot.dumps(engine))
+                self._pending[key] = fut
+                fut.add_done_callback(lambda f, k=key: self._store(k, f))
+        return None
+
+    def get(self, engine, timeout: Optional[float] = None) -> dict:
+        """Blocking variant of lookup() for scripts and tests."""
+        res = self.lookup(engine)
+        if res is not None:
+            return res
+        key = self.key(engine)
+        with self._lock:
+            fut = self._pending.get(key)
+        if fut is None:  # finished between the two calls
+            return self.lookup(engine)
+        return fut.result(timeout)
+
+    def _store(self, key: Tuple[str, int, RuleSet], fut: Future) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+            if fut.exception() is not None:
+                return
+            self._cache[key] = fut.result()
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _compute_blob(blob: bytes) -> dict:
+    return compute_hints(snapshot.loads(blob))
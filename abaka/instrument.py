@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# engine attribute -> reported operation name
+OPS: Dict[str, str] = {
+    "start_turn": "start_turn",
+    "reroll": "reroll",
+    "record_score": "record_score",
+    "record_cross": "record_cross",
+    "_record_school": "record_school",
+    "_after_record": "after_record",
+    "render": "render",
+}
+
+# latency bucket upper bounds, seconds
+BUCKETS: Tuple[float, ...] = (
+    1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4,
+    1e-3, 2e-3, 5e-3, 1e-2, 5e-2, 1e-1,
+)
+
+
+class OpStats:
+    """Call/error counters and a fixed-bucket latency histogram for one operation."""
+
+    __slots__ = ("calls", "errors", "total", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last one is +Inf
+
+    def observe(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+class Instrumentation:
+    """
+    Per-operation counters and latency histograms shared by any number of engines.
+    Updates are lock-free (a rare lost increment under threads is acceptable).
+    """
+
+    def __init__(self, prefix: str = "abaka") -> None:
+        self.prefix = prefix
+        self.ops: Dict[str, OpStats] = {name: OpStats() for name in OPS.values()}
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profile_left = 0
+        # nesting depth of profiled ops, per thread; one thread owns the profiler at a time
+        self._local = threading.local()
+        self._profile_lock = threading.Lock()
+        self._profile_owner: Optional[int] = None
+        self._profile_done: Optional[threading.Event] = None
+        self.last_profile: Optional[str] = None
+
+    # ----- recording -----
+    def wrap(self, name: str, fn):
+        stats = self.ops.setdefault(name, OpStats())
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            prof = self._profiler
+            if prof is not None:
+                return self._profiled_call(prof, stats, fn, args, kwargs)
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                stats.observe(clock() - t0)
+        timed.__wrapped__ = fn
+        return timed
+
+    def _profiled_call(self, prof, stats, fn, args, kwargs):
+        # nested ops (record_score -> after_record) share the outermost enable();
+        # while one thread profiles, ops on other threads are only timed
+        t0 = time.perf_counter()
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            with self._profile_lock:
+                if self._profiler is not prof or self._profile_owner is not None:
+                    prof = None
+                else:
+                    self._profile_owner = threading.get_ident()
+            if prof is None:
+                try:
+                    return fn(*args, **kwargs)
+                except BaseException:
+                    stats.errors += 1
+                    raise
+                finally:
+                    stats.observe(time.perf_counter() - t0)
+            prof.enable()
+        local.depth = depth + 1
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            local.depth = depth
+            stats.observe(time.perf_counter() - t0)
+            if depth == 0:
+                prof.disable()
+                with self._profile_lock:
+                    self._profile_owner = None
+                    self._profile_left -= 1
+                    done = self._profile_left <= 0
+                if done:
+                    self._finish_profile()
+
+    def reset(self) -> None:
+        for name in list(self.ops):
+            self.ops[name] = OpStats()
+
+    # ----- cProfile on demand -----
+    def profile_next(self, calls: int = 100) -> threading.Event:
+        """
+        Profile the next `calls` instrumented operations (any engine/thread).
+        The returned event is set when done; the report is in `last_profile`.
+        """
+        self._profile_left = calls
+        self._profile_done = threading.Event()
+        self._profiler = cProfile.Profile()
+        return self._profile_done
+
+    def _finish_profile(self) -> None:
+        with self._profile_lock:
+            prof, self._profiler = self._profiler, None
+        if prof is None:
+            return
+        self.last_profile = _format_profile(prof)
+        if self._profile_done is not None:
+            self._profile_done.set()
+
+    @contextmanager
+    def profile(self, sort: str = "cumulative", limit: int = 30):
+        """Profile everything in the block; the report lands in `last_profile`."""
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield prof
+        finally:
+            prof.disable()
+            self.last_profile = _format_profile(prof, sort, limit)
+
+    # ----- export -----
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for name, st in self.ops.items():
+            out[name] = {
+                "calls": st.calls,
+                "errors": st.errors,
+                "total_seconds": st.total,
+                "mean_seconds": st.total / st.calls if st.calls else 0.0,
+            }
+        return out
+
+    def export_text(self) -> str:
+        """Prometheus text exposition format."""
+        p = self.prefix
+        lines: List[str] = [
+            f"# HELP {p}_op_latency_seconds Engine operation latency.",
+            f"# TYPE {p}_op_latency_seconds histogram",
+        ]
+        for name, st in self.ops.items():
+            cum = 0
+            for bound, n in zip(BUCKETS, st.buckets):
+                cum += n
+                lines.append(f'{p}_op_latency_seconds_bucket{{op="{name}",le="{bound:g}"}} {cum}')
+            cum += st.buckets[-1]
+            lines.append(f'{p}_op_latency_seconds_bucket{{op="{name}",le="+Inf"}} {cum}')
+            lines.append(f'{p}_op_latency_seconds_sum{{op="{name}"}} {st.total:.9f}')
+            lines.append(f'{p}_op_latency_seconds_count{{op="{name}"}} {st.calls}')
+        lines.append(f"# HELP {p}_op_errors_total Engine operations that raised.")
+        lines.append(f"# TYPE {p}_op_errors_total counter")
+        for name, st in self.ops.items():
+            lines.append(f'{p}_op_errors_total{{op="{name}"}} {st.errors}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write metrics atomically-enough for a node-exporter textfile collector."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.export_text())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve GET /metrics from a daemon thread; call .shutdown() on the result to stop."""
+        instr = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = instr.export_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _format_profile(prof: cProfile.Profile, sort: str = "cumulative", limit: int = 30) -> str:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats(sort).print_stats(limit)
+    return buf.getvalue()
+
+
+DEFAULT = Instrumentation()
+
+
+def attach(engine, instr: Optional[Instrumentation] = None) -> Instrumentation:
+    """
+    Shadow the engine's hot methods with timed wrappers on this instance only.
+    Engines that were never attached run the plain class methods (zero overhead).
+    """
+    instr = instr or DEFAULT
+    detach(engine)
+    for attr, name in OPS.items():
+        setattr(engine, attr, instr.wrap(name, getattr(engine, attr)))
+    engine._instrumentation = instr
+    return instr
+
+
+def detach(engine) -> None:
+    for attr in OPS:
+        engine.__dict__.pop(attr, None)
+    engine.__dict__.pop("_instrumentation", None)
@@ -18,6 +18,13 @@ class Category(Enum):
     SCHOOL_5 = auto()
     SCHOOL_6 = auto()
 
+    def __init__(self, *args):
+        # dense position in definition order: abaka.constants metadata is indexed by it
+        self.index = len(type(self)._member_names_)
+
+    # members are singletons: identity hashing keeps dict/set lookups in C
+    __hash__ = object.__hash__
+
 class Die:
     def __init__(self, value, is_joker=False):
         self.value = value
@@ -25,10 +32,178 @@ class Die:
     def __repr__(self):
         return f"J({self.value})" if self.is_joker else f"{self.value}"
 
-def roll_dice():
-    """Roll 4 normal dice and 1 joker die (random 1-6). Joker is wild only when it shows 1."""
-    dice = [Die(random.randint(1, 6)) for _ in range(4)]
-    joker_value = random.randint(1, 6)
-    dice.append(Die(joker_value, is_joker=True))
-    random.shuffle(dice)
-    return dice
+
+class _FrozenDie(Die):
+    """Shared read-only Die handed out by Roll views."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("dice of a Roll are immutable; assign GameEngine.dice instead")
+
+
+def _frozen(value: int, is_joker: bool) -> _FrozenDie:
+    d = _FrozenDie.__new__(_FrozenDie)
+    object.__setattr__(d, "value", value)
+    object.__setattr__(d, "is_joker", is_joker)
+    return d
+
+
+# one shared view per face for normal dice and for the joker (index = face):
+# views of a Roll allocate nothing
+_PLAIN = [None] + [_frozen(v, False) for v in range(1, 7)]
+_JOKER = [None] + [_frozen(v, True) for v in range(1, 7)]
+
+# Packed roll: die i's face-1 is base-6 digit i, the joker's position times
+# 6**5 on top (5: no joker), so every 5-dice roll is one int below 6**6.
+_POW = (1, 6, 36, 216, 1296)
+# die positions per 5-bit mask, ascending: dedupes reroll indices without a set
+_BIT = (1, 2, 4, 8, 16)
+_MASK_POSITIONS = [tuple(i for i in range(5) if m & _BIT[i]) for m in range(32)]
+NO_JOKER = 5
+ROLL_CODES = 6 ** 6
+_JOKER_ROLLS = 5 * 6 ** 5     # codes of rolls with a joker: all fair rolls
+_ROLLS = [None] * ROLL_CODES  # interned Roll per code, filled on first use
+_NORMALS_INDEX = None         # abaka.probability.NORMALS_INDEX, imported on first use
+
+
+class Roll:
+    """
+    Immutable five-dice roll packed in one int (`code`). Instances are interned
+    per code and carry the derived views hot paths need: `faces` (per position),
+    `joker` (position or -1), sorted `normals`, `joker_face` (0 without a
+    joker) and the abaka.probability `state` (-1 without a joker). As a
+    sequence it reads like the old list of Die objects (shared, read-only).
+    """
+    __slots__ = ("code", "faces", "joker", "normals", "joker_face", "state", "_dice")
+
+    def __new__(cls, code: int) -> "Roll":
+        r = _ROLLS[code]
+        if r is None:
+            r = _ROLLS[code] = object.__new__(cls)
+            r._init(code)
+        return r
+
+    def _init(self, code: int) -> None:
+        global _NORMALS_INDEX
+        if _NORMALS_INDEX is None:
+            from .probability import NORMALS_INDEX as _NORMALS_INDEX
+        pos, rest = divmod(code, 7776)
+        rest, a = divmod(rest, 6)
+        rest, b = divmod(rest, 6)
+        rest, c = divmod(rest, 6)
+        e, d = divmod(rest, 6)
+        faces = (a + 1, b + 1, c + 1, d + 1, e + 1)
+        self.code = code
+        self.faces = faces
+        dice = [_PLAIN[a + 1], _PLAIN[b + 1], _PLAIN[c + 1], _PLAIN[d + 1], _PLAIN[e + 1]]
+        if pos < NO_JOKER:
+            normals = list(faces)
+            jf = normals.pop(pos)
+            normals.sort()
+            self.normals = normals = tuple(normals)
+            self.joker, self.joker_face = pos, jf
+            self.state = _NORMALS_INDEX[normals] * 6 + jf - 1
+            dice[pos] = _JOKER[jf]
+        else:
+            self.normals = tuple(sorted(faces))
+            self.joker, self.joker_face, self.state = -1, 0, -1
+        self._dice = tuple(dice)
+
+    @classmethod
+    def of(cls, faces, joker: int = -1) -> "Roll":
+        """Roll from five faces and the joker's position (-1: no joker)."""
+        code = (joker if joker >= 0 else NO_JOKER) * 6 ** 5
+        for p, v in zip(_POW, faces):
+            code += (v - 1) * p
+        return cls(code)
+
+    @classmethod
+    def pack(cls, dice) -> "Roll | None":
+        """Roll for a Die sequence, or None if it is not 5 dice 1..6 with at most one joker."""
+        if isinstance(dice, Roll):
+            return dice
+        if len(dice) != 5:
+            return None
+        joker = -1
+        faces = []
+        for i, d in enumerate(dice):
+            if not 1 <= d.value <= 6:
+                return None
+            if d.is_joker:
+                if joker >= 0:
+                    return None
+                joker = i
+            faces.append(d.value)
+        return cls.of(faces, joker)
+
+    def replace(self, indices, faces) -> "Roll":
+        """The roll with die indices[k] showing faces[k] (each index at most once)."""
+        code = self.code
+        old = self.faces
+        seen = 0
+        for i, v in zip(indices, faces):
+            if seen & _BIT[i]:
+                raise ValueError(f"die {i} replaced twice")
+            seen |= _BIT[i]
+            code += (v - old[i]) * _POW[i]
+        return Roll(code)
+
+    # ----- Die-list compatibility -----
+    def __len__(self) -> int:
+        return 5
+
+    def __getitem__(self, i):
+        return self._dice[i] if not isinstance(i, slice) else list(self._dice[i])
+
+    def __iter__(self):
+        return iter(self._dice)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Roll):
+            return self is other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self.code
+
+    def __reduce__(self):
+        return Roll, (self.code,)
+
+    def __repr__(self) -> str:
+        return "[" + ", ".join(repr(d) for d in self._dice) + "]"
+
+
+def roll_dice(rng=random):
+    """Roll 4 normal dice and 1 joker die (random 1-6), the joker at a random position."""
+    return Roll(rng.randrange(_JOKER_ROLLS))
+
+
+class RandomDice:
+    """Default dice source: fresh random faces (module-level `random` unless an RNG is given)."""
+
+    # roll()/reroll() work on packed Rolls: reroll returns the new roll
+    packed = True
+
+    def __init__(self, rng=None):
+        self.rng = rng or random
+
+    def roll(self):
+        return Roll(self.rng.randrange(_JOKER_ROLLS))
+
+    def reroll(self, dice, indices):
+        if isinstance(dice, Roll):
+            # one draw for all rerolled dice: digit k is the new face - 1 of the k-th
+            # rerolled position (ascending; repeated indices count once)
+            mask = 0
+            for i in indices:
+                mask |= _BIT[i]
+            positions = _MASK_POSITIONS[mask]
+            r = self.rng.randrange(6 ** len(positions))
+            code = dice.code
+            old = dice.faces
+            for i in positions:
+                r, v = divmod(r, 6)
+                code += (v + 1 - old[i]) * _POW[i]
+            return Roll(code)
+        for i in indices:
+            dice[i].value = self.rng.randint(1, 6)
@@ -1,10 +1,11 @@
+from .constants import CATS, COMBO_CATS
 from .models import Category
 
 class PlayerState:
     def __init__(self, name):
         self.name = name
         # 3 score slots + 1 bonus slot per row
-        self.table = {cat: [None, None, None, None] for cat in Category}
+        self.table = {cat: [None, None, None, None] for cat in CATS}
         # column bonuses for slots 0..2
         self.column_bonus = [None, None, None]
         # school balance (value lives in the last written school cell)
@@ -33,8 +34,9 @@ class PlayerState:
         return all(all(v is not None for v in slots[:3]) for slots in self.table.values())
 
     def non_school_complete(self):
-        for cat, slots in self.table.items():
-            if not cat.name.startswith("SCHOOL_") and not all(v is not None for v in slots[:3]):
+        table = self.table
+        for cat in COMBO_CATS:
+            if None in table[cat][:3]:
                 return False
         return True
 
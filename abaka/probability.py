@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from itertools import combinations_with_replacement
+from math import factorial
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import Roll
+
+# Exact reroll arithmetic over canonical dice states.
+#
+# A state is (sorted faces of the 4 normal dice, joker face): 126 × 6 = 756
+# states, index = normals_index * 6 + (joker - 1). Scores only depend on the
+# state, and positions of normal dice are interchangeable, so keep decisions
+# are (kept sub-multiset of normals, keep joker?) pairs.
+
+FACES = range(1, 7)
+
+NORMALS: List[Tuple[int, ...]] = list(combinations_with_replacement(FACES, 4))
+NORMALS_INDEX: Dict[Tuple[int, ...], int] = {t: i for i, t in enumerate(NORMALS)}
+N_STATES = len(NORMALS) * 6
+
+# every multiset of 0..4 normal faces that can be kept
+KEPT: List[Tuple[int, ...]] = [t for k in range(5) for t in combinations_with_replacement(FACES, k)]
+KEPT_INDEX: Dict[Tuple[int, ...], int] = {t: i for i, t in enumerate(KEPT)}
+
+
+def _multiset_prob(faces: Tuple[int, ...]) -> float:
+    n = len(faces)
+    perms = factorial(n)
+    for v in set(faces):
+        perms //= factorial(faces.count(v))
+    return perms / 6 ** n
+
+
+# kept index -> [(probability, resulting normals index)] over the rerolled dice
+_OUTCOMES: List[List[Tuple[float, int]]] = []
+for _kept in KEPT:
+    _m = 4 - len(_kept)
+    _OUTCOMES.append([
+        (_multiset_prob(out), NORMALS_INDEX[tuple(sorted(_kept + out))])
+        for out in combinations_with_replacement(FACES, _m)
+    ])
+
+# normals index -> kept indices of all its sub-multisets (including itself)
+_SUBSETS: List[List[int]] = []
+for _normals in NORMALS:
+    _subs = {()}
+    for _v in _normals:
+        _subs |= {tuple(sorted(s + (_v,))) for s in _subs}
+    _SUBSETS.append(sorted(KEPT_INDEX[s] for s in _subs))
+
+_FULL_KEEP = [KEPT_INDEX[t] for t in NORMALS]
+
+# probability of each state on a fresh roll of all five dice
+ROLL_PROB: List[float] = [_multiset_prob(NORMALS[s // 6]) / 6.0 for s in range(len(NORMALS) * 6)]
+
+Keep = Tuple[Tuple[int, ...], bool]
+
+
+def state_index(dice) -> int:
+    """Canonical state of a 5-dice roll (4 normal + 1 joker); ValueError without a joker."""
+    if type(dice) is Roll:
+        s = dice.state
+        if s < 0:
+            raise ValueError("a state needs a roll of 4 normal dice and a joker")
+        return s
+    normals = tuple(sorted(d.value for d in dice if not d.is_joker))
+    joker = next((d.value for d in dice if d.is_joker), 0)
+    if not joker or len(normals) != 4:
+        raise ValueError("a state needs a roll of 4 normal dice and a joker")
+    return NORMALS_INDEX[normals] * 6 + joker - 1
+
+
+def state_of(index: int) -> Tuple[Tuple[int, ...], int]:
+    return NORMALS[index // 6], index % 6 + 1
+
+
+_DICE_CACHE: List[Optional[Roll]] = [None] * N_STATES
+
+
+def state_dice(index: int) -> Roll:
+    """Representative roll for a state: normals in order, joker last."""
+    d = _DICE_CACHE[index]
+    if d is None:
+        normals, joker = state_of(index)
+        d = _DICE_CACHE[index] = Roll.of(normals + (joker,), 4)
+    return d
+
+
+def keep_expectations(values: Sequence[float]) -> Tuple[List[List[float]], List[float]]:
+    """
+    For every kept multiset: expected `values` of the next state when the
+    joker is kept at face j (table[kept][j-1]), and when it is rerolled too.
+    """
+    keep_j: List[List[float]] = []
+    reroll_j: List[float] = []
+    for outs in _OUTCOMES:
+        row = [0.0] * 6
+        for p, ni in outs:
+            base = ni * 6
+            for j in range(6):
+                row[j] += p * values[base + j]
+        keep_j.append(row)
+        reroll_j.append(sum(row) / 6.0)
+    return keep_j, reroll_j
+
+
+def _keep_options(index: int):
+    """(kept index, keep joker) pairs available from a state, excluding 'keep everything'."""
+    ni, j = divmod(index, 6)
+    for ki in _SUBSETS[ni]:
+        yield ki, False
+        if ki != _FULL_KEEP[ni]:
+            yield ki, True
+
+
+def solve(stop: Sequence[float], rolls: int) -> List[List[float]]:
+    """
+    Optimal value tables for a turn: out[r][s] is the value of state s with r
+    rerolls left when the player either stops (value stop[s]) or rerolls
+    optimally. out[0] is `stop` itself.
+    """
+    layers = [list(stop)]
+    for _ in range(rolls):
+        prev = layers[-1]
+        keep_j, reroll_j = keep_expectations(prev)
+        cur = list(stop)
+        for s in range(N_STATES):
+            ni, j = divmod(s, 6)
+            best = cur[s]
+            full = _FULL_KEEP[ni]
+            for ki in _SUBSETS[ni]:
+                v = reroll_j[ki]
+                if v > best:
+                    best = v
+                if ki != full:
+                    v = keep_j[ki][j]
+                    if v > best:
+                        best = v
+            cur[s] = best
+        layers.append(cur)
+    return layers
+
+
+def solve_vector(stops: Sequence[Sequence[Sequence[float]]], player: int) -> List[List[Sequence[float]]]:
+    """
+    solve() for payoff vectors (one component per player): stops[r][s] is
+    the vector for stopping in state s with r rerolls left, and `player`
+    rerolls to maximise its own component. out[r][s] is the vector reached
+    under that play, for r = 0..len(stops) - 1.
+    """
+    n = len(stops[0][0])
+    layers: List[List[Sequence[float]]] = [list(stops[0])]
+    for r in range(1, len(stops)):
+        prev = layers[-1]
+        comps = [keep_expectations([v[i] for v in prev]) for i in range(n)]
+        keep_j, reroll_j = comps[player]
+        cur = list(stops[r])
+        for s in range(N_STATES):
+            ni, j = divmod(s, 6)
+            best = cur[s][player]
+            choice = None
+            full = _FULL_KEEP[ni]
+            for ki in _SUBSETS[ni]:
+                v = reroll_j[ki]
+                if v > best:
+                    best, choice = v, (ki, False)
+                if ki != full:
+                    v = keep_j[ki][j]
+                    if v > best:
+                        best, choice = v, (ki, True)
+            if choice is not None:
+                ki, kj = choice
+                cur[s] = [kjt[ki][j] if kj else rjt[ki] for kjt, rjt in comps]
+        layers.append(cur)
+    return layers
+
+
+def keep_value(index: int, keep: Keep, next_values: Sequence[float]) -> float:
+    """Expected next_values after rerolling everything not in `keep` from state `index`."""
+    kept, keep_joker = keep
+    ki = KEPT_INDEX[kept]
+    j = index % 6
+    total = 0.0
+    for p, ni in _OUTCOMES[ki]:
+        base = ni * 6
+        if keep_joker:
+            total += p * next_values[base + j]
+        else:
+            total += p * sum(next_values[base:base + 6]) / 6.0
+    return total
+
+
+def keep_options(index: int) -> List[Keep]:
+    return [(KEPT[ki], kj) for ki, kj in _keep_options(index)]
+
+
+def reroll_indices(dice, keep: Keep) -> List[int]:
+    """Positions to pass to GameEngine.reroll() to realise `keep` on actual dice."""
+    kept, keep_joker = keep
+    pool = list(kept)
+    idxs = []
+    for i, d in enumerate(dice):
+        if d.is_joker:
+            if not keep_joker:
+                idxs.append(i)
+        elif d.value in pool:
+            pool.remove(d.value)
+        else:
+            idxs.append(i)
+    return idxs
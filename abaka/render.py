@@ -1,22 +1,11 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Optional, Tuple
 from .models import Category
-from .constants import ROW_W, COL_W, SCHOOL_CATS, COMBO_CATS
+from .constants import ROW_W, COL_W, SCHOOL_CATS, COMBO_CATS, LABELS
+from .bonus import column_bonus_cells, row_cells
 
 def label_for(cat: Category) -> str:
-    if cat.name.startswith("SCHOOL_"):
-        return cat.name.split("_")[1]
-    return {
-        Category.PAIR: "D",
-        Category.TWO_PAIRS: "DD",
-        Category.TRIPS: "T",
-        Category.SMALL_STRAIGHT: "LS",
-        Category.LARGE_STRAIGHT: "BS",
-        Category.FULL: "F",
-        Category.KARE: "C",
-        Category.ABAKA: "A",
-        Category.SUM: "Σ",
-    }[cat]
+    return LABELS[cat.index]
 
 def _fmt_cell(v) -> str:
     if v is None: return " . "
@@ -32,13 +21,55 @@ def _fmt_player_cells(slots: List[object]) -> str:
     bonus = _fmt_cell(slots[3])
     return f"{core} | {bonus}"
 
-def render_scoreboard(engine) -> List[str]:
-    """Return scoreboard lines (no printing)."""
+def visible_players(engine, count: Optional[int] = None, start: Optional[int] = None) -> range:
+    """
+    Player window for paged scoreboards: `count` players from `start`, or the
+    page holding the current player when start is None. All players if count
+    is None or covers the table.
+    """
+    n = len(engine.players)
+    if count is None or count >= n:
+        return range(n)
+    if start is None:
+        start = engine.current // count * count
+    start = max(0, min(start, n - count))
+    return range(start, start + count)
+
+
+def standings(engine) -> List[Tuple[int, int]]:
+    """(player index, total) for every player, best first; ties keep seat order."""
+    totals = [(i, p.calculate_score()) for i, p in enumerate(engine.players)]
+    return sorted(totals, key=lambda t: -t[1])
+
+
+def standings_lines(engine, top: int = 5, width: Optional[int] = None) -> List[str]:
+    """Compact leaderboard: the top places plus the current player's place."""
+    table = standings(engine)
+    parts = [f"{rank}. {engine.players[i].name} {tot}" for rank, (i, tot) in enumerate(table[:top], 1)]
+    line = "Standings: " + "  ".join(parts)
+    rank = next(r for r, (i, _) in enumerate(table, 1) if i == engine.current)
+    if rank > top:
+        line += f"  …  {rank}. {engine.players[engine.current].name} {table[rank - 1][1]}"
+    if width is not None and len(line) > width:
+        line = line[:width - 1] + "…"
+    return [line]
+
+
+def render_scoreboard(engine, start: Optional[int] = None, count: Optional[int] = None,
+                      top: int = 5) -> List[str]:
+    """
+    Return scoreboard lines (no printing). With `count`, only a window of
+    players is laid out (see visible_players) and a standings summary of the
+    whole table follows, so the output width does not grow with the table.
+    """
+    window = visible_players(engine, count, start)
+    paged = len(window) < len(engine.players)
+
     # Header with double bar between players
     parts: List[str] = [f"{'Row':>{ROW_W}} "]
-    for i, p in enumerate(engine.players):
-        sep = "|" if i == 0 else "||"
-        parts.append(f"{sep} {p.name:^{COL_W}} ")
+    for j, i in enumerate(window):
+        sep = "|" if j == 0 else "||"
+        parts.append(f"{sep} {engine.players[i].name:^{COL_W}} ")
     header = "".join(parts)
     sep_line = "-" * len(header)
 
@@ -47,9 +78,9 @@ def render_scoreboard(engine) -> List[str]:
     # Body rows
     def add_row(cat: Category) -> None:
         line_parts: List[str] = [f"{label_for(cat):>{ROW_W}} "]
-        for i, pl in enumerate(engine.players):
-            sep = "|" if i == 0 else "||"
-            cells = _fmt_player_cells(pl.table[cat])
+        for j, i in enumerate(window):
+            sep = "|" if j == 0 else "||"
+            cells = _fmt_player_cells(row_cells(engine, i, cat))
             line_parts.append(f"{sep} {cells:<{COL_W}} ")
         lines.append("".join(line_parts))
 
@@ -67,9 +98,9 @@ def render_scoreboard(engine) -> List[str]:
 
     # Column bonuses row (B) — show 3 column bonuses and a bar before the filler "bonus" cell
     bonus_parts: List[str] = [f"{'B':>{ROW_W}} "]
-    for i, p in enumerate(engine.players):
-        sep = "|" if i == 0 else "||"
-        three = " ".join(_fmt_cell(v) for v in p.column_bonus)
+    for j, i in enumerate(window):
+        sep = "|" if j == 0 else "||"
+        three = " ".join(_fmt_cell(v) for v in column_bonus_cells(engine, i))
         # pad to 4th cell with a visual bar before it
         cells = f"{three} | {' . ':>3}"
         bonus_parts.append(f"{sep} {cells:<{COL_W}} ")
@@ -80,9 +111,13 @@ def render_scoreboard(engine) -> List[str]:
 
     # Totals line with double bar between players
     tot_parts: List[str] = [f"{'TOT':>{ROW_W}} "]
-    for i, p in enumerate(engine.players):
-        sep = "|" if i == 0 else "||"
-        tot_parts.append(f"{sep} {p.calculate_score():>{COL_W}} ")
+    for j, i in enumerate(window):
+        sep = "|" if j == 0 else "||"
+        tot_parts.append(f"{sep} {engine.players[i].calculate_score():>{COL_W}} ")
     lines.append("".join(tot_parts))
 
+    if paged:
+        lines.append(f"Players {window.start + 1}–{window.stop} of {len(engine.players)}")
+        lines.extend(standings_lines(engine, top))
+
     return lines
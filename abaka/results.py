@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .constants import CATS
+
+# Historical results in a local SQLite database (WAL mode).
+#
+# Detail tables, written once per finished game:
+#   games    (id, played, source, rules, players)
+#   results  (game_id, seat, player, score, rank, share)     share: win share, ties split
+#   rows     (game_id, seat, category, points, crosses, bonus)
+# Aggregates, updated in the same transaction as the details they summarise
+# (one upsert per key and batch, so queries never scan the detail tables):
+#   player_totals (player, games, wins, points, best, avg, win_rate)
+#   pair_totals   (player, opponent, games, wins, draws)   player beat opponent
+#   row_totals    (player, category, games, points, crosses, bonuses)
+# rebuild() recomputes the aggregates from the details.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY, played REAL NOT NULL, source TEXT NOT NULL,
+    rules TEXT NOT NULL, players INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS games_played ON games (played);
+CREATE TABLE IF NOT EXISTS results (
+    game_id INTEGER NOT NULL, seat INTEGER NOT NULL, player TEXT NOT NULL,
+    score INTEGER NOT NULL, rank INTEGER NOT NULL, share REAL NOT NULL,
+    PRIMARY KEY (game_id, seat)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_player ON results (player, game_id);
+CREATE TABLE IF NOT EXISTS rows (
+    game_id INTEGER NOT NULL, seat INTEGER NOT NULL, category INTEGER NOT NULL,
+    points INTEGER NOT NULL, crosses INTEGER NOT NULL, bonus INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seat, category)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_totals (
+    player TEXT PRIMARY KEY, games INTEGER NOT NULL, wins REAL NOT NULL,
+    points INTEGER NOT NULL, best INTEGER NOT NULL, avg REAL NOT NULL,
+    win_rate REAL NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_totals_wins ON player_totals (wins DESC, player);
+CREATE INDEX IF NOT EXISTS player_totals_avg ON player_totals (avg DESC, player);
+CREATE INDEX IF NOT EXISTS player_totals_win_rate ON player_totals (win_rate DESC, player);
+CREATE INDEX IF NOT EXISTS player_totals_games ON player_totals (games DESC, player);
+CREATE TABLE IF NOT EXISTS pair_totals (
+    player TEXT NOT NULL, opponent TEXT NOT NULL, games INTEGER NOT NULL,
+    wins INTEGER NOT NULL, draws INTEGER NOT NULL,
+    PRIMARY KEY (player, opponent)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS row_totals (
+    player TEXT NOT NULL, category INTEGER NOT NULL, games INTEGER NOT NULL,
+    points INTEGER NOT NULL, crosses INTEGER NOT NULL, bonuses INTEGER NOT NULL,
+    PRIMARY KEY (player, category)) WITHOUT ROWID;
+"""
+
+_UPSERT_PLAYER = """
+INSERT INTO player_totals (player, games, wins, points, best, avg, win_rate)
+VALUES (?1, ?2, ?3, ?4, ?5, CAST(?4 AS REAL) / ?2, ?3 / ?2)
+ON CONFLICT (player) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    points = points + excluded.points,
+    best = max(best, excluded.best),
+    avg = CAST(points + excluded.points AS REAL) / (games + excluded.games),
+    win_rate = (wins + excluded.wins) / (games + excluded.games)
+"""
+
+_UPSERT_PAIR = """
+INSERT INTO pair_totals (player, opponent, games, wins, draws) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player, opponent) DO UPDATE SET
+    games = games + excluded.games, wins = wins + excluded.wins, draws = draws + excluded.draws
+"""
+
+_UPSERT_ROW = """
+INSERT INTO row_totals (player, category, games, points, crosses, bonuses) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (player, category) DO UPDATE SET
+    games = games + excluded.games, points = points + excluded.points,
+    crosses = crosses + excluded.crosses, bonuses = bonuses + excluded.bonuses
+"""
+
+# leaderboard orderings -> column; each has a (column DESC, player) index that
+# the query walks from the top, so its cost does not grow with the player count
+_ORDER = {"wins": "wins", "avg_score": "avg", "win_rate": "win_rate", "games": "games"}
+
+# one finished game, ready to insert: (played, source, rules, [(seat, player, score, rank,
+# share)], [(seat, category, points, crosses, bonus)])
+_Pending = Tuple[float, str, str, List[tuple], List[tuple]]
+
+
+def game_rows(engine) -> Tuple[List[tuple], List[tuple]]:
+    """Per-player (seat, player, score, rank, share) and per-row outcome tuples of a game."""
+    scores = [p.calculate_score() for p in engine.players]
+    best = max(scores)
+    share = 1.0 / scores.count(best)
+    players = []
+    rows = []
+    for seat, (p, score) in enumerate(zip(engine.players, scores)):
+        rank = 1 + sum(s > score for s in scores)
+        players.append((seat, p.name, score, rank, share if score == best else 0.0))
+        for cat in CATS:
+            slots = p.table[cat]
+            cells = slots[:3]
+            bonus = slots[3]
+            rows.append((seat, cat.index, sum(v for v in cells if isinstance(v, int)),
+                         cells.count("X"), bonus if isinstance(bonus, int) else 0))
+    return players, rows
+
+
+class ResultsStore:
+    """
+    Finished games in SQLite. record() queues a game and writes every
+    `batch_size` games in one transaction; flush() writes the rest now.
+    Leaderboard, head-to-head and per-row queries read the aggregate tables.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending: List[_Pending] = []
+
+    # ----- writing -----
+    def record(self, engine, source: str = "sim", played: Optional[float] = None) -> None:
+        """Queue a finished game."""
+        if not engine.is_game_over():
+            raise ValueError("Only finished games can be recorded")
+        players, rows = game_rows(engine)
+        item = (time.time() if played is None else played, source,
+                getattr(engine.rules, "name", "standard"), players, rows)
+        with self._lock:
+            self._pending.append(item)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # ids come from inside the write transaction, so several processes can share a file
+            first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+            games, results, rows = [], [], []
+            totals: Dict[str, list] = {}
+            pairs: Dict[Tuple[str, str], list] = {}
+            row_totals: Dict[Tuple[str, int], list] = {}
+            for gid, (played, source, rules, players, cells) in enumerate(batch, first):
+                games.append((gid, played, source, rules, len(players)))
+                results.extend((gid,) + p for p in players)
+                rows.extend((gid,) + r for r in cells)
+                names = [p[1] for p in players]
+                for _, name, score, _, share in players:
+                    t = totals.setdefault(name, [0, 0.0, 0, score])
+                    t[0] += 1
+                    t[1] += share
+                    t[2] += score
+                    t[3] = max(t[3], score)
+                for _, a, sa, _, _ in players:
+                    for _, b, sb, _, _ in players:
+                        if a == b:
+                            continue
+                        t = pairs.setdefault((a, b), [0, 0, 0])
+                        t[0] += 1
+                        t[1] += sa > sb
+                        t[2] += sa == sb
+                for seat, cat, points, crosses, bonus in cells:
+                    t = row_totals.setdefault((names[seat], cat), [0, 0, 0, 0])
+                    t[0] += 1
+                    t[1] += points
+                    t[2] += crosses
+                    t[3] += bonus != 0
+            conn.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?)", games)
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", results)
+            conn.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(_UPSERT_PLAYER, [(k, *v) for k, v in totals.items()])
+            conn.executemany(_UPSERT_PAIR, [(*k, *v) for k, v in pairs.items()])
+            conn.executemany(_UPSERT_ROW, [(*k, *v) for k, v in row_totals.items()])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._pending[:0] = batch
+            raise
+
+    def rebuild(self) -> None:
+        """Recompute every aggregate table from the detail tables (full scan)."""
+        with self._lock:
+            self._flush()
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM player_totals")
+                conn.execute("DELETE FROM pair_totals")
+                conn.execute("DELETE FROM row_totals")
+                conn.execute(
+                    "INSERT INTO player_totals SELECT player, COUNT(*), SUM(share), SUM(score),"
+                    " MAX(score), CAST(SUM(score) AS REAL) / COUNT(*), SUM(share) / COUNT(*)"
+                    " FROM results GROUP BY player")
+                conn.execute(
+                    "INSERT INTO pair_totals SELECT a.player, b.player, COUNT(*),"
+                    " SUM(a.score > b.score), SUM(a.score = b.score)"
+                    " FROM results a JOIN results b ON a.game_id = b.game_id AND a.player != b.player"
+                    " GROUP BY a.player, b.player")
+                conn.execute(
+                    "INSERT INTO row_totals SELECT r.player, w.category, COUNT(*), SUM(w.points),"
+                    " SUM(w.crosses), SUM(w.bonus != 0)"
+                    " FROM rows w JOIN results r ON r.game_id = w.game_id AND r.seat = w.seat"
+                    " GROUP BY r.player, w.category")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    # ----- queries -----
+    def _query(self, sql: str, args: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def games(self) -> int:
+        """Games written so far (ids are dense)."""
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM games")[0][0]
+
+    def leaderboard(self, by: str = "wins", limit: int = 10, min_games: int = 1) -> List[dict]:
+        """Top players by "wins", "avg_score", "win_rate" or "games"."""
+        try:
+            column = _ORDER[by]
+        except KeyError:
+            raise ValueError(f"Unknown ordering {by!r}; use one of {', '.join(_ORDER)}") from None
+        rows = self._query(
+            f"SELECT player, games, wins, avg, win_rate, best FROM player_totals"
+            f" INDEXED BY player_totals_{column}"
+            f" WHERE games >= ? ORDER BY {column} DESC, player LIMIT ?", (min_games, limit))
+        return [_player_dict(r) for r in rows]
+
+    def player(self, name: str) -> Optional[dict]:
+        rows = self._query("SELECT player, games, wins, avg, win_rate, best FROM player_totals"
+                           " WHERE player = ?", (name,))
+        return _player_dict(rows[0]) if rows else None
+
+    def head_to_head(self, a: str, b: str) -> dict:
+        """Games where `a` and `b` sat at the same table, from `a`'s side."""
+        rows = self._query("SELECT games, wins, draws FROM pair_totals"
+                           " WHERE player = ? AND opponent = ?", (a, b))
+        games, wins, draws = rows[0] if rows else (0, 0, 0)
+        return {"games": games, "wins": wins, "losses": games - wins - draws, "draws": draws}
+
+    def row_stats(self, name: str) -> Dict[object, dict]:
+        """Per category: average points, crosses per game and bonus rate."""
+        out = {}
+        for cat, games, points, crosses, bonuses in self._query(
+                "SELECT category, games, points, crosses, bonuses FROM row_totals"
+                " WHERE player = ?", (name,)):
+            out[CATS[cat]] = {"games": games, "avg_points": points / games,
+                              "crosses": crosses / games, "bonus_rate": bonuses / games}
+        return out
+
+    def recent(self, name: str, limit: int = 20) -> List[dict]:
+        """The player's latest games, newest first."""
+        rows = self._query(
+            "SELECT r.game_id, g.played, g.source, r.score, r.rank FROM results r"
+            " JOIN games g ON g.id = r.game_id WHERE r.player = ?"
+            " ORDER BY r.game_id DESC LIMIT ?", (name, limit))
+        return [{"game": gid, "played": played, "source": source, "score": score, "rank": rank}
+                for gid, played, source, score, rank in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _player_dict(row: tuple) -> dict:
+    player, games, wins, avg, win_rate, best = row
+    return {"player": player, "games": games, "wins": wins, "avg_score": avg,
+            "win_rate": win_rate, "best": best}
+
+
+def open_default(batch_size: int = 1) -> Optional[ResultsStore]:
+    """The store named by ABAKA_RESULTS, or None when it is unset."""
+    path = os.environ.get("ABAKA_RESULTS")
+    return ResultsStore(path, batch_size=batch_size) if path else None
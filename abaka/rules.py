@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import json
+import os
+from itertools import combinations_with_replacement
+from typing import Dict, List, Optional, Tuple
+
+from .models import Category, Die, Roll
+from .probability import NORMALS_INDEX
+
+# Every tunable house rule with its default (the standard game). Lists are
+# stored as tuples so rule sets stay hashable.
+DEFAULTS: Dict[str, object] = {
+    "name": "standard",
+    # joker die is wild only when it shows this face (0: never wild)
+    "joker_wild": 1,
+    # first-roll writes multiply (base + bonus) by this (1: no doubling)
+    "first_roll_multiplier": 2,
+    "kare_bonus": 20,
+    "abaka_bonus": 50,
+    # full house of three `royal_full[0]`s and two `royal_full[1]`s
+    "royal_full": (1, 2),
+    "royal_full_bonus": 50,
+    "small_straight": (1, 2, 3, 4, 5),
+    "small_straight_score": 15,
+    "large_straight": (2, 3, 4, 5, 6),
+    "large_straight_score": 20,
+    # school: dice of the row's face needed for a free write
+    "school_target": 3,
+    # balance gained per extra die, and paid per missing die, times the face
+    "school_surplus_value": 1,
+    "school_shortfall_cost": 1,
+    # cost (times the face) of writing a row with no matching die (endgame only)
+    "school_empty_cost": 2,
+}
+
+
+class RuleSet:
+    """
+    A declarative rule variant. Construct with keyword overrides of DEFAULTS,
+    or load from JSON/TOML with RuleSet.load(path). Scoring never reads these
+    fields directly: `compiled` turns them into lookup tables once.
+    """
+
+    def __init__(self, **overrides) -> None:
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown rule(s): {', '.join(sorted(unknown))}")
+        values = dict(DEFAULTS)
+        values.update(overrides)
+        for key, v in values.items():
+            if isinstance(v, list):
+                v = tuple(v)
+            if key != "name" and not (isinstance(v, int) or
+                                      isinstance(v, tuple) and all(isinstance(x, int) for x in v)):
+                raise ValueError(f"Rule {key!r} must be an integer or a list of integers")
+            setattr(self, key, v)
+        for key in ("small_straight", "large_straight", "royal_full"):
+            if not all(1 <= f <= 6 for f in getattr(self, key)):
+                raise ValueError(f"{key} faces must be 1..6")
+        for key in ("small_straight", "large_straight"):
+            if len(set(getattr(self, key))) != 5:
+                raise ValueError(f"{key} must list five different faces")
+        if len(self.royal_full) != 2:
+            raise ValueError("royal_full must be [trips face, pair face]")
+        if not 0 <= self.joker_wild <= 6 or not 1 <= self.school_target <= 5:
+            raise ValueError("joker_wild must be 0..6 and school_target 1..5")
+        if self.first_roll_multiplier < 1:
+            raise ValueError("first_roll_multiplier must be at least 1")
+        negative = sorted(k for k, v in values.items() if k.endswith(("_bonus", "_score", "_value", "_cost"))
+                          and getattr(self, k) < 0)
+        if negative:
+            raise ValueError(f"Rule(s) {', '.join(negative)} must not be negative")
+        self._compiled: Optional[CompiledRules] = None
+
+    # ----- loading -----
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "RuleSet":
+        # allow the rules to sit under a [rules] table / "rules" key
+        if "rules" in data and isinstance(data["rules"], dict):
+            data = dict(data["rules"], **{k: v for k, v in data.items() if k == "name"})
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path: str) -> "RuleSet":
+        """Load a rule set from a .json or .toml file."""
+        with open(path, "rb") as f:
+            raw = f.read()
+        if os.path.splitext(path)[1].lower() == ".toml":
+            try:
+                import tomllib
+            except ModuleNotFoundError:  # Python < 3.11
+                import tomli as tomllib
+            data = tomllib.loads(raw.decode("utf-8"))
+        else:
+            data = json.loads(raw)
+        data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        return cls.from_dict(data)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {k: list(v) if isinstance(v, tuple) else v
+                for k, v in ((key, getattr(self, key)) for key in DEFAULTS)}
+
+    # ----- identity -----
+    def _key(self) -> Tuple:
+        return tuple(getattr(self, k) for k in DEFAULTS if k != "name")
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RuleSet) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        changed = {k: v for k, v in self.to_dict().items()
+                   if k != "name" and v != (list(DEFAULTS[k]) if isinstance(DEFAULTS[k], tuple) else DEFAULTS[k])}
+        return f"<RuleSet {self.name!r} {changed}>"
+
+    @property
+    def compiled(self) -> "CompiledRules":
+        c = self._compiled
+        if c is None:
+            c = self._compiled = _compile(self)
+        return c
+
+
+_CACHE: Dict[RuleSet, "CompiledRules"] = {}
+
+
+def _compile(rules: RuleSet) -> "CompiledRules":
+    # equal rule sets (e.g. loaded twice) share one set of tables
+    c = _CACHE.get(rules)
+    if c is None:
+        c = _CACHE[rules] = CompiledRules(rules)
+    return c
+
+
+# School entry: (delta | None for an exact write, minus?, balance required, no matching die?)
+SchoolEntry = Tuple[Optional[int], bool, int, bool]
+
+
+class CompiledRules:
+    """
+    Lookup tables for one RuleSet.
+
+    `table[category][state]` holds base + bonus (before the first-roll
+    multiplier) for every canonical 4-normal + joker roll (abaka.probability
+    state index), and `school[face][k]` the balance outcome of writing a
+    school row with k matching dice. Every rule set costs one lookup.
+    """
+
+    def __init__(self, rules: RuleSet) -> None:
+        from . import probability as P
+        from .scoring import reference_score  # scoring imports this module
+
+        self.rules = rules
+        self.multiplier = rules.first_roll_multiplier
+        self.wild = rules.joker_wild
+        # score every 5-face multiset once (no wild joker), then resolve the
+        # joker per state exactly as reference_score does
+        faces = list(combinations_with_replacement(range(1, 7), 5))
+        self.table: Dict[Category, List[int]] = {}
+        for cat in Category:
+            plain = {f: reference_score([Die(v) for v in f], cat, False, rules) for f in faces}
+            col = []
+            for s in range(P.N_STATES):
+                normals, joker = P.state_of(s)
+                if joker == self.wild:
+                    col.append(max(0, max(plain[tuple(sorted(normals + (v,)))] for v in range(1, 7))))
+                else:
+                    col.append(plain[tuple(sorted(normals + (joker,)))])
+            self.table[cat] = col
+        self.school: Dict[int, List[SchoolEntry]] = {
+            face: [self._school_entry(rules, face, k) for k in range(6)] for face in range(1, 7)
+        }
+
+    @staticmethod
+    def _school_entry(rules: RuleSet, face: int, k: int) -> SchoolEntry:
+        target = rules.school_target
+        if k == target:
+            return None, False, 0, False
+        if k > target:
+            return (k - target) * face * rules.school_surplus_value, False, 0, False
+        if k == 0:
+            required = rules.school_empty_cost * face
+        else:
+            required = (target - k) * face * rules.school_shortfall_cost
+        return -required, True, required, k == 0
+
+    def score(self, dice, category: Category, first_roll: bool = False) -> int:
+        s = state_key(dice)
+        if s < 0:  # not a 4 + joker roll (hand-built dice in tests/tools)
+            from .scoring import reference_score
+            return reference_score(dice, category, first_roll, self.rules)
+        v = self.table[category][s]
+        return v * self.multiplier if first_roll else v
+
+    def count_face(self, dice, face: int) -> int:
+        """School k: dice showing `face`, plus the wild joker for any other face."""
+        if type(dice) is Roll:
+            jf = dice.joker_face
+            return dice.normals.count(face) + (1 if jf and (jf == face or jf == self.wild) else 0)
+        k = 0
+        wild = False
+        for d in dice:
+            if d.value == face:
+                k += 1
+            elif d.is_joker and d.value == self.wild:
+                wild = True
+        return k + 1 if wild else k
+
+
+def state_key(dice) -> int:
+    """abaka.probability state index of a 4 normal + 1 joker roll, or -1."""
+    if type(dice) is Roll:
+        return dice.state
+    if len(dice) != 5:
+        return -1
+    normals = []
+    joker = 0
+    for d in dice:
+        if d.is_joker:
+            if joker:
+                return -1
+            joker = d.value
+        else:
+            normals.append(d.value)
+    if not 1 <= joker <= 6:
+        return -1
+    normals.sort()
+    ni = NORMALS_INDEX.get(tuple(normals))
+    return -1 if ni is None else ni * 6 + joker - 1
+
+
+DEFAULT_RULES = RuleSet()
+
+
+def compiled(rules: Optional[RuleSet] = None) -> CompiledRules:
+    return (rules or DEFAULT_RULES).compiled
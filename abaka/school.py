@@ -1,6 +1,12 @@
 # abaka/school.py
 from __future__ import annotations
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from . import probability as P
+from .constants import DENOM, SCHOOL_CATS
 from .models import Category
+from .rules import compiled
 
 def record_school(engine, category: Category, slot_index: int) -> None:
     """
@@ -18,56 +24,158 @@ def record_school(engine, category: Category, slot_index: int) -> None:
       - Любой «минус» в школе мгновенно перечёркивает бонус строки школы у игрока.
     """
     p = engine.players[engine.current]
-    denom = int(category.name.split('_')[1])
-
-    # считаем k
-    k = sum(1 for d in engine.dice if d.value == denom)
-    if denom != 1 and any(d.is_joker and d.value == 1 for d in engine.dice):
-        k += 1
+    denom = DENOM[category.index]
+    delta, minus = school_outcome(p, engine.dice, denom, engine.rules)
 
     # ровно три → крестик
-    if k == 3:
+    if delta is None:
         p.cross(category, slot_index)
         return
 
-    def move_balance(new_value: int) -> None:
-        # гасим прошлую ячейку баланса (если была), пишем новую
-        if p.school_balance_loc is not None:
-            pc, ps = p.school_balance_loc
-            p.table[pc][ps] = 'X'
-        val = new_value          # <-- БЕЗ удвоения в школе
-        p.record(category, slot_index, val)
-        p.school_balance = val
-        p.school_balance_loc = (category, slot_index)
-
-    # излишек
-    if k > 3:
-        delta = (k - 3) * denom
-        move_balance(p.school_balance + delta)
-        return
-
-    # недостача (k < 3)
-    required = (3 - k) * denom if k >= 1 else 2 * denom
+    # гасим прошлую ячейку баланса (если была), пишем новую
+    if p.school_balance_loc is not None:
+        pc, ps = p.school_balance_loc
+        p.table[pc][ps] = 'X'
+    val = p.school_balance + delta          # <-- БЕЗ удвоения в школе
+    p.record(category, slot_index, val)
+    p.school_balance = val
+    p.school_balance_loc = (category, slot_index)
 
-    # запрет k==0 до эндгейма
-    if k == 0 and not p.non_school_complete():
-        raise ValueError("Cannot write this school row: need at least one die of that denomination")
-
-    # хватает баланса — обычный минус
-    if p.school_balance >= required:
-        move_balance(p.school_balance - required)
+    if minus:
         engine.school_minus_used[(engine.current, category)] = True
         if p.table[category][3] is None:
             p.table[category][3] = 'X'
-        return
 
-    # эндгейм — разрешаем уходить в минус
-    if p.non_school_complete():
-        move_balance(p.school_balance - required)  # может стать отрицательным
-        engine.school_minus_used[(engine.current, category)] = True
-        if p.table[category][3] is None:
-            p.table[category][3] = 'X'
-        return
+
+def count_denom(dice, denom: int, rules=None) -> int:
+    """k для школы: кубики номинала denom; joker(1) добавляет +1 для denom != 1."""
+    return compiled(rules).count_face(dice, denom)
+
+
+def school_outcome(p, dice, denom: int, rules=None):
+    """
+    Чистая проверка записи в школу (ничего не меняет).
+    Возвращает (delta, minus): delta=None → ровно три ('X');
+    иначе изменение баланса и флаг «минуса». ValueError — запись запрещена.
+    Стоимости берутся из таблицы набора правил (abaka.rules).
+    """
+    c = compiled(rules)
+    k = c.count_face(dice, denom)
+    delta, minus, required, empty = c.school[denom][k]
+
+    # ровно три или излишек
+    if not minus:
+        return delta, False
+
+    # запрет k==0 до эндгейма
+    if empty and not p.non_school_complete():
+        raise ValueError("Cannot write this school row: need at least one die of that denomination")
+
+    # хватает баланса — обычный минус; эндгейм — разрешаем уходить в минус
+    if p.school_balance >= required or p.non_school_complete():
+        return delta, True
 
     # иначе недостаточно баланса
     raise ValueError(f"Not enough school balance to write this row (need {required}, have {p.school_balance})")
+
+
+# ----- таблицы по состояниям кубиков и планировщик баланса -----
+
+class SchoolTable:
+    """
+    Исход записи в строку школы `face` для каждого канонического состояния
+    кубиков (индекс abaka.probability): k, изменение баланса (0 для 'X'),
+    флаги 'X'/минус, требуемый баланс и «нет ни одного кубика».
+    """
+    __slots__ = ("face", "k", "delta", "exact", "minus", "required", "empty")
+
+    def __init__(self, c, face: int) -> None:
+        self.face = face
+        self.k = [sum(1 for v in normals if v == face) + (joker == face or joker == c.wild)
+                  for normals, joker in map(P.state_of, range(P.N_STATES))]
+        entries = [c.school[face][k] for k in self.k]
+        self.delta = [0 if d is None else d for d, _, _, _ in entries]
+        self.exact = [d is None for d, _, _, _ in entries]
+        self.minus = [m for _, m, _, _ in entries]
+        self.required = [r for _, _, r, _ in entries]
+        self.empty = [e for _, _, _, e in entries]
+
+    def is_legal(self, state: int, balance: int, endgame: bool) -> bool:
+        """То же решение, что school_outcome, без исключения."""
+        return endgame or not self.minus[state] or (not self.empty[state] and balance >= self.required[state])
+
+    def legal(self, balance: int, endgame: bool) -> List[bool]:
+        """Маска допустимых записей по всем состояниям."""
+        return [self.is_legal(s, balance, endgame) for s in range(P.N_STATES)]
+
+
+_SCHOOL_TABLES: Dict[int, Dict[int, SchoolTable]] = {}
+_PLAN_CACHE: Dict[tuple, tuple] = {}
+_PLAN_LOCK = threading.Lock()
+
+
+def school_tables(rules=None) -> Dict[int, SchoolTable]:
+    """face -> SchoolTable для набора правил (строится один раз)."""
+    c = compiled(rules)
+    t = _SCHOOL_TABLES.get(id(c))
+    if t is None:
+        t = _SCHOOL_TABLES[id(c)] = {face: SchoolTable(c, face) for face in range(1, 7)}
+    return t
+
+
+def school_layers(rules, face: int, balance: int, endgame: bool, rolls: int = 2) -> tuple:
+    """
+    Пакетная форма планировщика: (ev, exact, legal), каждый — список слоёв
+    out[r][state] для r = 0..rolls перебросов (см. probability.solve).
+      ev    — ожидаемое изменение баланса при игре на эту строку;
+              недопустимый исход оценивается его стоимостью (-required),
+              то есть как запись в эндгейме;
+      exact — вероятность закончить без минуса (k >= цели);
+      legal — вероятность, что запись будет разрешена.
+    Каждая величина — при оптимальных перебросах именно для неё.
+    """
+    table = school_tables(rules)[face]
+    if endgame:
+        balance = 0
+    else:
+        # выше максимальной стоимости баланс уже ничего не меняет
+        balance = max(-1, min(balance, max(table.required)))
+    key = (id(compiled(rules)), face, balance, endgame, rolls)
+    hit = _PLAN_CACHE.get(key)
+    if hit is None:
+        with _PLAN_LOCK:
+            hit = _PLAN_CACHE.get(key)
+            if hit is None:
+                ev = P.solve([float(d) for d in table.delta], rolls)
+                exact = P.solve([0.0 if m else 1.0 for m in table.minus], rolls)
+                legal = P.solve([1.0 if ok else 0.0 for ok in table.legal(balance, endgame)], rolls)
+                hit = _PLAN_CACHE[key] = (ev, exact, legal)
+    return hit
+
+
+def plan_school(engine, rows: Optional[Iterable[Category]] = None) -> Dict[Category, dict]:
+    """
+    Для каждой открытой строки школы текущего игрока (или `rows`): изменение
+    баланса при записи сейчас ("now", None — запись запрещена), ожидаемое
+    изменение при игре на строку ("ev") и вероятности "p_exact" / "p_legal"
+    с учётом оставшихся перебросов.
+    """
+    p = engine.players[engine.current]
+    state = P.state_index(engine.dice)
+    r = engine.rolls_left
+    endgame = p.non_school_complete()
+    if rows is None:
+        rows = [cat for cat in SCHOOL_CATS if None in p.table[cat][:3]]
+    out: Dict[Category, dict] = {}
+    for cat in rows:
+        face = DENOM[cat.index]
+        table = school_tables(engine.rules)[face]
+        ev, exact, legal = school_layers(engine.rules, face, p.school_balance, endgame, r)
+        ok = table.is_legal(state, p.school_balance, endgame)
+        out[cat] = {
+            "now": table.delta[state] if ok else None,
+            "ev": ev[r][state],
+            "p_exact": min(1.0, exact[r][state]),
+            "p_legal": min(1.0, legal[r][state]),
+        }
+    return out
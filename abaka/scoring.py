@@ -1,13 +1,27 @@
 from collections import Counter
+from .constants import DENOM, IS_SCHOOL
 from .models import Category, Die
+from .rules import DEFAULT_RULES, compiled
 
-def score_category(dice, category, first_roll=False):
+def score_category(dice, category, first_roll=False, rules=None):
     """
     Joker wild ONLY if it shows 1 (we try 1..6).
     Bonuses: KARE +20, ABAKA +50, Royal Full (1,1,1,2,2) +50.
     On first roll, (base + bonus) is doubled.
     SCHOOL rows score as count(denom) - 3 (can be negative).
+    Those are the standard rules; pass an abaka.rules.RuleSet for a variant.
+    Either way the score is a lookup in the rule set's compiled tables.
     """
+    return compiled(rules).score(dice, category, first_roll)
+
+
+def reference_score(dice, category, first_roll=False, rules=None):
+    """Direct evaluation of one category; the compiled tables are built from this."""
+    r = rules or DEFAULT_RULES
+    royal_trips, royal_pair = r.royal_full
+    small, large = set(r.small_straight), set(r.large_straight)
+    mult = r.first_roll_multiplier if first_roll else 1
+
     def _calc(values, cat):
         cnt = Counter(values)
         total = sum(values)
@@ -24,41 +38,40 @@ def score_category(dice, category, first_roll=False):
         elif cat == Category.FULL:
             if sorted(cnt.values()) == [2, 3]:
                 score = total
-                if cnt.get(1, 0) == 3 and cnt.get(2, 0) == 2:
-                    bonus = 50
+                if cnt.get(royal_trips, 0) == 3 and cnt.get(royal_pair, 0) == 2:
+                    bonus = r.royal_full_bonus
             else:
                 score = 0
         elif cat == Category.SMALL_STRAIGHT:
             s = set(values)
-            # строго 1..5
-            score = 15 if s == {1, 2, 3, 4, 5} else 0
+            # строго 1..5 (по умолчанию)
+            score = r.small_straight_score if s == small else 0
 
         elif cat == Category.LARGE_STRAIGHT:
             s = set(values)
-            # строго 2..6
-            score = 20 if s == {2, 3, 4, 5, 6} else 0
+            # строго 2..6 (по умолчанию)
+            score = r.large_straight_score if s == large else 0
         elif cat == Category.KARE:
             ks = [v for v, c in cnt.items() if c >= 4]
-            score, bonus = (ks[0]*4, 20) if ks else (0, 0)
+            score, bonus = (ks[0]*4, r.kare_bonus) if ks else (0, 0)
         elif cat == Category.ABAKA:
-            score, bonus = (total, 50) if any(c == 5 for c in cnt.values()) else (0, 0)
+            score, bonus = (total, r.abaka_bonus) if any(c == 5 for c in cnt.values()) else (0, 0)
         elif cat == Category.SUM:
             score = total
-        elif cat.name.startswith("SCHOOL_"):
-            denom = int(cat.name.split('_')[1])
-            score = cnt.get(denom, 0) - 3
+        elif IS_SCHOOL[cat.index]:
+            score = cnt.get(DENOM[cat.index], 0) - r.school_target
         else:
             score = 0
         return score, bonus
 
     joker = next((d for d in dice if d.is_joker), None)
-    if joker and joker.value == 1:
+    if joker and joker.value == r.joker_wild:
         best = 0
         for v in range(1, 7):
             vals = [v if d.is_joker else d.value for d in dice]
             base, bonus = _calc(vals, category)
-            best = max(best, (base + bonus) * (2 if first_roll else 1))
+            best = max(best, (base + bonus) * mult)
         return best
     vals = [d.value for d in dice]
     base, bonus = _calc(vals, category)
-    return (base + bonus) * (2 if first_roll else 1)
+    return (base + bonus) * mult
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import multiprocessing as mp
+import random
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import snapshot
+
+# Table sharding across worker processes.
+#
+# The front (TableRouter) maps every table id to a shard with a consistent
+# hash ring and forwards requests in batches: one message per shard and
+# batch, so shards work in parallel. Each shard owns its GameEngine
+# instances outright (no cross-process locking). When shards are added or
+# drained only the tables whose ring owner changed move, as engine snapshots.
+#
+# A request is (table id, op, args):
+#   "create" (names, rules dict or None)   new table
+#   "apply"  (action,)                      abaka.sim action, or ("start",) to roll
+#   "turn"   (policy name,)                 a whole turn by a registered policy
+#   "get"    ()                             snapshot bytes
+#   "drop"   ()                             forget the table
+#   "export" () / "import" (blob,)          migration
+#   "fairness" ()                           the shard's dice monitor report (any table id)
+# Each result is the op's value, or the exception it raised.
+
+Request = Tuple[str, str, tuple]
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing with `replicas` virtual points per node."""
+
+    def __init__(self, nodes: Sequence[int] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[int] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[int]:
+        return sorted(set(self._owners))
+
+    def add(self, node: int) -> None:
+        for r in range(self.replicas):
+            h = _hash(f"{node}#{r}")
+            i = bisect.bisect(self._points, h)
+            self._points.insert(i, h)
+            self._owners.insert(i, node)
+
+    def remove(self, node: int) -> None:
+        keep = [(h, n) for h, n in zip(self._points, self._owners) if n != node]
+        self._points = [h for h, _ in keep]
+        self._owners = [n for _, n in keep]
+
+    def node_for(self, key: str) -> int:
+        if not self._points:
+            raise LookupError("The ring has no nodes")
+        i = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[i]
+
+
+class Shard:
+    """The tables one worker owns; handle() runs a batch of requests in order."""
+
+    def __init__(self, seed: Optional[int] = None, monitor: bool = False) -> None:
+        from .fairness import DiceMonitor
+        from .models import RandomDice
+        self.tables: Dict[str, object] = {}
+        self.rng = random.Random(seed)
+        self.dice = RandomDice(random.Random(None if seed is None else seed ^ 0xD1CE))
+        self.monitor = DiceMonitor() if monitor else None  # sees every table of the shard
+        self._policies: Dict[str, object] = {}
+
+    def handle(self, batch: Sequence[Request]) -> list:
+        out = []
+        for table_id, op, args in batch:
+            try:
+                out.append(getattr(self, "_" + op)(table_id, *args))
+            except Exception as e:  # reported to the caller, the shard keeps serving
+                out.append(e)
+        return out
+
+    def _table(self, table_id: str):
+        try:
+            return self.tables[table_id]
+        except KeyError:
+            raise KeyError(f"Unknown table {table_id!r}") from None
+
+    def _create(self, table_id: str, names, rules=None) -> None:
+        from .engine import GameEngine
+        from .rules import RuleSet
+        if table_id in self.tables:
+            raise ValueError(f"Table {table_id!r} already exists")
+        g = self.tables[table_id] = GameEngine(list(names), dice_source=self.dice,
+                                               rules=RuleSet.from_dict(rules) if rules else None)
+        if self.monitor is not None:
+            self.monitor.attach(g)
+
+    def _apply(self, table_id: str, action: tuple):
+        from .sim import apply
+        g = self._table(table_id)
+        if action[0] == "start":
+            g.start_turn()
+        else:
+            apply(g, action)
+        return g.current
+
+    def _turn(self, table_id: str, policy: str):
+        from .bots import get_policy
+        from .sim import play_turn
+        p = self._policies.get(policy)
+        if p is None:
+            p = self._policies[policy] = get_policy(policy)
+        g = self._table(table_id)
+        play_turn(g, p, self.rng)
+        return g.is_game_over()
+
+    def _get(self, table_id: str) -> bytes:
+        return snapshot.dumps(self._table(table_id))
+
+    def _drop(self, table_id: str) -> None:
+        self.tables.pop(table_id, None)
+
+    def _export(self, table_id: str) -> bytes:
+        blob = snapshot.dumps(self._table(table_id))
+        del self.tables[table_id]  # only once it is safely serialised
+        return blob
+
+    def _import(self, table_id: str, blob: bytes) -> None:
+        g = snapshot.loads(blob)
+        g.dice_source = self.dice
+        if self.monitor is not None:
+            self.monitor.attach(g)
+        self.tables[table_id] = g
+
+    def _fairness(self, table_id: str) -> Optional[dict]:
+        return self.monitor.report() if self.monitor is not None else None
+
+
+def _serve(conn, seed: Optional[int], monitor: bool) -> None:
+    shard = Shard(seed, monitor)
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            conn.close()
+            return
+        conn.send(shard.handle(batch))
+
+
+class _Remote:
+    """A shard in its own process, spoken to over a pipe."""
+
+    def __init__(self, seed: Optional[int], monitor: bool) -> None:
+        self._conn, child = mp.Pipe()
+        self._proc = mp.Process(target=_serve, args=(child, seed, monitor), daemon=True)
+        self._proc.start()
+        child.close()
+
+    def send(self, batch: Sequence[Request]) -> None:
+        self._conn.send(list(batch))
+
+    def recv(self) -> list:
+        return self._conn.recv()
+
+    def close(self) -> None:
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._conn.close()
+
+
+class _Local:
+    """Same protocol, in-process (tests, single-core hosts)."""
+
+    def __init__(self, seed: Optional[int], monitor: bool) -> None:
+        self.shard = Shard(seed, monitor)
+        self._result: list = []
+
+    def send(self, batch: Sequence[Request]) -> None:
+        self._result = self.shard.handle(batch)
+
+    def recv(self) -> list:
+        return self._result
+
+    def close(self) -> None:
+        pass
+
+
+class TableRouter:
+    """
+    Front process for a sharded game server: routes each table id to a shard
+    by consistent hashing. run() fans a batch of requests out to all shards
+    at once and returns results in request order. With in_process=True shards
+    run inside this process (same routing, no parallelism). With monitor=True
+    every shard watches its tables' dice (abaka.fairness), see fairness().
+    """
+
+    def __init__(self, workers: Optional[int] = None, replicas: int = 64,
+                 seed: Optional[int] = None, in_process: bool = False,
+                 monitor: bool = False) -> None:
+        self._in_process = in_process
+        self._monitor = monitor
+        self._seed = random.randrange(1 << 30) if seed is None else seed
+        self._shards: Dict[int, object] = {}
+        self._next_id = 0
+        self.ring = HashRing(replicas=replicas)
+        self._where: Dict[str, int] = {}  # table id -> shard that holds it
+        self._lock = threading.RLock()
+        for _ in range(mp.cpu_count() if workers is None else workers):
+            self._spawn()
+
+    # ----- shards -----
+    def _spawn(self) -> int:
+        sid = self._next_id
+        self._next_id += 1
+        seed = self._seed + 7919 * sid
+        self._shards[sid] = (_Local if self._in_process else _Remote)(seed, self._monitor)
+        self.ring.add(sid)
+        return sid
+
+    @property
+    def workers(self) -> List[int]:
+        return self.ring.nodes
+
+    def add_worker(self) -> int:
+        """Start a shard and move to it the tables the ring now assigns it."""
+        with self._lock:
+            sid = self._spawn()
+            self._rebalance()
+            return sid
+
+    def drain_worker(self, sid: int) -> None:
+        """Move every table off shard `sid`, then stop it."""
+        with self._lock:
+            if sid not in self._shards:
+                raise KeyError(f"Unknown worker {sid}")
+            if len(self._shards) == 1:
+                raise ValueError("Cannot drain the last worker")
+            self.ring.remove(sid)
+            stuck = self._rebalance()
+            if stuck:
+                self.ring.add(sid)
+                raise RuntimeError(f"Worker {sid} still holds table(s) {', '.join(stuck)}")
+            self._shards.pop(sid).close()
+
+    def _rebalance(self) -> List[str]:
+        """Move tables to the shards the ring now assigns; returns the ids left where they were."""
+        moves = [(tid, old, self.ring.node_for(tid)) for tid, old in self._where.items()]
+        moves = [m for m in moves if m[1] != m[2]]
+        if not moves:
+            return []
+        blobs = self._fan_out([(old, (tid, "export", ())) for tid, old, _ in moves])
+        # a failed export leaves the table on its old shard
+        stuck = [tid for (tid, _, _), blob in zip(moves, blobs) if isinstance(blob, Exception)]
+        moves = [(tid, old, new, blob) for (tid, old, new), blob in zip(moves, blobs)
+                 if not isinstance(blob, Exception)]
+        done = self._fan_out([(new, (tid, "import", (blob,))) for tid, _, new, blob in moves])
+        back = []
+        for (tid, old, new, blob), res in zip(moves, done):
+            if isinstance(res, Exception):
+                back.append((tid, old, blob))
+            else:
+                self._where[tid] = new
+        if back:
+            restored = self._fan_out([(old, (tid, "import", (blob,))) for tid, old, blob in back])
+            lost = [tid for (tid, _, _), res in zip(back, restored) if isinstance(res, Exception)]
+            for tid in lost:
+                del self._where[tid]
+            if lost:
+                raise RuntimeError(f"Table(s) lost while moving between workers: {', '.join(lost)}")
+            stuck += [tid for tid, _, _ in back]
+        return stuck
+
+    def tables(self) -> Dict[int, int]:
+        """Table count per worker."""
+        counts = dict.fromkeys(self._shards, 0)
+        for sid in self._where.values():
+            counts[sid] += 1
+        return counts
+
+    def worker_of(self, table_id: str) -> int:
+        # a table that could not be moved stays on its old shard
+        return self._where.get(table_id, self.ring.node_for(table_id))
+
+    # ----- requests -----
+    def _fan_out(self, routed: Sequence[Tuple[int, Request]]) -> list:
+        by_shard: Dict[int, List[int]] = {}
+        for i, (sid, _) in enumerate(routed):
+            by_shard.setdefault(sid, []).append(i)
+        for sid, idxs in by_shard.items():
+            self._shards[sid].send([routed[i][1] for i in idxs])
+        out: list = [None] * len(routed)
+        for sid, idxs in by_shard.items():
+            for i, res in zip(idxs, self._shards[sid].recv()):
+                out[i] = res
+        return out
+
+    def run(self, requests: Sequence[Request]) -> list:
+        """Results (or exceptions) for a batch of requests, in order."""
+        with self._lock:
+            sids = [self.worker_of(r[0]) for r in requests]
+            out = self._fan_out(list(zip(sids, requests)))
+            for (tid, op, _), sid, res in zip(requests, sids, out):
+                if isinstance(res, Exception):
+                    continue
+                if op in ("create", "import"):
+                    self._where[tid] = sid
+                elif op in ("drop", "export"):
+                    self._where.pop(tid, None)
+            return out
+
+    def _one(self, table_id: str, op: str, *args):
+        res = self.run([(table_id, op, args)])[0]
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+    def create(self, table_id: str, names: Sequence[str], rules=None) -> None:
+        self._one(table_id, "create", list(names), rules.to_dict() if rules is not None else None)
+
+    def apply(self, table_id: str, action: tuple) -> int:
+        """Apply an abaka.sim action (or ("start",)); returns the player to move."""
+        return self._one(table_id, "apply", action)
+
+    def play_turn(self, table_id: str, policy: str = "greedy") -> bool:
+        """One turn by a registered policy; True when the game is over."""
+        return self._one(table_id, "turn", policy)
+
+    def get(self, table_id: str):
+        """A copy of the table's engine."""
+        return snapshot.loads(self._one(table_id, "get"))
+
+    def drop(self, table_id: str) -> None:
+        self._one(table_id, "drop")
+
+    def fairness(self) -> Dict[int, Optional[dict]]:
+        """Dice monitor report per worker (None without monitor=True)."""
+        with self._lock:
+            sids = list(self._shards)
+            return dict(zip(sids, self._fan_out([(sid, ("", "fairness", ())) for sid in sids])))
+
+    def close(self) -> None:
+        with self._lock:
+            for shard in self._shards.values():
+                shard.close()
+            self._shards.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .constants import DENOM, STRICT
+from .engine import GameEngine
+from .models import Category
+from .school import school_outcome
+from .scoring import score_category
+
+# A move is ("score" | "cross", category, slot); a reroll is ("reroll", [indices]).
+Move = Tuple[str, Category, int]
+Action = tuple
+Policy = Callable[[GameEngine, random.Random], Action]
+
+def legal_moves(engine: GameEngine) -> List[Move]:
+    """All score/cross moves the current player may make with the current dice."""
+    p = engine.players[engine.current]
+    moves: List[Move] = []
+    for cat, slots in p.table.items():
+        try:
+            slot = slots.index(None, 0, 3)
+        except ValueError:
+            continue
+        denom = DENOM[cat.index]
+        if denom:
+            try:
+                school_outcome(p, engine.dice, denom, engine.rules)
+            except ValueError:
+                continue
+            moves.append(("score", cat, slot))
+            continue
+        if not STRICT[cat.index] or score_category(engine.dice, cat, rules=engine.rules) > 0:
+            moves.append(("score", cat, slot))
+        moves.append(("cross", cat, slot))
+    return moves
+
+
+def apply(engine: GameEngine, action: Action) -> None:
+    """Apply a policy action to the engine."""
+    kind = action[0]
+    if kind == "reroll":
+        engine.reroll(list(action[1]))
+    elif kind == "score":
+        engine.record_score(action[1], action[2])
+    elif kind == "cross":
+        engine.record_cross(action[1], action[2])
+    else:
+        raise ValueError(f"Unknown action {kind!r}")
+
+
+def move_value(engine: GameEngine, move: Move) -> float:
+    """Cheap one-ply heuristic: points written now, crossing costs a little."""
+    kind, cat, _ = move
+    if kind == "cross":
+        return -5.0
+    denom = DENOM[cat.index]
+    if denom:
+        delta, _ = school_outcome(engine.players[engine.current], engine.dice, denom, engine.rules)
+        return 0.0 if delta is None else float(delta)
+    return float(score_category(engine.dice, cat, first_roll=engine.first_roll, rules=engine.rules))
+
+
+def random_policy(engine: GameEngine, rng: random.Random) -> Action:
+    """Uniform over legal moves; rerolls a random subset a third of the time."""
+    if engine.rolls_left > 0 and rng.random() < 1 / 3:
+        idxs = [i for i in range(len(engine.dice)) if rng.random() < 0.5]
+        if idxs:
+            return ("reroll", idxs)
+    return rng.choice(legal_moves(engine))
+
+
+def greedy_policy(engine: GameEngine, rng: random.Random) -> Action:
+    """Takes the best immediate move, or chases the most common face while that is weak."""
+    moves = legal_moves(engine)
+    best = max(moves, key=lambda m: move_value(engine, m))
+    if engine.rolls_left > 0 and move_value(engine, best) < 20:
+        counts = Counter(d.value for d in engine.dice if not (d.is_joker and d.value == 1))
+        if counts:
+            face = max(counts, key=lambda v: (counts[v], v))
+            idxs = [i for i, d in enumerate(engine.dice)
+                    if d.value != face and not (d.is_joker and d.value == 1)]
+            if idxs:
+                return ("reroll", idxs)
+    return best
+
+
+def play_turn(engine: GameEngine, policy: Policy, rng: random.Random) -> None:
+    """Roll for the current player and let the policy act until it writes a cell."""
+    engine.start_turn()
+    while True:
+        action = policy(engine, rng)
+        apply(engine, action)
+        if action[0] != "reroll":
+            return
+
+
+def play_game(names: Sequence[str], policies: Sequence[Policy],
+              rng: Optional[random.Random] = None,
+              engine: Optional[GameEngine] = None, results=None) -> GameEngine:
+    """
+    Play a full game with one policy per seat and return the finished engine.
+    `results` (an abaka.results.ResultsStore) records the finished game.
+    """
+    rng = rng or random.Random()
+    g = engine if engine is not None else GameEngine(list(names))
+    while not g.is_game_over():
+        play_turn(g, policies[g.current], rng)
+    if results is not None:
+        results.record(g, source="sim")
+    return g
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from itertools import chain
+from typing import Dict, List, Tuple
+
+from .constants import CATS
+from .models import NO_JOKER, Category, Die, Roll
+
+# Compact little-endian snapshot of a GameEngine.
+#
+#   header   : magic "ABK", format version (u8)
+#   engine   : n_players u16, current u16, rolls_left i8, first_roll u8,
+#              row_bonus_claimed bits u16, col_bonus_claimed bits u8, n_dice u8
+#   dice     : n_dice × u8  (face | 0x80 if joker)
+#   rules    : (v2+) length u16 + RuleSet.to_dict() as JSON; 0 = standard rules
+#   player×n : name_len u16 + utf-8 name,
+#              15×4 cells i16, 3 column bonuses i16,
+#              school_balance i32, balance loc (cat u8, slot u8; 0xFF = none),
+#              school_minus_used bits u16, row_bonus_blocked bits u16
+#
+# Cells are i16 with two sentinels: EMPTY (None) and CROSS ('X'), in
+# Category.index order. Version 1 snapshots (no rules section) still load.
+
+MAGIC = b"ABK"
+FORMAT_VERSION = 2
+_READABLE = (1, 2)
+
+EMPTY = -32768
+CROSS = -32767
+
+_CATS: List[Category] = CATS  # cell order: Category.index
+_N_CELLS = len(_CATS) * 4 + 3
+
+_HEADER = struct.Struct("<3sB")
+_ENGINE = struct.Struct("<HHbBHBB")
+_CELLS = struct.Struct(f"<{_N_CELLS}h")
+_TAIL = struct.Struct("<iBBHH")
+_U16 = struct.Struct("<H")
+
+# cells are read in place as a native i16 array on little-endian hosts
+_CAST = sys.byteorder == "little"
+
+# the two sentinels and their cell values (numbers map to themselves)
+_ENC = {None: EMPTY, "X": CROSS}.get
+_DEC = {EMPTY: None, CROSS: "X"}.get
+# (category, first cell, end) of each row in a player's cell block
+_ROWS = [(cat, ci * 4, ci * 4 + 4) for ci, cat in enumerate(_CATS)]
+
+# dice bytes -> Roll, and row_bonus_claimed bits -> flags, filled as seen
+_ROLL_BY_BYTES: Dict[bytes, Roll] = {}
+_CLAIMED: Dict[int, List[bool]] = {}
+
+# decoded rule sets by their JSON bytes: equal variants decode to one object
+_RULES: Dict[bytes, object] = {}
+
+
+def _enc_cell(v) -> int:
+    if v is None:
+        return EMPTY
+    if v == "X":
+        return CROSS
+    v = int(v)
+    if not CROSS < v < 32768:
+        raise ValueError(f"Cell value {v} does not fit the snapshot format")
+    return v
+
+
+def _dec_cell(v: int):
+    if v == EMPTY:
+        return None
+    if v == CROSS:
+        return "X"
+    return v
+
+
+def _enc_rules(rules) -> bytes:
+    from .rules import DEFAULT_RULES
+
+    if rules is None or rules is DEFAULT_RULES or rules == DEFAULT_RULES:
+        return _U16.pack(0)
+    raw = json.dumps(rules.to_dict(), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return _U16.pack(len(raw)) + raw
+
+
+def _dec_rules(raw: bytes):
+    rules = _RULES.get(raw)
+    if rules is None:
+        from .rules import RuleSet
+        rules = _RULES[raw] = RuleSet.from_dict(json.loads(raw))
+    return rules
+
+
+def _dec_dice(raw):
+    """Roll straight from the dice bytes; a Die list only for non-standard dice."""
+    key = bytes(raw)
+    roll = _ROLL_BY_BYTES.get(key)
+    if roll is not None:
+        return roll
+    if len(raw) == 5:
+        code = 0
+        joker = NO_JOKER
+        p = 1
+        for i, b in enumerate(raw):
+            v = b & 0x7F
+            if not 1 <= v <= 6 or (b & 0x80 and joker != NO_JOKER):
+                break
+            if b & 0x80:
+                joker = i
+            code += (v - 1) * p
+            p *= 6
+        else:
+            roll = _ROLL_BY_BYTES[key] = Roll(joker * 6 ** 5 + code)
+            return roll
+    return [Die(b & 0x7F, is_joker=bool(b & 0x80)) for b in raw]
+
+
+def dumps(engine) -> bytes:
+    """Encode the full engine state (players, turn, dice, bonus bookkeeping, rules)."""
+    row_claimed = 0
+    for cat, claimed in engine.row_bonus_claimed.items():
+        if claimed:
+            row_claimed |= 1 << cat.index
+    col_claimed = 0
+    for col, claimed in enumerate(engine.col_bonus_claimed):
+        if claimed:
+            col_claimed |= 1 << col
+
+    out = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION),
+        _ENGINE.pack(len(engine.players), engine.current, engine.rolls_left,
+                     1 if engine.first_roll else 0, row_claimed, col_claimed, len(engine.dice)),
+        bytes((d.value | (0x80 if d.is_joker else 0)) for d in engine.dice),
+        _enc_rules(engine.rules),
+    ]
+
+    minus = [0] * len(engine.players)
+    for (pi, cat), used in engine.school_minus_used.items():
+        if used:
+            minus[pi] |= 1 << cat.index
+    blocked = [0] * len(engine.players)
+    for (pi, cat), used in engine.row_bonus_blocked.items():
+        if used:
+            blocked[pi] |= 1 << cat.index
+
+    for pi, p in enumerate(engine.players):
+        name = p.name.encode("utf-8")
+        out.append(_U16.pack(len(name)))
+        out.append(name)
+        cells = list(chain.from_iterable(map(p.table.__getitem__, _CATS)))
+        cells += p.column_bonus
+        try:
+            out.append(_CELLS.pack(*map(_ENC, cells, cells)))  # _enc_cell for every cell, in C
+        except struct.error:
+            out.append(_CELLS.pack(*map(_enc_cell, cells)))  # raises the descriptive ValueError
+        if p.school_balance_loc is None:
+            loc_cat, loc_slot = 0xFF, 0xFF
+        else:
+            loc_cat, loc_slot = p.school_balance_loc[0].index, p.school_balance_loc[1]
+        out.append(_TAIL.pack(p.school_balance, loc_cat, loc_slot, minus[pi], blocked[pi]))
+    return b"".join(out)
+
+
+def loads(buf, offset: int = 0) -> "GameEngine":
+    """Decode a snapshot produced by dumps() into a fresh GameEngine."""
+    return read(buf, offset)[0]
+
+
+def read(buf, offset: int = 0) -> Tuple["GameEngine", int]:
+    """
+    Decode the snapshot at `offset` of any buffer (bytes, memoryview, mmap)
+    without copying it. Returns the engine and the offset just past the
+    snapshot, so concatenated snapshots can be walked in one mapping.
+    """
+    from .engine import GameEngine
+    from .player import PlayerState
+
+    view = memoryview(buf)
+    magic, version = _HEADER.unpack_from(view, offset)
+    if magic != MAGIC:
+        raise ValueError("Not an Abaka snapshot")
+    if version not in _READABLE:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    off = offset + _HEADER.size
+    n_players, current, rolls_left, first_roll, row_claimed, col_claimed, n_dice = \
+        _ENGINE.unpack_from(view, off)
+    off += _ENGINE.size
+
+    dice = _dec_dice(view[off:off + n_dice])
+    off += n_dice
+
+    rules = None
+    if version >= 2:
+        (n,) = _U16.unpack_from(view, off)
+        off += _U16.size
+        if n:
+            rules = _dec_rules(bytes(view[off:off + n]))
+            off += n
+
+    g = GameEngine([], rules=rules)
+    g.current = current
+    g.rolls_left = rolls_left
+    g.first_roll = bool(first_roll)
+    g.dice = dice
+    claimed = _CLAIMED.get(row_claimed)
+    if claimed is None:
+        claimed = _CLAIMED[row_claimed] = [bool(row_claimed >> i & 1) for i in range(len(_CATS))]
+    g.row_bonus_claimed = dict(zip(_CATS, claimed))
+    g.col_bonus_claimed = [bool(col_claimed >> c & 1) for c in range(3)]
+
+    cats = _CATS
+    for pi in range(n_players):
+        (n,) = _U16.unpack_from(view, off)
+        off += _U16.size
+        # PlayerState without __init__: every field is set from the snapshot
+        p = PlayerState.__new__(PlayerState)
+        p.name = str(view[off:off + n], "utf-8")
+        off += n
+        if _CAST:
+            row = view[off:off + _CELLS.size].cast("h").tolist()
+        else:
+            row = list(_CELLS.unpack_from(view, off))
+        off += _CELLS.size
+        row = list(map(_DEC, row, row))  # _dec_cell for every cell, in C
+        p.table = {cat: row[a:b] for cat, a, b in _ROWS}
+        p.column_bonus = row[-3:]
+        balance, loc_cat, loc_slot, minus, blocked = _TAIL.unpack_from(view, off)
+        off += _TAIL.size
+        p.school_balance = balance
+        p.school_balance_loc = None if loc_cat == 0xFF else (cats[loc_cat], loc_slot)
+        while minus:
+            low = minus & -minus
+            g.school_minus_used[(pi, cats[low.bit_length() - 1])] = True
+            minus ^= low
+        while blocked:
+            low = blocked & -blocked
+            g.row_bonus_blocked[(pi, cats[low.bit_length() - 1])] = True
+            blocked ^= low
+        g.players.append(p)
+    g.publish()
+    return g, off
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Set
+
+from . import snapshot
+
+
+class SessionStore(ABC):
+    """Minimal interface for keeping GameEngine instances by session/game id."""
+
+    @abstractmethod
+    def get(self, key: str):
+        ...
+
+    @abstractmethod
+    def put(self, key: str, engine) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class SQLiteBacking:
+    """Durable key → snapshot blob table in a local SQLite database (WAL mode)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " key TEXT PRIMARY KEY, data BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def save(self, key: str, blob: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, data, updated) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+
+    def load(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE key = ?", (key,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LRUSessionStore(SessionStore):
+    """
+    Keeps up to `capacity` hot engines in memory. Least recently used games are
+    evicted to the backing database and restored transparently by get().
+
+    With write_through=True (default) every put() also persists the snapshot,
+    so a process restart loses nothing; otherwise snapshots are written only
+    on eviction and flush().
+    """
+
+    def __init__(self, capacity: int = 128, backing: Optional[SQLiteBacking] = None,
+                 write_through: bool = True) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.backing = backing
+        self.write_through = write_through and backing is not None
+        self._hot: "OrderedDict[str, object]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            engine = self._hot.get(key)
+            if engine is not None:
+                self._hot.move_to_end(key)
+                self.hits += 1
+                return engine
+            self.misses += 1
+            if self.backing is None:
+                return None
+            blob = self.backing.load(key)
+            if blob is None:
+                return None
+            engine = snapshot.loads(blob)
+            self._insert(key, engine)
+            return engine
+
+    def put(self, key: str, engine) -> None:
+        with self._lock:
+            if self.write_through:
+                self.backing.save(key, snapshot.dumps(engine))
+            else:
+                self._dirty.add(key)
+            self._insert(key, engine)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._hot.pop(key, None)
+            self._dirty.discard(key)
+            if self.backing is not None:
+                self.backing.delete(key)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self.backing is None:
+                return
+            for key in list(self._dirty):
+                self.backing.save(key, snapshot.dumps(self._hot[key]))
+            self._dirty.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self.backing is not None:
+            self.backing.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._hot
+
+    def __len__(self) -> int:
+        return len(self._hot)
+
+    def _insert(self, key: str, engine) -> None:
+        self._hot[key] = engine
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.capacity:
+            old_key, old_engine = self._hot.popitem(last=False)
+            self.evictions += 1
+            if old_key in self._dirty:
+                self._dirty.discard(old_key)
+                if self.backing is not None:
+                    self.backing.save(old_key, snapshot.dumps(old_engine))
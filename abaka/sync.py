@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .bonus import column_bonus_cells, row_cells
+from .constants import CATS
+
+
+class SyncError(RuntimeError):
+    """A delta does not apply to the client's version; resync from a snapshot."""
+
+
+def flatten_state(engine) -> Dict[str, object]:
+    """
+    Flat {key: value} view of everything a remote scoreboard shows.
+    Keys are short strings so deltas stay compact on the wire:
+      'cur', 'rolls', 'first', 'dice'   – turn state
+      '<p>.<CAT>.<slot>'                – table cells (slot 3 = row bonus)
+      '<p>.B.<col>'                     – column bonuses
+      '<p>.bal'                         – school balance
+    """
+    state: Dict[str, object] = {
+        "cur": engine.current,
+        "rolls": engine.rolls_left,
+        "first": engine.first_roll,
+        "dice": [[d.value, 1 if d.is_joker else 0] for d in engine.dice],
+    }
+    for pi, p in enumerate(engine.players):
+        for cat in CATS:
+            for s, v in enumerate(row_cells(engine, pi, cat)):
+                state[f"{pi}.{cat.name}.{s}"] = v
+        for s, v in enumerate(column_bonus_cells(engine, pi)):
+            state[f"{pi}.B.{s}"] = v
+        state[f"{pi}.bal"] = p.school_balance
+    return state
+
+
+_MISSING = object()
+
+
+def _encode(msg: Dict[str, object]) -> bytes:
+    return json.dumps(msg, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class StateSync:
+    """
+    Assigns monotonic versions to a GameEngine and produces compact deltas.
+
+    Call commit() after every mutation (turn start, reroll, score, cross).
+    Each version's encoded delta is kept in a bounded log so clients can
+    resume with a delta chain; clients too far behind get a snapshot.
+    """
+
+    def __init__(self, engine, history: int = 256, hub: Optional["SpectatorHub"] = None) -> None:
+        self.engine = engine
+        self.version: int = 0
+        self.hub = hub
+        self._state = flatten_state(engine)
+        self._log: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+        self._snapshot: Optional[Tuple[int, bytes]] = None
+
+    def commit(self) -> Optional[bytes]:
+        """Diff against the last committed state; return the encoded delta (None if unchanged)."""
+        new = flatten_state(self.engine)
+        old = self._state
+        changed = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+        if not changed:
+            return None
+        self._state = new
+        self.version += 1
+        buf = _encode({"v": self.version, "base": self.version - 1, "set": changed})
+        self._log.append((self.version, buf))
+        if self.hub is not None:
+            self.hub.publish(buf)
+        return buf
+
+    def snapshot(self) -> bytes:
+        """Full state at the current version (encoded once per version)."""
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            names = [p.name for p in self.engine.players]
+            msg = {"v": self.version, "names": names, "snapshot": self._state}
+            self._snapshot = (self.version, _encode(msg))
+        return self._snapshot[1]
+
+    def since(self, version: Optional[int]) -> List[bytes]:
+        """Messages that bring a client at `version` up to date."""
+        if version == self.version:
+            return []
+        if version is None or version < 0 or version > self.version:
+            return [self.snapshot()]
+        if not self._log or self._log[0][0] > version + 1:
+            return [self.snapshot()]  # fell out of the delta log
+        return [buf for v, buf in self._log if v > version]
+
+
+class SyncClient:
+    """Client-side mirror: applies snapshots and delta chains in order."""
+
+    def __init__(self) -> None:
+        self.version: Optional[int] = None
+        self.names: List[str] = []
+        self.state: Dict[str, object] = {}
+
+    def apply(self, buf: bytes) -> None:
+        msg = json.loads(buf)
+        if "snapshot" in msg:
+            self.state = dict(msg["snapshot"])
+            self.names = list(msg["names"])
+            self.version = msg["v"]
+            return
+        if msg["base"] != self.version:
+            raise SyncError(f"Delta v{msg['v']} needs base v{msg['base']}, client is at v{self.version}")
+        self.state.update(msg["set"])
+        self.version = msg["v"]
+
+
+class Subscriber:
+    """One spectator connection: a bounded queue of shared encoded buffers."""
+
+    def __init__(self, max_pending: int) -> None:
+        self.max_pending = max_pending
+        self.dropped = False
+        self._queue: Deque[bytes] = deque()
+
+    def drain(self) -> List[bytes]:
+        out = list(self._queue)
+        self._queue.clear()
+        return out
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+
+class SpectatorHub:
+    """
+    Fans encoded deltas out to spectators. Every subscriber queues the same
+    bytes object (no per-client encoding); a subscriber that falls more than
+    `max_pending` messages behind is dropped instead of stalling the table.
+    """
+
+    def __init__(self, max_pending: int = 64) -> None:
+        self.max_pending = max_pending
+        self._subs: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, sync: Optional[StateSync] = None, version: Optional[int] = None) -> Subscriber:
+        sub = Subscriber(self.max_pending)
+        with self._lock:
+            if sync is not None:
+                sub._queue.extend(sync.since(version))
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def publish(self, buf: bytes) -> None:
+        with self._lock:
+            keep: List[Subscriber] = []
+            for sub in self._subs:
+                if len(sub._queue) >= sub.max_pending:
+                    sub.dropped = True
+                    sub._queue.clear()
+                    continue
+                sub._queue.append(buf)
+                keep.append(sub)
+            self._subs = keep
+
+    def __len__(self) -> int:
+        return len(self._subs)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import argparse
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Shared result block (doubles), laid out for n policies:
+#   [0, n*n)        pairwise wins  W[i][j] (i finished above j; ties count 0.5)
+#   [n*n, 2*n*n)    pairwise games N[i][j]
+#   then n games played, n score sums, n table wins (first place)
+_SHARED = None
+_N = 0
+
+
+def _layout(n: int) -> Tuple[int, int, int, int, int]:
+    nn = n * n
+    return 0, nn, 2 * nn, 2 * nn + n, 2 * nn + 2 * n
+
+
+def _init_worker(shared, n: int) -> None:
+    global _SHARED, _N
+    _SHARED, _N = shared, n
+
+
+def play_table(policy_names: Sequence[str], games: int, seed: int) -> Dict[str, list]:
+    """Play `games` games at one table; seats rotate every game. Returns per-seat results."""
+    from .bots import get_policy
+    from .engine import GameEngine
+    from .models import RandomDice
+    from .sim import play_game
+
+    dice = RandomDice(random.Random(seed))
+    rng = random.Random(seed ^ 0x5EED)
+    policies = [get_policy(n) for n in policy_names]
+    k = len(policies)
+    names = [f"S{i}" for i in range(k)]
+    scores: List[List[int]] = [[] for _ in range(k)]
+    for g in range(games):
+        rot = g % k
+        order = [(rot + s) % k for s in range(k)]  # seat s is played by policy order[s]
+        engine = play_game(names, [policies[i] for i in order], rng,
+                           engine=GameEngine(names, dice_source=dice))
+        final = [p.calculate_score() for p in engine.players]
+        for s, i in enumerate(order):
+            scores[i].append(final[s])
+    return {"scores": scores}
+
+
+def _run_batch(task: Tuple[Tuple[int, ...], Tuple[str, ...], int, int]) -> int:
+    """Worker entry: play a batch and fold it into the shared block under one lock."""
+    idx, names, games, seed = task
+    res = play_table(names, games, seed)["scores"]
+    n = _N
+    w0, n0, g0, s0, f0 = _layout(n)
+    k = len(idx)
+    local: Dict[int, float] = {}
+    for gi in range(games):
+        final = [res[s][gi] for s in range(k)]
+        best = max(final)
+        for s, i in enumerate(idx):
+            local[g0 + i] = local.get(g0 + i, 0.0) + 1
+            local[s0 + i] = local.get(s0 + i, 0.0) + final[s]
+            if final[s] == best:
+                local[f0 + i] = local.get(f0 + i, 0.0) + 1.0 / final.count(best)
+        for a, b in combinations(range(k), 2):
+            i, j = idx[a], idx[b]
+            if i == j:
+                continue
+            if final[a] > final[b]:
+                wa = 1.0
+            elif final[a] < final[b]:
+                wa = 0.0
+            else:
+                wa = 0.5
+            local[w0 + i * n + j] = local.get(w0 + i * n + j, 0.0) + wa
+            local[w0 + j * n + i] = local.get(w0 + j * n + i, 0.0) + 1.0 - wa
+            local[n0 + i * n + j] = local.get(n0 + i * n + j, 0.0) + 1
+            local[n0 + j * n + i] = local.get(n0 + j * n + i, 0.0) + 1
+    with _SHARED.get_lock():
+        for pos, v in local.items():
+            _SHARED[pos] += v
+    return games
+
+
+def round_robin(n_policies: int, table_size: int) -> List[Tuple[int, ...]]:
+    """Every combination of policies at a table (padded by cycling if there are too few)."""
+    if n_policies >= table_size:
+        return list(combinations(range(n_policies), table_size))
+    return [tuple(i % n_policies for i in range(table_size))]
+
+
+def swiss_tables(ratings: Sequence[float], table_size: int, rng: random.Random) -> List[Tuple[int, ...]]:
+    """Group policies of similar rating; leftovers join the last table's neighbours."""
+    order = sorted(range(len(ratings)), key=lambda i: (-ratings[i], rng.random()))
+    if len(order) <= table_size:
+        return round_robin(len(order), table_size)
+    tables = []
+    for start in range(0, len(order), table_size):
+        group = order[start:start + table_size]
+        if len(group) < table_size:
+            group = order[-table_size:]
+        tables.append(tuple(group))
+    return tables
+
+
+def bradley_terry(wins: List[List[float]], games: List[List[float]],
+                  iters: int = 200) -> Tuple[List[float], List[float]]:
+    """
+    Elo-scale ratings (mean 1500) and standard errors from pairwise results,
+    by minorisation-maximisation on the Bradley–Terry likelihood.
+    """
+    n = len(wins)
+    # half a virtual draw against every opponent keeps unbeaten policies finite
+    w = [[wins[i][j] + (0.5 if i != j else 0.0) for j in range(n)] for i in range(n)]
+    g = [[games[i][j] + (1.0 if i != j else 0.0) for j in range(n)] for i in range(n)]
+    p = [1.0] * n
+    for _ in range(iters):
+        new = []
+        for i in range(n):
+            num = sum(w[i])
+            den = sum(g[i][j] / (p[i] + p[j]) for j in range(n) if j != i)
+            new.append(num / den if den else p[i])
+        geo = math.exp(sum(math.log(x) for x in new) / n)
+        p = [x / geo for x in new]
+    scale = 400.0 / math.log(10)
+    ratings = [1500.0 + scale * math.log(x) for x in p]
+    errors = []
+    for i in range(n):
+        info = sum(g[i][j] * p[i] * p[j] / (p[i] + p[j]) ** 2 for j in range(n) if j != i)
+        errors.append(scale / math.sqrt(info) if info else float("inf"))
+    return ratings, errors
+
+
+class TournamentResult:
+    def __init__(self, names: List[str], block: List[float], elapsed: float) -> None:
+        n = len(names)
+        w0, n0, g0, s0, f0 = _layout(n)
+        self.names = names
+        self.wins = [[block[w0 + i * n + j] for j in range(n)] for i in range(n)]
+        self.pair_games = [[block[n0 + i * n + j] for j in range(n)] for i in range(n)]
+        self.games = [int(block[g0 + i]) for i in range(n)]
+        self.mean_score = [block[s0 + i] / block[g0 + i] if block[g0 + i] else 0.0 for i in range(n)]
+        self.firsts = [block[f0 + i] for i in range(n)]
+        self.ratings, self.errors = bradley_terry(self.wins, self.pair_games)
+        self.elapsed = elapsed
+
+    def table(self, z: float = 1.96) -> List[str]:
+        rows = sorted(range(len(self.names)), key=lambda i: -self.ratings[i])
+        lines = [f"{'#':>3} {'policy':<16} {'rating':>8} {'95% CI':>10} {'games':>9} {'1st %':>7} {'avg':>8}"]
+        for rank, i in enumerate(rows, 1):
+            g = self.games[i] or 1
+            lines.append(f"{rank:>3} {self.names[i]:<16} {self.ratings[i]:>8.1f} "
+                         f"{'±' + format(z * self.errors[i], '.1f'):>10} {self.games[i]:>9} "
+                         f"{100 * self.firsts[i] / g:>6.1f}% {self.mean_score[i]:>8.1f}")
+        return lines
+
+
+def run_tournament(policies: Sequence[str], games: int, table_size: int = 2,
+                   fmt: str = "round-robin", rounds: int = 5, workers: Optional[int] = None,
+                   batch: int = 50, seed: int = 0) -> TournamentResult:
+    """
+    Play about `games` games per table pairing (round-robin) or per Swiss round
+    table, spread in batches over a process pool. Workers fold results into a
+    shared-memory block, so only batch sizes travel back through the pool.
+    """
+    from .bots import get_policy
+    for name in policies:
+        get_policy(name)  # fail fast on typos
+    names = list(policies)
+    n = len(names)
+    shared = mp.Array("d", 2 * n * n + 3 * n)
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+
+    def tasks_for(tables: List[Tuple[int, ...]]):
+        out = []
+        for t in tables:
+            left = games
+            while left > 0:
+                b = min(batch, left)
+                out.append((t, tuple(names[i] for i in t), b, rng.getrandbits(63)))
+                left -= b
+        return out
+
+    t0 = time.perf_counter()
+    if workers <= 1:
+        _init_worker(shared, n)
+        run = lambda tasks: [_run_batch(t) for t in tasks]  # noqa: E731
+        pool = None
+    else:
+        pool = mp.Pool(workers, initializer=_init_worker, initargs=(shared, n))
+        run = lambda tasks: pool.map(_run_batch, tasks, chunksize=1)  # noqa: E731
+    try:
+        if fmt == "round-robin":
+            run(tasks_for(round_robin(n, table_size)))
+        elif fmt == "swiss":
+            ratings = [1500.0] * n
+            for _ in range(rounds):
+                run(tasks_for(swiss_tables(ratings, table_size, rng)))
+                ratings = TournamentResult(names, list(shared), 0.0).ratings
+        else:
+            raise ValueError(f"Unknown tournament format {fmt!r}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return TournamentResult(names, list(shared), time.perf_counter() - t0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .bots import policy_names
+    ap = argparse.ArgumentParser(prog="python -m abaka tournament",
+                                 description="Rate registered policies over many self-play games.")
+    ap.add_argument("policies", nargs="*", help=f"policy names (default: all of {', '.join(policy_names())})")
+    ap.add_argument("--games", type=int, default=200, help="games per table pairing (per round for swiss)")
+    ap.add_argument("--players", type=int, default=2, help="players per table")
+    ap.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin")
+    ap.add_argument("--rounds", type=int, default=5, help="swiss rounds")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--batch", type=int, default=50, help="games per worker task")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    if args.players < 2:
+        ap.error("--players must be at least 2")
+
+    policies = args.policies or policy_names()
+    res = run_tournament(policies, args.games, args.players, args.format, args.rounds,
+                         args.workers, args.batch, args.seed)
+    total = sum(res.games) // args.players
+    for line in res.table():
+        print(line)
+    print(f"{total} games in {res.elapsed:.1f}s ({total / max(res.elapsed, 1e-9):,.0f} games/s)")
+    return 0
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .bonus import column_bonus_cells, row_cells
+from .constants import COL_W, COMBO_CATS, ROW_W, SCHOOL_CATS
+from .models import Category
+from .render import _fmt_cell, render_scoreboard
+
+# Screen line of each row in render_scoreboard() output (0-based):
+# blank, header, separator, school rows, separator, combo rows, separator,
+# column bonuses, separator, totals.
+HEADER_LINE = 1
+_ROW_LINE: Dict[Category, int] = {cat: 3 + i for i, cat in enumerate(SCHOOL_CATS)}
+_ROW_LINE.update({cat: 4 + len(SCHOOL_CATS) + i for i, cat in enumerate(COMBO_CATS)})
+BONUS_LINE = 5 + len(SCHOOL_CATS) + len(COMBO_CATS)
+TOTAL_LINE = BONUS_LINE + 2
+STATUS_LINE = TOTAL_LINE + 2
+
+_SCHOOL = frozenset(SCHOOL_CATS)
+
+# offsets of the four cells inside "c0 c1 c2 | bonus"
+_CELL_X = (0, 4, 8, 14)
+
+Key = Tuple  # ("cell", p, cat, slot) | ("B", p, col) | ("tot", p) | ("mark", p) | ("status",)
+
+
+def _player_x(i: int) -> int:
+    """Column where player i's cells start: row label, then '| ' or '|| ' per player."""
+    x = ROW_W + 1 + 2
+    if i:
+        x += (COL_W + 3) + (i - 1) * (COL_W + 4) + 1
+    return x
+
+
+def _status(engine) -> str:
+    p = engine.players[engine.current]
+    if engine.is_game_over():
+        return "Game over"
+    dice = " ".join(repr(d) for d in engine.dice) or "-"
+    return f"{p.name} to play  dice: {dice}  rolls left: {engine.rolls_left}"
+
+
+class TerminalScoreboard:
+    """
+    Scoreboard that redraws in place with ANSI cursor addressing.
+
+    The first draw() paints the whole board; later updates compare the new
+    cell texts with the last frame and only move the cursor to, and rewrite,
+    the cells, totals, current-player marker and status line that changed.
+    Passing the rows a move touched keeps the comparison itself proportional
+    to the change instead of to the board.
+    """
+
+    def __init__(self, stream=None, top: int = 1, clear: bool = True) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.top = top
+        self.clear = clear
+        self.frame: Dict[Key, str] = {}
+        self.players = 0
+        self.bytes_written = 0
+        self.cells_written = 0
+
+    # ----- frame model -----
+    @staticmethod
+    def _pos(key: Key) -> Tuple[int, int]:
+        kind = key[0]
+        if kind == "cell":
+            return _ROW_LINE[key[2]], _player_x(key[1]) + _CELL_X[key[3]]
+        if kind == "B":
+            return BONUS_LINE, _player_x(key[1]) + _CELL_X[key[2]]
+        if kind == "tot":
+            return TOTAL_LINE, _player_x(key[1])
+        if kind == "mark":
+            return HEADER_LINE, _player_x(key[1]) - 1
+        return STATUS_LINE, 0
+
+    @staticmethod
+    def _fragments(engine, rows: Iterable[Category], players: Iterable[int]) -> Dict[Key, str]:
+        out: Dict[Key, str] = {}
+        for pi in players:
+            for cat in rows:
+                for s, v in enumerate(row_cells(engine, pi, cat)):
+                    out[("cell", pi, cat, s)] = _fmt_cell(v)
+            for c, v in enumerate(column_bonus_cells(engine, pi)):
+                out[("B", pi, c)] = _fmt_cell(v)
+            out[("mark", pi)] = ">" if pi == engine.current else " "
+        out[("status",)] = _status(engine)
+        return out
+
+    def _totals(self, engine, players: Iterable[int]) -> Dict[Key, str]:
+        return {("tot", pi): f"{engine.players[pi].calculate_score():>{COL_W}}" for pi in players}
+
+    # ----- drawing -----
+    def _write(self, s: str) -> None:
+        self.stream.write(s)
+        self.bytes_written += len(s.encode("utf-8"))
+
+    def draw(self, engine) -> None:
+        """Paint the full board and remember it as the current frame."""
+        self.players = len(engine.players)
+        lines = render_scoreboard(engine)
+        out = ["\x1b[2J" if self.clear else "", f"\x1b[{self.top};1H"]
+        out.append("\x1b[K\r\n".join(lines))
+        out.append("\x1b[K\r\n\r\n")
+        self._write("".join(out))
+        everyone = range(self.players)
+        self.frame = self._fragments(engine, list(Category), everyone)
+        self.frame.update(self._totals(engine, everyone))
+        # render_scoreboard has no marker or status line: paint them now
+        self._emit({k: v for k, v in self.frame.items() if k[0] in ("mark", "status")})
+        self.stream.flush()
+
+    def update(self, engine, rows: Optional[Iterable[Category]] = None) -> int:
+        """
+        Redraw what changed since the last frame; returns the number of
+        fragments rewritten. `rows` limits the comparison to the rows a move
+        touched (column bonuses, totals, markers and status are always checked);
+        None compares every row.
+        """
+        if not self.frame or len(engine.players) != self.players:
+            self.draw(engine)
+            return len(self.frame)
+        if rows is None:
+            rows = list(Category)
+        else:
+            rows = list(rows)
+            if any(cat in _SCHOOL for cat in rows):
+                # a school write also crosses the previous balance cell in another school row
+                rows = list(dict.fromkeys(rows + SCHOOL_CATS))
+        new = self._fragments(engine, rows, range(self.players))
+        changed = {k: v for k, v in new.items() if self.frame.get(k) != v}
+        # totals only move when one of the player's cells did
+        dirty = {k[1] for k in changed if k[0] in ("cell", "B")}
+        changed.update({k: v for k, v in self._totals(engine, dirty).items() if self.frame.get(k) != v})
+        self._emit(changed)
+        self.frame.update(changed)
+        self.stream.flush()
+        return len(changed)
+
+    def _emit(self, fragments: Dict[Key, str]) -> None:
+        if not fragments:
+            return
+        out: List[str] = []
+        for key in sorted(fragments, key=self._pos):
+            line, col = self._pos(key)
+            text = fragments[key]
+            tail = "\x1b[K" if key[0] == "status" else ""  # status text length varies
+            out.append(f"\x1b[{self.top + line};{col + 1}H{text}{tail}")
+        out.append(f"\x1b[{self.top + STATUS_LINE + 1};1H")  # park the cursor below the board
+        self._write("".join(out))
+        self.cells_written += len(fragments)
+
+
+class LineScoreboard:
+    """Full reprint after every move (what print_scoreboard does), same interface."""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+
+    def draw(self, engine) -> None:
+        for line in render_scoreboard(engine):
+            print(line, file=self.stream)
+
+    def update(self, engine, rows: Optional[Iterable[Category]] = None) -> int:
+        self.draw(engine)
+        return 0
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import random
+import threading
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from .bonus import open_bonuses
+from .constants import CATS, N_CATS
+from .models import RandomDice
+
+# Vectorized self-play environment for RL training.
+#
+# The learner plays seat 0 of every game; the other seats are played inside
+# the environment by a registered policy (abaka.bots). Actions are integers:
+#
+#   [0, N_CATS)            write the row (leftmost free slot)
+#   [N_CATS, 2*N_CATS)     cross the row
+#   [2*N_CATS, N_ACTIONS)  reroll: bit i of (a - 2*N_CATS + 1) rerolls die i
+#
+# Observations are OBS_SIZE floats (see observe()). Finished games report
+# done=1 with their last reward and restart in the same step.
+N_WRITES = 2 * N_CATS
+N_ACTIONS = N_WRITES + 31
+OBS_SIZE = 30 + 5 + 3 + 1 + 2 * N_CATS + 3 + 3
+
+# control word: what workers do after the "go" barrier
+_STEP, _RESET, _CLOSE = 0, 1, 2
+
+
+def observe(engine, seat: int = 0) -> List[float]:
+    """
+    Features of `seat`'s decision: dice faces one-hot per position (30),
+    joker position (5), rolls left one-hot (3), first roll, per row the filled
+    fraction and whether its bonus is still open (2 × 15), open column
+    bonuses (3), school balance / 10, own score / 100 and the best other
+    score / 100.
+    """
+    out = [0.0] * OBS_SIZE
+    dice = engine.dice
+    for i, d in enumerate(dice):
+        out[i * 6 + d.value - 1] = 1.0
+        if d.is_joker:
+            out[30 + i] = 1.0
+    out[35 + engine.rolls_left] = 1.0
+    out[38] = 1.0 if engine.first_roll else 0.0
+    p = engine.players[seat]
+    rows, cols = open_bonuses(engine, seat)
+    for cat in CATS:
+        i = cat.index
+        out[39 + i] = (3 - p.table[cat][:3].count(None)) / 3.0
+        out[39 + N_CATS + i] = 1.0 if rows[i] else 0.0
+    base = 39 + 2 * N_CATS
+    for c in range(3):
+        out[base + c] = 1.0 if cols[c] else 0.0
+    out[base + 3] = p.school_balance / 10.0
+    scores = [q.calculate_score() for q in engine.players]
+    out[base + 4] = scores[seat] / 100.0
+    out[base + 5] = max((s for i, s in enumerate(scores) if i != seat), default=0) / 100.0
+    return out
+
+
+def legal_mask(engine) -> bytearray:
+    """1 for every legal action of the current player."""
+    from .sim import legal_moves
+    mask = bytearray(N_ACTIONS)
+    for kind, cat, _ in legal_moves(engine):
+        mask[cat.index if kind == "score" else N_CATS + cat.index] = 1
+    if engine.rolls_left > 0:
+        mask[N_WRITES:] = b"\x01" * (N_ACTIONS - N_WRITES)
+    return mask
+
+
+def to_action(engine, a: int) -> tuple:
+    """The sim action (see abaka.sim.apply) for action index `a`."""
+    if a >= N_WRITES:
+        bits = a - N_WRITES + 1
+        return ("reroll", [i for i in range(5) if bits >> i & 1])
+    cat = CATS[a % N_CATS]
+    slot = engine.players[engine.current].table[cat].index(None, 0, 3)
+    return ("score" if a < N_CATS else "cross", cat, slot)
+
+
+class _Slice:
+    """The games of envs [lo, hi), writing straight into the shared arrays."""
+
+    def __init__(self, arrays, lo: int, hi: int, players: int, opponent: str,
+                 reward: str, seed: int) -> None:
+        from .bots import get_policy
+        self.obs, self.rewards, self.dones, self.masks, self.actions, _ = arrays
+        self.lo, self.hi = lo, hi
+        self.names = [f"P{i + 1}" for i in range(players)]
+        self.opponent = get_policy(opponent)
+        self.win_reward = reward == "win"
+        self.rng = random.Random(seed)
+        self.dice = RandomDice(random.Random(seed ^ 0xD1CE))
+        self.games = [None] * (hi - lo)
+        # flat views: one slice assignment per env and array
+        self._obs = memoryview(self.obs).cast("B").cast("f")
+        self._masks = memoryview(self.masks).cast("B")
+
+    def reset(self) -> None:
+        for i in range(self.lo, self.hi):
+            self._new_game(i)
+            self.rewards[i] = 0.0
+            self.dones[i] = 0
+
+    def step(self) -> None:
+        from .sim import apply
+        for i in range(self.lo, self.hi):
+            g = self.games[i - self.lo]
+            before = g.players[0].calculate_score()
+            action = to_action(g, self.actions[i])
+            apply(g, action)
+            if action[0] != "reroll":
+                self._opponents(g)
+            done = g.is_game_over()
+            if self.win_reward:
+                reward = 0.0
+                if done:
+                    scores = [p.calculate_score() for p in g.players]
+                    reward = 1.0 / scores.count(max(scores)) if scores[0] == max(scores) else 0.0
+            else:
+                reward = float(g.players[0].calculate_score() - before)
+            self.rewards[i] = reward
+            self.dones[i] = 1 if done else 0
+            if done:
+                self._new_game(i)
+            else:
+                self._write(i, g)
+
+    def _new_game(self, i: int) -> None:
+        from .engine import GameEngine
+        g = self.games[i - self.lo] = GameEngine(self.names, dice_source=self.dice)
+        g.start_turn()
+        self._write(i, g)
+
+    def _opponents(self, g) -> None:
+        from .sim import play_turn
+        while g.current != 0 and not g.is_game_over():
+            play_turn(g, self.opponent, self.rng)
+        if not g.is_game_over():
+            g.start_turn()
+
+    def _write(self, i: int, g) -> None:
+        self._obs[i * OBS_SIZE:(i + 1) * OBS_SIZE] = array("f", observe(g, 0))
+        self._masks[i * N_ACTIONS:(i + 1) * N_ACTIONS] = legal_mask(g)
+
+
+def _worker(arrays, lo: int, hi: int, players: int, opponent: str, reward: str,
+            seed: int, barrier) -> None:
+    ctrl = arrays[5]
+    try:
+        env = _Slice(arrays, lo, hi, players, opponent, reward, seed)
+        while True:
+            barrier.wait()
+            cmd = ctrl[0]
+            if cmd == _CLOSE:
+                return
+            if cmd == _RESET:
+                env.reset()
+            else:
+                env.step()
+            barrier.wait()
+    except threading.BrokenBarrierError:
+        return
+    except BaseException:
+        barrier.abort()  # wake the trainer instead of leaving it waiting
+        raise
+
+
+class VectorEnv:
+    """
+    `n_envs` games stepped in lockstep by `workers` processes (workers=0:
+    in-process). Observations, rewards, done flags and action masks live in
+    shared arrays that workers write in place; the trainer reads them as
+    memoryviews (`obs[i, j]`, or numpy.frombuffer) without copying or
+    pickling. A step is one barrier round trip for all workers; a worker that
+    dies or gives no answer within `timeout` seconds fails the step.
+    """
+
+    def __init__(self, n_envs: int, workers: Optional[int] = None, players: int = 2,
+                 opponent: str = "greedy", reward: str = "score",
+                 seed: Optional[int] = None, timeout: float = 60.0) -> None:
+        if n_envs < 1:
+            raise ValueError("n_envs must be >= 1")
+        if reward not in ("score", "win"):
+            raise ValueError("reward must be 'score' or 'win'")
+        from .bots import get_policy
+        get_policy(opponent)  # unknown names fail here, not in the workers
+        self.n_envs = n_envs
+        self.timeout = timeout
+        self.workers = min(n_envs, mp.cpu_count() if workers is None else workers)
+        arrays = (
+            mp.RawArray("f", n_envs * OBS_SIZE),
+            mp.RawArray("f", n_envs),
+            mp.RawArray("B", n_envs),
+            mp.RawArray("B", n_envs * N_ACTIONS),
+            mp.RawArray("i", n_envs),
+            mp.RawArray("i", 1),
+        )
+        self._arrays = arrays
+        self._actions, self._ctrl = arrays[4], arrays[5]
+        self.obs = memoryview(arrays[0]).cast("B").cast("f", (n_envs, OBS_SIZE))
+        self.rewards = memoryview(arrays[1]).cast("B").cast("f")
+        self.dones = memoryview(arrays[2]).cast("B")
+        self.masks = memoryview(arrays[3]).cast("B", (n_envs, N_ACTIONS))
+        self._flat_masks = memoryview(arrays[3]).cast("B")
+
+        seed = random.randrange(1 << 30) if seed is None else seed
+        self._procs: List[mp.Process] = []
+        self._local: Optional[_Slice] = None
+        if self.workers == 0:
+            self._local = _Slice(arrays, 0, n_envs, players, opponent, reward, seed)
+            self._barrier = None
+        else:
+            self._barrier = mp.Barrier(self.workers + 1)
+            bounds = [n_envs * w // self.workers for w in range(self.workers + 1)]
+            for w in range(self.workers):
+                proc = mp.Process(target=_worker, daemon=True,
+                                  args=(arrays, bounds[w], bounds[w + 1], players, opponent,
+                                        reward, seed + 7919 * w, self._barrier))
+                proc.start()
+                self._procs.append(proc)
+        self._closed = False
+
+    def _run(self, cmd: int) -> None:
+        if self._closed:
+            raise RuntimeError("VectorEnv is closed")
+        if self._local is not None:
+            if cmd == _RESET:
+                self._local.reset()
+            else:
+                self._local.step()
+            return
+        self._ctrl[0] = cmd
+        try:
+            # a killed worker never reaches the barrier: the timeout breaks it
+            self._barrier.wait(self.timeout)  # go
+            self._barrier.wait(self.timeout)  # done
+        except threading.BrokenBarrierError:
+            dead = [w for w, proc in enumerate(self._procs) if not proc.is_alive()]
+            self.close()
+            why = (f"worker {', '.join(map(str, dead))} exited" if dead
+                   else f"no answer within {self.timeout:g}s")
+            raise RuntimeError(f"A vector env worker failed ({why})") from None
+
+    def reset(self):
+        """Start fresh games in every env; returns the observation view."""
+        self._run(_RESET)
+        return self.obs
+
+    def step(self, actions: Sequence[int]) -> Tuple[memoryview, memoryview, memoryview, memoryview]:
+        """Apply one action per env; returns (obs, rewards, dones, masks) views."""
+        if len(actions) != self.n_envs:
+            raise ValueError(f"Expected {self.n_envs} actions, got {len(actions)}")
+        masks = self._flat_masks
+        for i, a in enumerate(actions):
+            if not 0 <= a < N_ACTIONS or not masks[i * N_ACTIONS + a]:
+                raise ValueError(f"Illegal action {a} for env {i}")
+        self._actions[:] = actions
+        self._run(_STEP)
+        return self.obs, self.rewards, self.dones, self.masks
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._barrier is not None and not self._barrier.broken:
+            self._ctrl[0] = _CLOSE
+            try:
+                self._barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+from .constants import CATS
+from .player import PlayerState
+
+# Immutable, versioned views of a GameEngine.
+#
+# The engine publishes a new GameView at the end of every committed change
+# (turn start, reroll, score, cross) by swapping one attribute, so a reader
+# on another thread always gets a whole version: never a half-applied bonus
+# update. Versions share structure: only the mover's sheet is re-frozen,
+# and of that only the rows whose cells changed; unchanged players, rows and
+# bonus registries are the previous version's objects.
+
+_EMPTY = MappingProxyType({})
+
+
+class PlayerView(PlayerState):
+    """Read-only PlayerState: rows are tuples in a read-only mapping."""
+
+    def __init__(self, p: PlayerState, prev: Optional["PlayerView"] = None, rows=None) -> None:
+        # not PlayerState.__init__: every field is frozen from `p`. With `prev`,
+        # only `rows` (categories the move may have touched) are re-frozen.
+        self.name = p.name
+        table = p.table
+        if prev is None:
+            self.table = MappingProxyType({cat: tuple(table[cat]) for cat in CATS})
+        else:
+            old = prev.table
+            fresh = None
+            for cat in rows:
+                live = table[cat]
+                row = old[cat]
+                if row[0] != live[0] or row[1] != live[1] or row[2] != live[2] or row[3] != live[3]:
+                    if fresh is None:
+                        fresh = dict(old)
+                    fresh[cat] = tuple(live)
+            self.table = old if fresh is None else MappingProxyType(fresh)
+        self.column_bonus = tuple(p.column_bonus)
+        self.school_balance = p.school_balance
+        self.school_balance_loc = p.school_balance_loc
+
+    def record(self, category, slot_index, score):
+        raise TypeError("a PlayerView is read-only; write through the GameEngine")
+
+    cross = record
+
+
+class GameView:
+    """
+    One published version of a game. Reads like the engine: players,
+    current, dice, bonus registries, rules, is_game_over(),
+    calculate_final_scores(), render() (and abaka.snapshot.dumps()).
+    """
+
+    __slots__ = ("version", "players", "current", "dice", "rolls_left", "first_roll", "rules",
+                 "row_bonus_claimed", "col_bonus_claimed", "school_minus_used", "row_bonus_blocked")
+
+    def __init__(self, engine, prev: Optional["GameView"] = None, mover: int = -1,
+                 rows=CATS) -> None:
+        """A version after a write by `mover` touching `rows` (-1: any player, any row)."""
+        live = engine.players
+        if prev is None or len(prev.players) != len(live):
+            self.players: Tuple[PlayerView, ...] = tuple(PlayerView(p) for p in live)
+        elif mover < 0:
+            self.players = tuple(PlayerView(p, old, CATS) for p, old in zip(live, prev.players))
+        else:
+            players = list(prev.players)
+            players[mover] = PlayerView(live[mover], prev.players[mover], rows)
+            self.players = tuple(players)
+        self.version = prev.version + 1 if prev is not None else 0
+        self.current = engine.current
+        self.dice = engine.dice if not isinstance(engine.dice, list) else tuple(engine.dice)
+        self.rolls_left = engine.rolls_left
+        self.first_roll = engine.first_roll
+        self.rules = engine.rules
+        cols = engine.col_bonus_claimed
+        if prev is None or mover < 0:
+            self.row_bonus_claimed = _freeze(engine.row_bonus_claimed)
+            self.col_bonus_claimed = tuple(cols)
+            self.school_minus_used = _freeze(engine.school_minus_used)
+            self.row_bonus_blocked = _freeze(engine.row_bonus_blocked)
+            return
+        # a move only claims bonuses of the rows it wrote and only adds keys
+        # to the per-player registries, so those are all there is to compare
+        claimed = engine.row_bonus_claimed
+        old = prev.row_bonus_claimed
+        self.row_bonus_claimed = (old if all(claimed[cat] == old[cat] for cat in rows)
+                                  else _freeze(claimed))
+        old = prev.col_bonus_claimed
+        self.col_bonus_claimed = (old if old[0] == cols[0] and old[1] == cols[1] and old[2] == cols[2]
+                                  else tuple(cols))
+        live = engine.school_minus_used
+        self.school_minus_used = (prev.school_minus_used if len(live) == len(prev.school_minus_used)
+                                  else _freeze(live))
+        live = engine.row_bonus_blocked
+        self.row_bonus_blocked = (prev.row_bonus_blocked if len(live) == len(prev.row_bonus_blocked)
+                                  else _freeze(live))
+
+    def rolled(self, engine) -> "GameView":
+        """Next version when only the dice changed (turn start, reroll): shares everything else."""
+        v = object.__new__(GameView)
+        v.version = self.version + 1
+        v.players = self.players
+        v.current = engine.current
+        v.dice = engine.dice if not isinstance(engine.dice, list) else tuple(engine.dice)
+        v.rolls_left = engine.rolls_left
+        v.first_roll = engine.first_roll
+        v.rules = self.rules
+        v.row_bonus_claimed = self.row_bonus_claimed
+        v.col_bonus_claimed = self.col_bonus_claimed
+        v.school_minus_used = self.school_minus_used
+        v.row_bonus_blocked = self.row_bonus_blocked
+        return v
+
+    def is_game_over(self) -> bool:
+        return all(p.is_complete() for p in self.players)
+
+    def calculate_final_scores(self) -> Dict[str, int]:
+        return {p.name: p.calculate_score() for p in self.players}
+
+    def render(self, start: Optional[int] = None, count: Optional[int] = None) -> List[str]:
+        from .render import render_scoreboard
+        return render_scoreboard(self, start, count)
+
+    def to_bytes(self) -> bytes:
+        from . import snapshot
+        return snapshot.dumps(self)
+
+
+def _freeze(live: dict) -> MappingProxyType:
+    return MappingProxyType(dict(live)) if live else _EMPTY
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import random
+import struct
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from . import snapshot
+
+# Shared snapshot buffer: generation u32, length u32, then the snapshot bytes.
+_HDR = struct.Struct("<II")
+BUFFER_SIZE = 1 << 16
+
+_BUF = None
+
+
+def _init_worker(buf) -> None:
+    global _BUF
+    _BUF = buf
+
+
+def _read_snapshot(buf) -> Tuple[int, bytes]:
+    # seqlock-style read: a generation change while copying means a torn read
+    view = memoryview(buf).cast("B")
+    gen, size = _HDR.unpack_from(view, 0)
+    blob = bytes(view[_HDR.size:_HDR.size + size])
+    if _HDR.unpack_from(view, 0)[0] != gen:
+        return 0, b""
+    return gen, blob
+
+
+def rollout_wins(blob: bytes, policy_name: str, mid_turn: bool, deadline: float,
+                 max_games: int, seed: int) -> Tuple[List[float], int]:
+    """
+    Play the position out with `policy_name` for every seat until the wall-clock
+    deadline or max_games; ties split the win. Returns (wins per player, games).
+    """
+    from .bots import get_policy
+    from .models import RandomDice
+    from .sim import apply, play_game
+
+    rng = random.Random(seed)
+    dice = RandomDice(random.Random(seed ^ 0xD1CE))
+    policy = get_policy(policy_name)
+    wins: List[float] = []
+    games = 0
+    while games < max_games and (games == 0 or time.time() < deadline):
+        g = snapshot.loads(blob)
+        g.dice_source = dice
+        if not wins:
+            wins = [0.0] * len(g.players)
+        if mid_turn and g.dice:
+            while True:  # finish the turn in progress with the dice on the table
+                action = policy(g, rng)
+                apply(g, action)
+                if action[0] != "reroll":
+                    break
+        play_game([], [policy] * len(g.players), rng, engine=g)
+        scores = [p.calculate_score() for p in g.players]
+        best = max(scores)
+        winners = [i for i, s in enumerate(scores) if s == best]
+        for i in winners:
+            wins[i] += 1.0 / len(winners)
+        games += 1
+    return wins, games
+
+
+def _task(args) -> Optional[Tuple[List[float], int]]:
+    gen, policy_name, mid_turn, deadline, max_games, seed = args
+    cur, blob = _read_snapshot(_BUF)
+    if cur != gen:
+        return None  # stale task from an earlier estimate (or a torn read)
+    return rollout_wins(blob, policy_name, mid_turn, deadline, max_games, seed)
+
+
+def wilson(wins: float, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a win rate."""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class WinEstimate:
+    def __init__(self, names: List[str], wins: List[float], games: int,
+                 elapsed: float, z: float = 1.96) -> None:
+        self.names = names
+        self.wins = wins
+        self.games = games
+        self.elapsed = elapsed
+        self.probs = [w / games if games else 1.0 / len(names) for w in wins]
+        self.bounds = [wilson(w, games, z) for w in wins]
+        self.exact = False
+
+    @classmethod
+    def solved(cls, names: List[str], probs: List[float], elapsed: float) -> "WinEstimate":
+        """An exact result (abaka.endgame): no sampling error."""
+        est = cls(names, list(probs), 1, elapsed)
+        est.bounds = [(p, p) for p in est.probs]
+        est.exact = True
+        return est
+
+    def as_dict(self):
+        return {name: {"p": p, "low": lo, "high": hi}
+                for name, p, (lo, hi) in zip(self.names, self.probs, self.bounds)}
+
+    def __repr__(self) -> str:
+        parts = ", ".join(f"{n}: {p:.3f} [{lo:.3f}, {hi:.3f}]"
+                          for n, p, (lo, hi) in zip(self.names, self.probs, self.bounds))
+        return f"<WinEstimate {self.games} games: {parts}>"
+
+
+class WinProbEstimator:
+    """
+    Live win probabilities from parallel rollouts.
+
+    The process pool is created once and reused. Each estimate writes the
+    engine snapshot into a shared-memory buffer that every worker reads, then
+    runs rollouts in short time slices so estimates refine progressively until
+    the latency budget is spent. With workers=0 rollouts run in-process.
+    Positions within reach of `endgame` (an abaka.endgame.EndgameSolver) are
+    answered exactly instead.
+    """
+
+    def __init__(self, workers: Optional[int] = None, policy: str = "greedy",
+                 endgame=None) -> None:
+        self.policy = policy
+        self.endgame = endgame
+        self.workers = mp.cpu_count() if workers is None else workers
+        self._buf = mp.RawArray("B", BUFFER_SIZE)
+        self._gen = 0
+        self._pool = (mp.Pool(self.workers, initializer=_init_worker, initargs=(self._buf,))
+                      if self.workers > 0 else None)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _publish(self, blob: bytes) -> int:
+        if _HDR.size + len(blob) > BUFFER_SIZE:
+            raise ValueError("Game state too large for the shared snapshot buffer")
+        self._gen += 1
+        view = memoryview(self._buf).cast("B")
+        _HDR.pack_into(view, 0, 0, 0)  # generation 0 = being written
+        view[_HDR.size:_HDR.size + len(blob)] = blob
+        _HDR.pack_into(view, 0, self._gen, len(blob))
+        return self._gen
+
+    def iter_estimates(self, engine, budget_ms: float = 500, mid_turn: bool = False,
+                       slices: int = 4, seed: Optional[int] = None,
+                       z: float = 1.96) -> Iterator[WinEstimate]:
+        """
+        Yield a refined WinEstimate after every completed rollout slice.
+        `mid_turn=True` continues the current player's turn with the dice on
+        the table; otherwise the current player starts a fresh turn.
+        """
+        names = [p.name for p in engine.players]
+        t0 = time.time()
+        if self.endgame is not None and self.endgame.in_range(engine):
+            if mid_turn and engine.dice:
+                probs = self.endgame.value_now(engine)
+            else:
+                probs = self.endgame.value(engine)
+            yield WinEstimate.solved(names, probs, time.time() - t0)
+            return
+        blob = snapshot.dumps(engine)
+        rng = random.Random(seed)
+        deadline = t0 + budget_ms / 1000.0
+        slice_s = max(0.01, budget_ms / 1000.0 / max(1, slices))
+        wins = [0.0] * len(names)
+        games = 0
+
+        if self._pool is None:
+            while True:
+                end = min(deadline, time.time() + slice_s)
+                w, n = rollout_wins(blob, self.policy, mid_turn, end, 1 << 30, rng.getrandbits(63))
+                wins = [a + b for a, b in zip(wins, w)]
+                games += n
+                yield WinEstimate(names, wins, games, time.time() - t0, z)
+                if time.time() >= deadline:
+                    return
+
+        gen = self._publish(blob)
+        while True:
+            end = min(deadline, time.time() + slice_s)
+            tasks = [(gen, self.policy, mid_turn, end, 1 << 30, rng.getrandbits(63))
+                     for _ in range(self.workers)]
+            for res in self._pool.imap_unordered(_task, tasks):
+                if res is None:
+                    continue
+                w, n = res
+                wins = [a + b for a, b in zip(wins, w)]
+                games += n
+                yield WinEstimate(names, wins, games, time.time() - t0, z)
+            if time.time() >= deadline:
+                return
+
+    def estimate(self, engine, budget_ms: float = 500, **kwargs) -> WinEstimate:
+        est = None
+        for est in self.iter_estimates(engine, budget_ms, **kwargs):
+            pass
+        return est
+
+
+def estimate_win_probabilities(engine, budget_ms: float = 500, workers: Optional[int] = None,
+                               policy: str = "greedy", **kwargs) -> WinEstimate:
+    """One-shot convenience wrapper (pays pool start-up; keep a WinProbEstimator for live use)."""
+    with WinProbEstimator(workers, policy) as est:
+        return est.estimate(engine, budget_ms, **kwargs)
@@ -0,0 +1,90 @@
+import io
+import json
+import random
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from abaka.batch import ScriptError, main, parse_faces, parse_reroll, run_script
+from abaka.engine import GameEngine
+from abaka.models import RandomDice
+from abaka.sim import apply, greedy_policy
+
+
+def _record_greedy_game(seed):
+    """Self-play one greedy game and write it down as a move script."""
+    rng = random.Random(seed)
+    g = GameEngine(["A", "B"], dice_source=RandomDice(rng))
+    lines = ["game A,B"]
+    while not g.is_game_over():
+        g.start_turn()
+        lines.append("roll " + " ".join(f"j{d.value}" if d.is_joker else str(d.value) for d in g.dice))
+        while True:
+            action = greedy_policy(g, rng)
+            apply(g, action)
+            if action[0] == "reroll":
+                idxs = action[1]
+                lines.append(f"r {''.join(map(str, idxs))} = " + " ".join(str(g.dice[i].value) for i in idxs))
+                continue
+            lines.append(("s " if action[0] == "score" else "x ") + action[1].name.lower())
+            break
+    return lines, [p.calculate_score() for p in g.players]
+
+
+class TestBatch(unittest.TestCase):
+    def test_parse_faces(self):
+        dice = parse_faces("3 1 3 j2 5")
+        self.assertEqual([repr(d) for d in dice], ["3", "1", "3", "J(2)", "5"])
+        self.assertEqual(repr(parse_faces("313J(2)5")[3]), "J(2)")
+        with self.assertRaises(ValueError):
+            parse_faces("1 2 3 4 5")
+
+    def test_fixed_dice_turns(self):
+        script = [
+            "roll 6 6 2 3 j1",
+            "r 23 = 6 4",     # 6 6 6 4 J(1): joker wild -> kare
+            "s c",
+            "roll 1 1 2 2 j3; x a",
+            "end",
+        ]
+        (res,) = run_script(script, ["A", "B"])
+        self.assertNotIn("error", res)
+        self.assertEqual(res["moves"], 2)
+        self.assertFalse(res["complete"])
+
+    def test_reroll_faces_follow_the_written_order(self):
+        self.assertEqual(parse_reroll("40 = 6 1"), ([4, 0], [6, 1]))
+        self.assertEqual(parse_reroll("0, 2"), ([0, 2], None))
+        for bad in ("00 = 6 6", "5 = 1", "0 = 7", "01 = 6 0", "0 = x", " = 6"):
+            with self.assertRaises(ScriptError):
+                parse_reroll(bad)
+        (res,) = run_script(["roll 1 2 3 4 j5", "r 00 = 6 6", "end"], ["A"])
+        self.assertIn("twice", res["error"]["message"])
+
+    def test_replays_recorded_games(self):
+        for seed in (1, 2):
+            lines, scores = _record_greedy_game(seed)
+            (res,) = run_script(lines)
+            self.assertTrue(res["complete"])
+            self.assertEqual(res["scores"], scores)
+            self.assertEqual(res["moves"], 90)
+
+    def test_error_aborts_only_that_game(self):
+        script = ["game A,B", "roll 1 2 3 4 j5", "s a", "s sum", "game C,D", "s sum"]
+        bad, good = run_script(script, seed=3)
+        self.assertEqual(bad["error"]["line"], 3)
+        self.assertEqual(bad["moves"], 0)
+        self.assertNotIn("error", good)
+        self.assertEqual(good["players"], ["C", "D"])
+
+    def test_main_reads_stdin_and_emits_jsonl(self):
+        out = io.StringIO()
+        with mock.patch("sys.stdin", io.StringIO("roll 2 2 2 5 j6\ns t\n")), redirect_stdout(out):
+            self.assertEqual(main(["-", "--players", "X,Y"]), 0)
+        res = json.loads(out.getvalue())
+        self.assertEqual(res["players"], ["X", "Y"])
+        self.assertEqual(res["scores"][0], 12)  # trips doubled on the first roll
+
+
+if __name__ == "__main__":
+    unittest.main()
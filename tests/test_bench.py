@@ -0,0 +1,26 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from abaka import bench
+
+
+class TestBench(unittest.TestCase):
+    def test_compare_flags_only_real_regressions(self):
+        base = {"a": {"ops_per_sec": 1000.0}, "b": {"ops_per_sec": 1000.0}, "c": {"skipped": "x"}}
+        cur = {"a": {"ops_per_sec": 700.0}, "b": {"ops_per_sec": 900.0}, "c": {"skipped": "x"}}
+        self.assertEqual(bench.compare(cur, base, threshold=0.25), ["a"])
+
+    def test_run_subset_reports_percentiles(self):
+        res = bench.run(["score_category"], min_time=0.01, warmup=0.005)
+        r = res["score_category"]
+        self.assertGreater(r["ops_per_sec"], 0)
+        self.assertLessEqual(r["p50_us"], r["p99_us"])
+
+    def test_cli_exit_code(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(bench.main(["calculate_score", "--time", "0.01", "--warmup", "0.005"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from abaka.constants import (CATS, COMBO_CATS, COMBO_INDEX, DENOM, IS_SCHOOL, LABELS,
+                             NON_SCHOOL_STRICT, SCHOOL_BY_DENOM, SCHOOL_CATS, SCHOOL_INDEX, STRICT)
+from abaka.engine import NON_SCHOOL_STRICT as ENGINE_STRICT
+from abaka.models import Category
+
+
+class TestCategoryMetadata(unittest.TestCase):
+    def test_dense_index(self):
+        self.assertEqual([c.index for c in Category], list(range(len(Category))))
+        for c in Category:
+            self.assertIs(CATS[c.index], c)
+
+    def test_tables_agree_with_names(self):
+        for c in Category:
+            school = c.name.startswith("SCHOOL_")
+            self.assertEqual(IS_SCHOOL[c.index], school)
+            self.assertEqual(DENOM[c.index], int(c.name.split("_")[1]) if school else 0)
+            self.assertEqual(STRICT[c.index], c in NON_SCHOOL_STRICT)
+            if school:
+                self.assertEqual(LABELS[c.index], c.name[-1])
+                self.assertIs(SCHOOL_BY_DENOM[DENOM[c.index]], c)
+        self.assertEqual([CATS[i] for i in SCHOOL_INDEX], SCHOOL_CATS)
+        self.assertEqual([CATS[i] for i in COMBO_INDEX], COMBO_CATS)
+        self.assertEqual(LABELS[Category.TWO_PAIRS.index], "DD")
+        self.assertIs(ENGINE_STRICT, NON_SCHOOL_STRICT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import random
+import tempfile
+import unittest
+
+from abaka.bots import get_policy
+from abaka.bots.cache import (CachedPolicy, DecisionCache, DiskDecisionTable, decision_key,
+                              decode_action, encode_action)
+from abaka.engine import GameEngine
+from abaka.models import Category, Roll
+from abaka.rules import RuleSet
+from abaka.sim import greedy_policy, play_turn
+
+
+class _Counting:
+    def __init__(self, policy):
+        self.policy = policy
+        self.calls = 0
+        self.last_value = 7.5
+
+    def __call__(self, engine, rng=None):
+        self.calls += 1
+        return self.policy(engine, rng or random.Random(0))
+
+
+class TestDecisionKey(unittest.TestCase):
+    def _game(self, dice, names=("A", "B")):
+        g = GameEngine(list(names))
+        g.start_turn()
+        g.dice = dice
+        return g
+
+    def test_canonical_over_dice_order_and_names(self):
+        a = self._game(Roll.of((2, 5, 5, 1, 3), joker=3), names=("A", "B"))
+        b = self._game(Roll.of((3, 1, 5, 5, 2), joker=1), names=("X", "Y"))
+        self.assertEqual(decision_key(a), decision_key(b))
+
+    def test_depends_on_turn_sheet_and_rules(self):
+        dice = Roll.of((2, 5, 5, 1, 3), joker=3)
+        base = decision_key(self._game(dice))
+        g = self._game(dice)
+        g.rolls_left = 1
+        self.assertNotEqual(decision_key(g), base)
+        g = self._game(dice)
+        g.players[0].table[Category.PAIR][0] = 10
+        self.assertNotEqual(decision_key(g), base)
+        g = self._game(dice)
+        g.players[0].school_balance = 4
+        self.assertNotEqual(decision_key(g), base)
+        g = self._game(dice)
+        g.col_bonus_claimed[0] = True
+        self.assertNotEqual(decision_key(g), base)
+        g = GameEngine(["A", "B"], rules=RuleSet(kare_bonus=30))
+        g.start_turn()
+        g.dice = dice
+        self.assertNotEqual(decision_key(g), base)
+        # written values and the other player's sheet do not matter
+        g = self._game(dice)
+        g.players[1].table[Category.SUM][0] = 25
+        self.assertEqual(decision_key(g), base)
+
+    def test_reroll_is_stored_as_the_keep(self):
+        a = Roll.of((6, 2, 6, 3, 1), joker=4)
+        b = Roll.of((1, 6, 3, 6, 2), joker=0)
+        code = encode_action(("reroll", [1, 3]), a)  # keep 6, 6 and the joker
+        action = decode_action(code, b)
+        self.assertEqual(action, ("reroll", [2, 4]))
+        for move in [("score", Category.SCHOOL_6, 0), ("cross", Category.ABAKA, 2)]:
+            self.assertEqual(decode_action(encode_action(move, a), b), move)
+
+
+class TestDecisionCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "decisions.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_lru_then_disk(self):
+        cache = DecisionCache(self.path, capacity=2, disk_capacity=64)
+        for key in (11, 12, 13):
+            cache.put(key, key + 100, 0.5)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(11), (111, 0.5))  # evicted, read back from disk
+        self.assertEqual((cache.hits, cache.disk_hits), (0, 1))
+        self.assertIsNone(cache.get(99))
+        cache.close()
+
+    def test_persists_across_processes_restarts(self):
+        cache = DecisionCache(self.path, disk_capacity=64)
+        cache.put(5, 42, -1.25)
+        cache.close()
+        reader = DecisionCache(self.path, readonly=True)
+        self.assertEqual(reader.disk.capacity, 64)  # the file keeps its own size
+        self.assertEqual(reader.get(5), (42, -1.25))
+        reader.put(6, 1, 0.0)  # memory only
+        self.assertIsNone(reader.disk.get(6))
+        reader.close()
+
+    def test_full_probe_run_and_torn_slot(self):
+        table = DiskDecisionTable(self.path, capacity=16)
+        for i in range(16):
+            self.assertTrue(table.put(16 * (i + 1), i, 0.0))
+        self.assertFalse(table.put(16 * 100, 1, 0.0))
+        self.assertEqual(len(table), 16)
+        table._map[12 + 8] ^= 0xFF  # first slot's value: its check no longer matches
+        self.assertIsNone(table.get(16))
+        self.assertEqual(table.get(32), (1, 0.0))
+        table.close()
+
+    def test_cached_policy_replays_decisions(self):
+        inner = _Counting(greedy_policy)
+        bot = CachedPolicy(inner, DecisionCache(self.path))
+        dice = Roll.of((4, 4, 2, 4, 6), joker=4)
+        first = []
+        for _ in range(2):
+            g = GameEngine(["A", "B"])
+            g.start_turn()
+            g.dice = dice
+            first.append(bot(g, random.Random(0)))
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(first[0], first[1])
+        self.assertEqual(bot.last_value, 7.5)
+        bot.cache.close()
+
+    def test_replayed_game_is_all_hits(self):
+        bot = CachedPolicy(greedy_policy, DecisionCache())
+        finals, misses = [], []
+        for _ in range(2):
+            random.seed(3)
+            g = GameEngine(["A", "B"])
+            while not g.is_game_over():
+                play_turn(g, bot, random.Random(3))
+            finals.append(g.calculate_final_scores())
+            misses.append(bot.cache.misses)
+        self.assertEqual(finals[0], finals[1])
+        self.assertEqual(misses[0], misses[1])
+        self.assertGreater(bot.cache.hits, 0)
+
+    def test_registered(self):
+        self.assertIsInstance(get_policy("mcts-cached"), CachedPolicy)
+
+
+if __name__ == "__main__":
+    unittest.main()
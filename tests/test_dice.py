@@ -0,0 +1,81 @@
+import random
+import unittest
+from collections import Counter
+
+from abaka import probability as P
+from abaka.engine import GameEngine
+from abaka.models import Die, RandomDice, Roll, roll_dice
+
+
+class _InPlaceDice:
+    """Old-style dice source: Die lists, rerolled by mutation."""
+
+    def roll(self):
+        return [Die(2), Die(2), Die(5), Die(6), Die(3, is_joker=True)]
+
+    def reroll(self, dice, indices):
+        for i in indices:
+            dice[i].value = 2
+
+
+class TestRoll(unittest.TestCase):
+    def test_pack_roundtrip_and_views(self):
+        dice = [Die(3), Die(1), Die(3), Die(2, is_joker=True), Die(5)]
+        r = Roll.pack(dice)
+        self.assertIs(r, Roll.of((3, 1, 3, 2, 5), joker=3))  # interned
+        self.assertEqual([(d.value, d.is_joker) for d in r], [(d.value, d.is_joker) for d in dice])
+        self.assertEqual(repr(r), "[3, 1, 3, J(2), 5]")
+        self.assertEqual((r.normals, r.joker_face), ((1, 3, 3, 5), 2))
+        self.assertEqual(r.state, P.state_index(dice))
+        self.assertIsNone(Roll.pack(dice[:4]))
+        self.assertEqual(Roll.pack([Die(5)] * 5).state, -1)  # no joker: not a canonical state
+        for jokerless in (Roll.pack([Die(5)] * 5), [Die(5)] * 5):
+            with self.assertRaises(ValueError):
+                P.state_index(jokerless)
+
+    def test_replace_follows_the_given_order(self):
+        r = Roll.of((1, 2, 3, 4, 5), joker=4)
+        self.assertIs(r.replace([4, 0], [6, 1]), Roll.of((1, 2, 3, 4, 6), joker=4))
+        with self.assertRaises(ValueError):
+            r.replace([0, 0], [6, 6])
+
+    def test_roll_is_immutable(self):
+        r = roll_dice()
+        with self.assertRaises(AttributeError):
+            r[0].value = 6
+
+    def test_reroll_changes_only_chosen_dice(self):
+        src = RandomDice(random.Random(4))
+        r = src.roll()
+        for _ in range(200):
+            new = src.reroll(r, [1, 3])
+            self.assertEqual([new.faces[i] for i in (0, 2, 4)], [r.faces[i] for i in (0, 2, 4)])
+            self.assertEqual(new.joker, r.joker)
+        a, b = RandomDice(random.Random(5)), RandomDice(random.Random(5))
+        self.assertIs(a.reroll(r, [3, 1, 3]), b.reroll(r, [1, 3]))  # a repeated index counts once
+
+    def test_rolls_are_uniform(self):
+        src = RandomDice(random.Random(7))
+        faces, jokers = Counter(), Counter()
+        for _ in range(6000):
+            r = src.roll()
+            faces.update(r.faces)
+            jokers[r.joker] += 1
+        self.assertEqual(set(jokers), set(range(5)))
+        for v in range(1, 7):
+            self.assertAlmostEqual(faces[v] / 30000, 1 / 6, delta=0.01)
+
+    def test_engine_accepts_lists_and_in_place_sources(self):
+        g = GameEngine(["A"], dice_source=_InPlaceDice())
+        g.start_turn()
+        self.assertIsInstance(g.dice, Roll)
+        g.reroll([2, 3])
+        self.assertEqual([d.value for d in g.dice], [2, 2, 2, 2, 3])
+        g.dice = [Die(1), Die(1)]  # not a roll: kept as a list
+        self.assertEqual(len(g.dice), 2)
+        g.dice = []
+        self.assertFalse(g.dice)
+
+
+if __name__ == "__main__":
+    unittest.main()
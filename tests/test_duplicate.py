@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from abaka.duplicate import (ScriptedDice, duplicate_match, evaluate, generate_script,
+                             paired_stats, play_scripted)
+from abaka.engine import GameEngine
+
+
+class TestScriptedDice(unittest.TestCase):
+    def test_engine_draws_from_script(self):
+        script = [((1, 2, 3, 4, 5), 2, ((6, 6, 6, 6, 6), (2, 2, 2, 2, 2)))]
+        g = GameEngine(["A"], dice_source=ScriptedDice(script))
+        g.start_turn()
+        self.assertEqual([repr(d) for d in g.dice], ["1", "2", "J(3)", "4", "5"])
+        g.reroll([0, 4])
+        self.assertEqual([d.value for d in g.dice], [6, 2, 3, 4, 6])
+        g.reroll([1])
+        self.assertEqual([d.value for d in g.dice], [6, 2, 3, 4, 6])
+        with self.assertRaises(RuntimeError):
+            g.start_turn()
+
+    def test_replay_is_identical(self):
+        script = generate_script(90, random.Random(5))
+        self.assertEqual(play_scripted(["random", "greedy"], script, 3),
+                         play_scripted(["random", "greedy"], script, 3))
+
+
+class TestPairedEvaluation(unittest.TestCase):
+    def test_identical_strategies_tie_exactly(self):
+        res = duplicate_match("greedy", "greedy", deals=2, seed=1)
+        self.assertEqual(res["mean_diff"], 0.0)
+        self.assertEqual(res["paired_se"], 0.0)
+
+    def test_evaluate_pairs_by_deal(self):
+        scores = evaluate(["greedy", "random"], deals=2, opponents=["greedy"], seed=4)
+        self.assertEqual(len(scores["greedy"]), 2)
+        stats = paired_stats(scores["greedy"], scores["random"])
+        self.assertGreater(stats["mean_diff"], 0)
+
+    def test_paired_stats(self):
+        stats = paired_stats([10, 20, 30, 40], [9, 19, 29, 39])
+        self.assertEqual(stats["mean_diff"], 1)
+        self.assertEqual(stats["paired_se"], 0)
+        self.assertGreater(stats["unpaired_se"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import random
+import tempfile
+import unittest
+
+from abaka import probability as P
+from abaka import snapshot
+from abaka.bots import get_policy
+from abaka.bots.endgame import EndgamePolicy
+from abaka.endgame import EndgameSolver, Tablebase, open_cells, win_shares
+from abaka.engine import GameEngine
+from abaka.models import Category, Roll
+from abaka.sim import legal_moves, play_game
+from abaka.winprob import WinProbEstimator
+
+
+def _last_cells(rows, lead=0, names=("A", "B")):
+    """Every player has one open cell in each of `rows`; A leads by `lead`."""
+    g = GameEngine(list(names))
+    for p in g.players:
+        for cat, slots in p.table.items():
+            slots[:3] = [10, 10, None] if cat in rows else ["X", "X", "X"]
+    g.players[0].table[Category.PAIR][3] = lead
+    return g
+
+
+class TestEndgameSolver(unittest.TestCase):
+    def test_decided_and_balanced_positions(self):
+        solver = EndgameSolver()
+        self.assertEqual(solver.value(_last_cells([Category.KARE], lead=500)), [1.0, 0.0])
+        v = solver.value(_last_cells([Category.KARE]))
+        self.assertAlmostEqual(sum(v), 1.0)
+        self.assertGreater(v[0], 0.5)  # moving first: A can claim the row bonus first
+        self.assertEqual(open_cells(_last_cells([Category.KARE])), [1, 1])
+
+    def test_out_of_range(self):
+        solver = EndgameSolver(max_open=1)
+        g = _last_cells([Category.KARE, Category.SUM])
+        self.assertFalse(solver.in_range(g))
+        with self.assertRaises(ValueError):
+            solver.value(g)
+
+    def test_value_is_expectation_over_the_roll(self):
+        solver = EndgameSolver()
+        g = _last_cells([Category.SCHOOL_4], lead=5)
+        start = solver.value(g)
+        g.start_turn()
+        total = [0.0, 0.0]
+        for s, pr in enumerate(P.ROLL_PROB):
+            g.dice = P.state_dice(s)
+            for i, x in enumerate(solver.value_now(g)):
+                total[i] += pr * x
+        for a, b in zip(start, total):
+            self.assertAlmostEqual(a, b)
+
+    def test_best_action_is_legal_and_matches_play(self):
+        solver = EndgameSolver()
+        g0 = _last_cells([Category.KARE])
+        g0.start_turn()
+        g0.dice = Roll.of((5, 5, 5, 2, 1), joker=4)
+        action = solver.best_action(g0)
+        self.assertEqual(action, ("score", Category.KARE, 2))  # wild joker makes the kare now
+        g0.dice = Roll.of((5, 3, 2, 6, 4), joker=4)
+        g0.rolls_left = 0
+        g0.first_roll = False
+        self.assertIn(solver.best_action(g0), legal_moves(g0))
+
+        # self-play with the solver for both seats lands near the solved value
+        g0 = _last_cells([Category.SCHOOL_4], lead=5)
+        exact = solver.value(g0)[0]
+        policy = EndgamePolicy(solver=solver)
+        random.seed(4)
+        wins = 0.0
+        n = 400
+        for i in range(n):
+            g = play_game([], [policy, policy], random.Random(i),
+                          engine=snapshot.loads(snapshot.dumps(g0)))
+            wins += win_shares(g)[0]
+        self.assertAlmostEqual(wins / n, exact, delta=0.08)
+
+    def test_tablebase_persists_solved_positions(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "endgame.sqlite3")
+            g = _last_cells([Category.FULL], lead=3)
+            tb = Tablebase(path)
+            first = EndgameSolver(tablebase=tb)
+            v = first.value(g)
+            self.assertGreater(len(tb), 1)
+            tb.close()
+
+            tb = Tablebase(path)
+            again = EndgameSolver(tablebase=tb)
+            renamed = _last_cells([Category.FULL], lead=3, names=("X", "Y"))
+            self.assertEqual(again.value(renamed), v)
+            self.assertEqual(again.nodes, 0)
+            tb.close()
+
+    def test_exact_win_probability_display(self):
+        est = WinProbEstimator(workers=0, endgame=EndgameSolver())
+        res = est.estimate(_last_cells([Category.KARE], lead=500), budget_ms=50)
+        self.assertTrue(res.exact)
+        self.assertEqual(res.probs, [1.0, 0.0])
+        self.assertEqual(res.bounds[0], (1.0, 1.0))
+
+    def test_registered(self):
+        self.assertIsInstance(get_policy("endgame"), EndgamePolicy)
+
+
+if __name__ == "__main__":
+    unittest.main()
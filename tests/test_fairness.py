@@ -0,0 +1,112 @@
+import random
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.fairness import DiceMonitor, MonitoredDice, chi2_sf
+from abaka.models import Die, RandomDice, Roll
+from abaka.server import TableRouter
+from abaka.sim import greedy_policy, play_game
+
+
+class LoadedDice(RandomDice):
+    """Sixes come up `bias` times as often; the named player always rolls five sixes."""
+
+    def __init__(self, rng, bias=1.0, lucky=None, engine=None):
+        super().__init__(rng)
+        self.bias = bias
+        self.lucky = lucky
+        self.engine = engine
+
+    def _face(self):
+        w = [1.0] * 5 + [self.bias]
+        return self.rng.choices(range(1, 7), w)[0]
+
+    def roll(self):
+        g = self.engine
+        if self.lucky is not None and g.players[g.current].name == self.lucky:
+            return Roll.of((6, 6, 6, 6, 6), joker=self.rng.randrange(5))
+        return Roll.of([self._face() for _ in range(5)], joker=self.rng.randrange(5))
+
+
+def _games(monitor, n, seed, source=None):
+    for i in range(n):
+        g = GameEngine(["A", "B"], dice_source=source or RandomDice(random.Random(seed + i)))
+        if isinstance(source, LoadedDice):
+            source.engine = g
+        monitor.attach(g)
+        play_game([], [greedy_policy, greedy_policy], random.Random(i), engine=g)
+
+
+class TestDiceMonitor(unittest.TestCase):
+    def test_chi2_tail(self):
+        for x, df in ((3.841, 1), (5.991, 2), (7.815, 3), (11.070, 5)):
+            self.assertAlmostEqual(chi2_sf(x, df), 0.05, places=3)
+        self.assertEqual(chi2_sf(0.0, 5), 1.0)
+
+    def test_fair_dice_raise_no_alarm(self):
+        monitor = DiceMonitor(window=512)
+        _games(monitor, 40, seed=1)
+        rep = monitor.report()
+        self.assertEqual(rep["alarms"], [])
+        self.assertEqual(rep["tampered"], 0)
+        self.assertEqual(rep["flagged_players"], {})
+        self.assertEqual(rep["rolls"], 40 * 2 * 45)  # one roll per written cell
+        self.assertEqual(sum(monitor.joker_pos), rep["rolls"])
+        dice = sum(map(sum, monitor.faces))
+        self.assertGreater(dice, 5 * rep["rolls"])  # plus the rerolled dice
+        for t in rep["lifetime"].values():
+            self.assertGreater(t["p"], 1e-4)
+
+    def test_biased_faces_are_detected(self):
+        monitor = DiceMonitor(window=512)
+        _games(monitor, 20, seed=2, source=LoadedDice(random.Random(2), bias=1.4))
+        rep = monitor.report()
+        self.assertLess(rep["lifetime"]["faces"]["p"], 1e-6)
+        self.assertTrue(any("face 6 comes up too often" in a for a in rep["alarms"]))
+
+    def test_lucky_player_is_flagged(self):
+        monitor = DiceMonitor()
+        source = LoadedDice(random.Random(3), lucky="A")
+        _games(monitor, 2, seed=3, source=source)
+        rep = monitor.report()
+        self.assertIn("A", rep["flagged_players"])
+        self.assertNotIn("B", rep["flagged_players"])
+
+    def test_dice_changed_outside_the_source(self):
+        monitor = DiceMonitor()
+        g = GameEngine(["A", "B"])
+        g.enable_dice_monitor(monitor)
+        self.assertIsInstance(g.dice_source, MonitoredDice)
+        g.start_turn()
+        g.reroll([0, 1])
+        g.dice = [Die(6), Die(6), Die(6), Die(6), Die(6, is_joker=True)]
+        g.reroll([0])  # the source sees a roll it never produced
+        self.assertEqual(monitor.tampered, 1)
+        self.assertIn("A", monitor.report()["flagged_players"])
+        g.disable_dice_monitor()
+        self.assertIsInstance(g.dice_source, RandomDice)
+
+    def test_memory_is_bounded(self):
+        monitor = DiceMonitor(window=64, max_players=3)
+        for i in range(6):
+            g = GameEngine([f"P{i}"])
+            monitor.attach(g)
+            for _ in range(100):
+                g.start_turn()
+            self.assertLessEqual(len(monitor._rolls), 64)
+        self.assertEqual(list(monitor.players), ["P3", "P4", "P5"])
+
+    def test_router_shards_watch_their_tables(self):
+        with TableRouter(workers=2, seed=4, in_process=True, monitor=True) as router:
+            ids = [f"t{i}" for i in range(6)]
+            router.run([(t, "create", (["A", "B"], None)) for t in ids])
+            for _ in range(10):
+                router.run([(t, "turn", ("greedy",)) for t in ids])
+            reports = router.fairness()
+            self.assertEqual(sum(r["rolls"] for r in reports.values()), 60)
+        with TableRouter(workers=1, in_process=True) as router:
+            self.assertEqual(router.fairness(), {0: None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import itertools
+import random
+import unittest
+
+from abaka import probability as P
+from abaka.engine import GameEngine
+from abaka.hints import HintService, compute_hints
+from abaka.models import Category, Die
+from abaka.scoring import score_category
+
+
+def _dice(faces, joker):
+    return [Die(v) for v in faces] + [Die(joker, is_joker=True)]
+
+
+def _mc_hit(dice, keep, cat, rng, n=20000):
+    """Monte-Carlo P(cat scores after one reroll of everything outside `keep`)."""
+    hits = 0
+    idxs = P.reroll_indices(dice, keep)
+    for _ in range(n):
+        d = [Die(x.value, x.is_joker) for x in dice]
+        for i in idxs:
+            d[i].value = rng.randint(1, 6)
+        hits += score_category(d, cat) > 0
+    return hits / n
+
+
+class TestProbability(unittest.TestCase):
+    def test_state_roundtrip(self):
+        self.assertEqual(P.N_STATES, 756)
+        for s in (0, 17, 400, 755):
+            self.assertEqual(P.state_index(P.state_dice(s)), s)
+
+    def test_keep_value_matches_simulation(self):
+        dice = _dice((2, 2, 5, 6), 3)
+        keep = ((2, 2), False)
+        hit = [1.0 if score_category(P.state_dice(s), Category.TRIPS) > 0 else 0.0
+               for s in range(P.N_STATES)]
+        exact = P.keep_value(P.state_index(dice), keep, hit)
+        self.assertAlmostEqual(exact, _mc_hit(dice, keep, Category.TRIPS, random.Random(1)), delta=0.02)
+
+    def test_solve_is_monotone_in_rerolls(self):
+        stop = [float(score_category(P.state_dice(s), Category.FULL)) for s in range(P.N_STATES)]
+        layers = P.solve(stop, 2)
+        for s in range(P.N_STATES):
+            self.assertLessEqual(layers[0][s], layers[1][s] + 1e-9)
+            self.assertLessEqual(layers[1][s], layers[2][s] + 1e-9)
+
+    def test_abaka_chance_over_a_full_turn(self):
+        hit = [1.0 if score_category(P.state_dice(s), Category.ABAKA) > 0 else 0.0
+               for s in range(P.N_STATES)]
+        v = P.solve(hit, 2)[2]
+        total = sum(v[P.NORMALS_INDEX[tuple(sorted(f[:4]))] * 6 + f[4] - 1]
+                    for f in itertools.product(range(1, 7), repeat=5))
+        p = total / 6 ** 5
+        self.assertGreater(p, 0.04)
+        self.assertLess(p, 0.10)
+
+
+class TestHints(unittest.TestCase):
+    def _engine(self):
+        g = GameEngine(["A", "B"])
+        g.dice = _dice((3, 1, 3, 5), 2)
+        g.rolls_left, g.first_roll = 2, True
+        return g
+
+    def test_compute_hints(self):
+        h = compute_hints(self._engine())
+        self.assertEqual(h["moves"][Category.SUM]["now"], 28.0)  # doubled on the first roll
+        self.assertIsNone(h["moves"][Category.FULL]["now"])
+        self.assertGreater(h["moves"][Category.FULL]["p_hit"], 0.0)
+        self.assertEqual(h["moves"][Category.PAIR]["p_hit"], 1.0)
+        evs = [k["ev"] for k in h["keeps"]]
+        self.assertEqual(evs, sorted(evs, reverse=True))
+        self.assertGreaterEqual(h["turn_ev"], max(h["stop_ev"], evs[0]) - 1e-9)
+
+    def test_no_keeps_without_rerolls(self):
+        g = self._engine()
+        g.rolls_left, g.first_roll = 0, False
+        self.assertEqual(compute_hints(g)["keeps"], [])
+
+    def test_service_caches_per_position(self):
+        svc = HintService()
+        g = self._engine()
+        first = svc.get(g, timeout=30)
+        self.assertIs(svc.lookup(g), first)
+        g.dice = _dice((6, 6, 6, 6), 2)
+        self.assertIsNot(svc.get(g, timeout=30), first)
+        g.dice = _dice((1, 3, 3, 5), 2)  # same multiset as before, other order
+        self.assertIs(svc.lookup(g), first)
+        svc.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
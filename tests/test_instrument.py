@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from abaka.engine import GameEngine
+from abaka.instrument import Instrumentation
+from abaka.models import Category, Die
+
+
+def _play(g):
+    g.start_turn()
+    g.reroll([0])
+    g.dice = [Die(2), Die(2), Die(2), Die(2), Die(3, is_joker=True)]
+    g.record_score(Category.SCHOOL_2, 0)
+    g.start_turn()
+    g.record_cross(Category.PAIR, 0)
+    g.render()
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_counts_every_hot_path(self):
+        instr = Instrumentation()
+        g = GameEngine(["A", "B"])
+        g.enable_instrumentation(instr)
+        _play(g)
+        calls = {k: v["calls"] for k, v in instr.snapshot().items()}
+        self.assertEqual(calls["start_turn"], 2)
+        self.assertEqual(calls["reroll"], 1)
+        self.assertEqual(calls["record_score"], 1)
+        self.assertEqual(calls["record_school"], 1)
+        self.assertEqual(calls["record_cross"], 1)
+        self.assertEqual(calls["after_record"], 2)
+        self.assertEqual(calls["render"], 1)
+
+    def test_errors_counted_and_detach_restores_class_methods(self):
+        instr = Instrumentation()
+        g = GameEngine(["A"])
+        g.enable_instrumentation(instr)
+        with self.assertRaises(RuntimeError):
+            g.reroll([0])  # no rolls left before start_turn
+        self.assertEqual(instr.ops["reroll"].errors, 1)
+        g.disable_instrumentation()
+        self.assertNotIn("reroll", vars(g))
+        g.start_turn()
+        self.assertEqual(instr.ops["start_turn"].calls, 0)
+
+    def test_export_text_and_file(self):
+        instr = Instrumentation()
+        g = GameEngine(["A", "B"])
+        g.enable_instrumentation(instr)
+        _play(g)
+        text = instr.export_text()
+        self.assertIn('abaka_op_latency_seconds_count{op="record_school"} 1', text)
+        self.assertIn('abaka_op_latency_seconds_bucket{op="reroll",le="+Inf"} 1', text)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "abaka.prom")
+            instr.write(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), text)
+
+    def test_http_endpoint(self):
+        instr = Instrumentation()
+        server = instr.serve(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            body = urllib.request.urlopen(url, timeout=5).read().decode()
+            self.assertIn("abaka_op_errors_total", body)
+        finally:
+            server.shutdown()
+
+    def test_profile_next(self):
+        instr = Instrumentation()
+        g = GameEngine(["A", "B"])
+        g.enable_instrumentation(instr)
+        done = instr.profile_next(calls=2)
+        _play(g)
+        self.assertTrue(done.is_set())
+        self.assertIn("start_turn", instr.last_profile)
+
+    def test_profile_next_across_threads(self):
+        instr = Instrumentation()
+
+        def play():
+            g = GameEngine(["A", "B"])
+            g.enable_instrumentation(instr)
+            for _ in range(40):
+                g.start_turn()
+                g.reroll([0, 1])
+                g.render()
+
+        done = instr.profile_next(calls=30)
+        threads = [threading.Thread(target=play) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(done.is_set())
+        self.assertEqual(instr._profile_left, 0)  # each profiled call counted once
+        self.assertIsNone(instr._profile_owner)
+        self.assertEqual(instr.snapshot()["start_turn"]["calls"], 160)
+
+
+if __name__ == "__main__":
+    unittest.main()
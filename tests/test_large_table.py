@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from abaka.bonus import column_bonus_cells, row_cells
+from abaka.engine import GameEngine
+from abaka.models import Category, RandomDice
+from abaka.render import render_scoreboard, standings, visible_players
+from abaka.sim import greedy_policy, play_turn
+
+
+def _fill_row(g, pi, cat, value):
+    g.current = pi
+    p = g.players[pi]
+    for s in range(3):
+        p.table[cat][s] = value
+    g._after_record(cat, 2)
+
+
+class TestLargeTable(unittest.TestCase):
+    def test_row_claim_does_not_sweep_other_sheets(self):
+        g = GameEngine([f"P{i}" for i in range(30)])
+        _fill_row(g, 7, Category.SUM, 20)
+        self.assertTrue(g.row_bonus_claimed[Category.SUM])
+        self.assertEqual(g.players[7].table[Category.SUM][3], 20)
+        self.assertIsNone(g.players[3].table[Category.SUM][3])  # nothing written...
+        self.assertEqual(row_cells(g, 3, Category.SUM)[3], "X")  # ...but it reads as locked out
+        self.assertEqual(row_cells(g, 3, Category.PAIR)[3], None)
+
+    def test_column_claim_reads_as_locked_out(self):
+        g = GameEngine(["A", "B", "C"])
+        g.current = 0
+        p = g.players[0]
+        for cat in Category:
+            p.table[cat][0] = 8
+        g._after_record(Category.SUM, 0)
+        self.assertEqual(p.column_bonus[0], 8)
+        self.assertIsNone(g.players[2].column_bonus[0])
+        self.assertEqual(column_bonus_cells(g, 2), ["X", None, None])
+
+    def test_visible_players(self):
+        g = GameEngine([f"P{i}" for i in range(20)])
+        self.assertEqual(visible_players(g), range(20))
+        g.current = 13
+        self.assertEqual(visible_players(g, 6), range(12, 18))
+        self.assertEqual(visible_players(g, 6, start=17), range(14, 20))
+
+    def test_paged_render_width_is_independent_of_table_size(self):
+        rng = random.Random(3)
+        small = GameEngine([f"P{i}" for i in range(6)], dice_source=RandomDice(rng))
+        big = GameEngine([f"P{i}" for i in range(50)], dice_source=RandomDice(rng))
+        for _ in range(120):
+            play_turn(big, greedy_policy, rng)
+        self.assertEqual(len(render_scoreboard(big, count=6)[1]), len(render_scoreboard(small)[1]))
+        lines = render_scoreboard(big, count=6)
+        self.assertIn(f"P{big.current}", lines[1])
+        self.assertTrue(lines[-1].startswith("Standings: 1. "))
+        best, total = standings(big)[0]
+        self.assertIn(f"{big.players[best].name} {total}", lines[-1])
+
+    def test_small_tables_render_unchanged(self):
+        g = GameEngine(["A", "B"])
+        self.assertEqual(render_scoreboard(g), render_scoreboard(g, count=6))
+        self.assertFalse(any(line.startswith("Standings") for line in render_scoreboard(g)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import unittest
+
+
+def _loaded_after(code):
+    probe = code + "\nimport sys; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", probe], check=True,
+                         capture_output=True, text=True).stdout
+    return set(out.split())
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_abaka_is_lean(self):
+        mods = _loaded_after("import abaka")
+        for heavy in ("abaka.engine", "abaka.render", "abaka.school", "abaka.bonus"):
+            self.assertNotIn(heavy, mods)
+
+    def test_public_api_resolves_on_access(self):
+        import abaka
+        from abaka.engine import GameEngine
+        self.assertIs(abaka.GameEngine, GameEngine)
+        self.assertIn("score_category", dir(abaka))
+        with self.assertRaises(AttributeError):
+            abaka.not_a_thing
+
+    def test_ui_helpers_do_not_import_streamlit_or_pil(self):
+        mods = _loaded_after(
+            "from ui_components.scoreboard import _build_scoreboard_html\n"
+            "import ui_components.dice, ui_components.main_ui\n"
+            "from abaka.engine import GameEngine\n"
+            "_build_scoreboard_html(GameEngine(['A', 'B']))"
+        )
+        self.assertNotIn("streamlit", mods)
+        self.assertNotIn("PIL", mods)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import time
+import unittest
+
+from abaka.bots import get_policy
+from abaka.bots.mcts import MCTSPolicy
+from abaka.duplicate import ScriptedDice
+from abaka.engine import GameEngine
+from abaka.models import Category, Die
+from abaka.sim import legal_moves
+
+
+class TestMCTSPolicy(unittest.TestCase):
+    def test_takes_an_obvious_abaka(self):
+        g = GameEngine(["A", "B"])
+        g.start_turn()
+        g.dice = [Die(6), Die(6), Die(6), Die(6), Die(6, is_joker=True)]
+        action = MCTSPolicy(budget_ms=20, seed=0)(g)
+        self.assertEqual(action, ("score", Category.ABAKA, 0))
+
+    def test_respects_time_budget_and_legality(self):
+        g = GameEngine(["A", "B"])
+        g.start_turn()
+        bot = MCTSPolicy(budget_ms=30, seed=1)
+        t0 = time.perf_counter()
+        action = bot(g)
+        self.assertLess(time.perf_counter() - t0, 0.25)
+        self.assertGreater(bot.last_iterations, 16)
+        if action[0] == "reroll":
+            self.assertTrue(all(0 <= i < 5 for i in action[1]))
+        else:
+            self.assertIn(action, legal_moves(g))
+
+    def test_reuses_tree_after_reroll(self):
+        # four sixes with Kare already written: chasing Abaka with the joker is best
+        script = [((6, 6, 6, 6, 2), 4, ((1, 1, 1, 1, 6), (1, 1, 1, 1, 1)))]
+        g = GameEngine(["A"], dice_source=ScriptedDice(script))
+        g.players[0].table[Category.KARE][:3] = [44, 44, 44]
+        g.players[0].table[Category.SCHOOL_6][:3] = ['X', 'X', 'X']
+        g.start_turn()
+        g.first_roll = False
+        bot = MCTSPolicy(budget_ms=200, seed=2)
+        action = bot(g)
+        self.assertEqual(action, ("reroll", [4]))
+        g.reroll(action[1])
+        self.assertEqual(bot(g), ("score", Category.ABAKA, 0))
+        self.assertGreater(bot.last_reused_visits, 0)
+
+    def test_registered(self):
+        self.assertIsInstance(get_policy("mcts-fast"), MCTSPolicy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import tempfile
+import unittest
+
+from abaka.batch import run_script
+from abaka.engine import GameEngine
+from abaka.models import Category
+from abaka.results import ResultsStore
+from abaka.sim import greedy_policy, play_game, random_policy
+
+
+def _finished(names, seed):
+    return play_game(names, [greedy_policy] * len(names), random.Random(seed))
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "results.sqlite3")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_batches_and_aggregates(self):
+        names = ["Ann", "Bob", "Cid"]
+        rng = random.Random(5)
+        with ResultsStore(self.path, batch_size=4) as store:
+            games = []
+            for i in range(10):
+                table = rng.sample(names, 2)
+                g = play_game(table, [greedy_policy, random_policy], random.Random(i),
+                              results=store)
+                games.append(g)
+                self.assertEqual(store.games(), (i + 1) // 4 * 4)  # written in batches
+            store.flush()
+            self.assertEqual(store.games(), 10)
+
+            for name in names:
+                mine = [(g, [p.name for p in g.players].index(name))
+                        for g in games if name in [p.name for p in g.players]]
+                stats = store.player(name)
+                self.assertEqual(stats["games"], len(mine))
+                scores = [g.players[i].calculate_score() for g, i in mine]
+                self.assertAlmostEqual(stats["avg_score"], sum(scores) / len(scores))
+                self.assertEqual(stats["best"], max(scores))
+                rows = store.row_stats(name)
+                self.assertEqual(rows[Category.SUM]["games"], len(mine))
+                recent = store.recent(name, limit=3)
+                self.assertEqual([r["score"] for r in recent], scores[::-1][:3])
+
+            board = store.leaderboard(by="wins", limit=3)
+            self.assertEqual([r["wins"] for r in board], sorted((r["wins"] for r in board), reverse=True))
+            self.assertAlmostEqual(sum(r["wins"] for r in board), 10.0)
+
+            h = store.head_to_head("Ann", "Bob")
+            back = store.head_to_head("Bob", "Ann")
+            self.assertEqual(h["games"], back["games"])
+            self.assertEqual((h["wins"], h["draws"]), (back["losses"], back["draws"]))
+            self.assertEqual(store.head_to_head("Ann", "Nobody")["games"], 0)
+
+            before = (store.leaderboard(by="avg_score", limit=10), h, store.row_stats("Cid"))
+            store.rebuild()
+            after = (store.leaderboard(by="avg_score", limit=10), store.head_to_head("Ann", "Bob"),
+                     store.row_stats("Cid"))
+            self.assertEqual(before, after)
+            with self.assertRaises(ValueError):
+                store.leaderboard(by="luck")
+
+    def test_only_finished_games_and_reopen(self):
+        store = ResultsStore(self.path)
+        with self.assertRaises(ValueError):
+            store.record(GameEngine(["A", "B"]))
+        store.record(_finished(["A", "B"], 1))
+        store.close()  # flushes the queued game
+        with ResultsStore(self.path) as store:
+            self.assertEqual(store.games(), 1)
+            store.record(_finished(["A", "B"], 2))
+            store.flush()
+            self.assertEqual(store.player("A")["games"], 2)
+            self.assertEqual([r["game"] for r in store.recent("A")], [2, 1])
+
+    def test_scripted_games_are_recorded(self):
+        with ResultsStore(self.path) as store:
+            res = list(run_script(["game A,B", "s sum", "end"], results=store))
+            self.assertFalse(res[0]["complete"])
+            store.flush()
+            self.assertEqual(store.games(), 0)  # unfinished games are not results
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import Category, Die, roll_dice
+from abaka.rules import DEFAULT_RULES, RuleSet
+from abaka.school import school_outcome
+from abaka.scoring import reference_score, score_category
+from abaka.sim import legal_moves
+
+
+def _dice(normals, joker):
+    return [Die(v) for v in normals] + [Die(joker, is_joker=True)]
+
+
+class TestRules(unittest.TestCase):
+    def test_tables_match_reference(self):
+        variant = RuleSet(kare_bonus=35, joker_wild=6, small_straight=[1, 2, 3, 4, 6],
+                          first_roll_multiplier=3, royal_full=[6, 5])
+        rng = random.Random(1)
+        for rules in (DEFAULT_RULES, variant):
+            for _ in range(2000):
+                dice = roll_dice()
+                cat = rng.choice(list(Category))
+                first = rng.random() < 0.5
+                self.assertEqual(score_category(dice, cat, first, rules),
+                                 reference_score(dice, cat, first, rules), (dice, cat, rules))
+
+    def test_variant_changes_scores(self):
+        kare = _dice([4, 4, 4, 4], 2)
+        self.assertEqual(score_category(kare, Category.KARE), 36)
+        rules = RuleSet(kare_bonus=30)
+        self.assertEqual(score_category(kare, Category.KARE, rules=rules), 46)
+        # joker wild on 6 instead of 1
+        wild6 = _dice([3, 3, 3, 1], 6)
+        self.assertEqual(score_category(wild6, Category.KARE, rules=RuleSet(joker_wild=6)), 32)
+        self.assertEqual(score_category(wild6, Category.KARE), 0)
+
+    def test_school_costs(self):
+        g = GameEngine(["A"], rules=RuleSet(school_target=2))
+        p = g.players[0]
+        # two fives are an exact write with target 2, a minus under the standard rules
+        dice = _dice([5, 5, 2, 3], 4)
+        self.assertEqual(school_outcome(p, dice, 5, g.rules), (None, False))
+        with self.assertRaises(ValueError):
+            school_outcome(p, dice, 5)
+        g.dice = dice
+        self.assertIn(("score", Category.SCHOOL_5), [m[:2] for m in legal_moves(g)])
+
+    def test_engine_scores_with_rules(self):
+        g = GameEngine(["A", "B"], rules=RuleSet(first_roll_multiplier=1))
+        g.start_turn()
+        g.dice = _dice([2, 2, 2, 5], 6)
+        g.first_roll = True
+        g.record_score(Category.TRIPS, 0)
+        self.assertEqual(g.players[0].table[Category.TRIPS][0], 6)
+
+    def test_load_toml_and_json(self):
+        with tempfile.TemporaryDirectory() as d:
+            toml = os.path.join(d, "house.toml")
+            with open(toml, "w") as f:
+                f.write("[rules]\nkare_bonus = 30\nlarge_straight = [1, 3, 4, 5, 6]\n")
+            js = os.path.join(d, "house.json")
+            with open(js, "w") as f:
+                json.dump({"kare_bonus": 30, "large_straight": [1, 3, 4, 5, 6]}, f)
+            a, b = RuleSet.load(toml), RuleSet.load(js)
+        self.assertEqual(a.name, "house")
+        self.assertEqual(a, b)
+        self.assertIs(a.compiled, b.compiled)
+        self.assertEqual(RuleSet.from_dict(a.to_dict()), a)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            RuleSet(kare_bonnus=30)
+        with self.assertRaises(ValueError):
+            RuleSet(small_straight=[1, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            RuleSet(joker_wild=7)
+        for bad in ({"small_straight": [0, 1, 2, 3, 9]}, {"royal_full": [7, 9]},
+                    {"large_straight": [2, 3, 4, 5, "6"]}, {"first_roll_multiplier": -2},
+                    {"first_roll_multiplier": 0}, {"kare_bonus": -1}, {"school_empty_cost": -2}):
+            with self.assertRaises(ValueError, msg=bad):
+                RuleSet(**bad)
+
+    def test_variant_is_as_fast_as_default(self):
+        rules = RuleSet(kare_bonus=30, joker_wild=6)
+        rules.compiled  # build outside the timing
+        rolls = [roll_dice() for _ in range(500)]
+
+        def bench(r):
+            t = time.perf_counter()
+            for dice in rolls:
+                score_category(dice, Category.FULL, rules=r)
+            return time.perf_counter() - t
+
+        base = min(bench(DEFAULT_RULES) for _ in range(3))
+        variant = min(bench(rules) for _ in range(3))
+        self.assertLess(variant, base * 3 + 0.005)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from abaka import probability as P
+from abaka.engine import GameEngine
+from abaka.models import Category, Die
+from abaka.player import PlayerState
+from abaka.rules import RuleSet
+from abaka.school import plan_school, school_layers, school_outcome, school_tables
+
+
+class TestSchoolTables(unittest.TestCase):
+    def test_tables_match_school_outcome(self):
+        for rules in (None, RuleSet(joker_wild=6, school_target=2, school_empty_cost=3)):
+            tables = school_tables(rules)
+            p = PlayerState("A")
+            for balance in (-2, 0, 3, 30):
+                p.school_balance = balance
+                for s in range(0, P.N_STATES, 7):
+                    dice = P.state_dice(s)
+                    for face, t in tables.items():
+                        try:
+                            delta, _ = school_outcome(p, dice, face, rules)
+                        except ValueError:
+                            self.assertFalse(t.is_legal(s, balance, False))
+                            continue
+                        self.assertTrue(t.is_legal(s, balance, False))
+                        self.assertEqual(t.delta[s], 0 if delta is None else delta)
+                        self.assertEqual(t.exact[s], delta is None)
+
+    def test_plan_without_rerolls_is_the_write_now(self):
+        g = GameEngine(["A"])
+        g.dice = [Die(4), Die(4), Die(2), Die(6), Die(1, is_joker=True)]
+        g.rolls_left = 0
+        plan = plan_school(g)
+        self.assertEqual(set(plan), {c for c in Category if c.name.startswith("SCHOOL_")})
+        four = plan[Category.SCHOOL_4]
+        self.assertEqual((four["now"], four["ev"], four["p_exact"]), (0, 0.0, 1.0))
+        self.assertIsNone(plan[Category.SCHOOL_3]["now"])  # k=1 with no balance
+        self.assertEqual(plan[Category.SCHOOL_3]["p_legal"], 0.0)
+
+    def test_rerolls_improve_the_plan(self):
+        g = GameEngine(["A"])
+        g.dice = [Die(5), Die(2), Die(3), Die(6), Die(4, is_joker=True)]
+        g.rolls_left = 2
+        plan = plan_school(g, [Category.SCHOOL_6])[Category.SCHOOL_6]
+        self.assertGreater(plan["ev"], -12.0)
+        self.assertTrue(0.0 < plan["p_exact"] <= plan["p_legal"] <= 1.0)
+        # batch form: the same numbers for every state
+        ev, exact, legal = school_layers(None, 6, 0, False, 2)
+        s = P.state_index(g.dice)
+        self.assertEqual(ev[2][s], plan["ev"])
+        self.assertEqual(len(legal[0]), P.N_STATES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+
+from abaka.models import Category
+from abaka.rules import RuleSet
+from abaka.server import HashRing, Shard, TableRouter
+
+
+def _play_round(router, ids):
+    return router.run([(tid, "turn", ("greedy",)) for tid in ids])
+
+
+class TestHashRing(unittest.TestCase):
+    def test_adding_a_node_moves_only_its_share(self):
+        ring = HashRing([0, 1, 2])
+        keys = [f"t{i}" for i in range(2000)]
+        before = {k: ring.node_for(k) for k in keys}
+        ring.add(3)
+        moved = [k for k in keys if ring.node_for(k) != before[k]]
+        self.assertTrue(all(ring.node_for(k) == 3 for k in moved))
+        self.assertLess(abs(len(moved) / len(keys) - 0.25), 0.1)
+        ring.remove(3)
+        self.assertEqual({k: ring.node_for(k) for k in keys}, before)
+
+
+class TestTableRouter(unittest.TestCase):
+    def test_in_process_games_and_errors(self):
+        with TableRouter(workers=3, seed=1, in_process=True) as router:
+            ids = [f"table-{i}" for i in range(12)]
+            router.run([(tid, "create", (["A", "B"], None)) for tid in ids])
+            self.assertEqual(sum(router.tables().values()), 12)
+            while not all(_play_round(router, ids)):
+                pass
+            self.assertTrue(all(router.get(tid).is_game_over() for tid in ids))
+
+            router.create("manual", ["A"], rules=RuleSet(kare_bonus=30))
+            self.assertEqual(router.get("manual").rules.kare_bonus, 30)
+            with self.assertRaises(RuntimeError):
+                router.apply("manual", ("reroll", [0]))  # no roll yet
+            router.apply("manual", ("start",))
+            with self.assertRaises(ValueError):
+                router.create("manual", ["B"])
+            res = router.run([("manual", "apply", (("cross", Category.ABAKA, 0),)),
+                              ("missing", "get", ())])
+            self.assertEqual(res[0], 0)
+            self.assertIsInstance(res[1], KeyError)
+
+    def test_migration_keeps_tables(self):
+        with TableRouter(workers=2, seed=2, in_process=True) as router:
+            ids = [f"g{i}" for i in range(40)]
+            router.run([(tid, "create", (["A", "B"], None)) for tid in ids])
+            for _ in range(5):
+                _play_round(router, ids)
+            before = {tid: router.get(tid).to_bytes() for tid in ids}
+            new = router.add_worker()
+            self.assertGreater(router.tables()[new], 0)
+            router.drain_worker(0)
+            self.assertNotIn(0, router.tables())
+            self.assertEqual({tid: router.get(tid).to_bytes() for tid in ids}, before)
+            _play_round(router, ids)  # migrated tables keep playing
+
+    def test_failed_moves_leave_tables_in_place(self):
+        with TableRouter(workers=2, seed=5, in_process=True) as router:
+            ids = [f"f{i}" for i in range(30)]
+            router.run([(tid, "create", (["A", "B"], None)) for tid in ids])
+            _play_round(router, ids)
+            before = {tid: router.get(tid).to_bytes() for tid in ids}
+            target = router._next_id
+            import_table = Shard._import
+
+            def flaky_import(shard, tid, blob):
+                if shard is router._shards[target].shard:
+                    raise OSError("disk full")
+                return import_table(shard, tid, blob)
+
+            with mock.patch.object(Shard, "_import", flaky_import):
+                router.add_worker()
+            self.assertEqual(router.tables()[target], 0)
+            self.assertEqual({tid: router.get(tid).to_bytes() for tid in ids}, before)
+
+            with mock.patch.object(Shard, "_export", side_effect=OSError("disk full"), autospec=True):
+                with self.assertRaises(RuntimeError):
+                    router.drain_worker(0)
+            self.assertIn(0, router.workers)
+            self.assertEqual({tid: router.get(tid).to_bytes() for tid in ids}, before)
+            _play_round(router, ids)
+            router.drain_worker(0)  # the moves go through once the shards recover
+            self.assertNotIn(0, router.tables())
+            self.assertEqual(sum(router.tables().values()), len(ids))
+
+    def test_worker_processes(self):
+        with TableRouter(workers=2, seed=3) as router:
+            ids = [f"p{i}" for i in range(8)]
+            router.run([(tid, "create", (["A", "B", "C"], None)) for tid in ids])
+            for _ in range(3):
+                _play_round(router, ids)
+            before = {tid: router.get(tid).to_bytes() for tid in ids}
+            router.add_worker()
+            router.drain_worker(1)
+            self.assertEqual({tid: router.get(tid).to_bytes() for tid in ids}, before)
+            self.assertEqual(len(router.workers), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
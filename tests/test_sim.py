@@ -0,0 +1,31 @@
+import random
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import Category, Die, RandomDice
+from abaka.sim import greedy_policy, legal_moves, play_game, random_policy
+
+
+class TestLegalMoves(unittest.TestCase):
+    def test_strict_rows_need_the_combo(self):
+        g = GameEngine(["A"])
+        g.dice = [Die(1), Die(2), Die(3), Die(5), Die(6, is_joker=True)]
+        moves = legal_moves(g)
+        self.assertNotIn(("score", Category.PAIR, 0), moves)
+        self.assertIn(("cross", Category.PAIR, 0), moves)
+        self.assertIn(("score", Category.SUM, 0), moves)
+        # one die per school row, no balance yet -> not writable
+        self.assertNotIn(("score", Category.SCHOOL_1, 0), moves)
+        self.assertNotIn(("cross", Category.SCHOOL_4, 0), moves)
+
+    def test_full_games_terminate(self):
+        for policies in ([greedy_policy, random_policy], [random_policy] * 3):
+            names = [f"P{i}" for i in range(len(policies))]
+            g = GameEngine(names, dice_source=RandomDice(random.Random(7)))
+            g = play_game(names, policies, random.Random(3), engine=g)
+            self.assertTrue(g.is_game_over())
+            self.assertTrue(all(p.non_school_complete() for p in g.players))
+
+
+if __name__ == "__main__":
+    unittest.main()
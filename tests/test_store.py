@@ -0,0 +1,133 @@
+import mmap
+import os
+import random
+import tempfile
+import unittest
+
+from abaka import snapshot
+from abaka.engine import GameEngine
+from abaka.models import Category, Die, RandomDice
+from abaka.rules import RuleSet
+from abaka.sim import play_turn, random_policy
+from abaka.store import LRUSessionStore, SessionStore, SQLiteBacking
+
+
+def _midgame_engine():
+    g = GameEngine(["Ана", "B"])
+    g.dice = [Die(5), Die(5), Die(5), Die(5), Die(2, is_joker=True)]
+    g.first_roll = False
+    g.record_score(Category.SCHOOL_5, 0)         # balance +5
+    g.dice = [Die(1), Die(2), Die(3), Die(4), Die(1, is_joker=True)]
+    g.record_cross(Category.KARE, 0)
+    g.dice = [Die(6), Die(6), Die(6), Die(2), Die(2, is_joker=True)]
+    g.rolls_left = 1
+    return g
+
+
+def _state(g):
+    return (
+        [(p.name, p.table, p.column_bonus, p.school_balance, p.school_balance_loc) for p in g.players],
+        [(d.value, d.is_joker) for d in g.dice], g.current, g.rolls_left, g.first_roll,
+        {k for k, v in g.school_minus_used.items() if v}, {k for k, v in g.row_bonus_blocked.items() if v},
+        g.row_bonus_claimed, g.col_bonus_claimed, g.rules,
+    )
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_round_trip(self):
+        g = _midgame_engine()
+        h = snapshot.loads(snapshot.dumps(g))
+        self.assertEqual([p.name for p in h.players], ["Ана", "B"])
+        for p, q in zip(g.players, h.players):
+            self.assertEqual(p.table, q.table)
+            self.assertEqual(p.column_bonus, q.column_bonus)
+            self.assertEqual(p.school_balance, q.school_balance)
+            self.assertEqual(p.school_balance_loc, q.school_balance_loc)
+        self.assertEqual([repr(d) for d in g.dice], [repr(d) for d in h.dice])
+        self.assertEqual((g.current, g.rolls_left, g.first_roll), (h.current, h.rolls_left, h.first_roll))
+        self.assertEqual(g.row_bonus_blocked, h.row_bonus_blocked)
+        self.assertEqual(g.row_bonus_claimed, h.row_bonus_claimed)
+
+    def test_randomized_round_trips(self):
+        rng = random.Random(5)
+        rules = RuleSet(kare_bonus=30, joker_wild=6)
+        for n in range(40):
+            g = GameEngine([f"P{i}" for i in range(rng.randint(1, 5))],
+                           dice_source=RandomDice(rng), rules=rules if n % 3 == 0 else None)
+            for _ in range(rng.randint(0, 60)):
+                if g.is_game_over():
+                    break
+                play_turn(g, random_policy, rng)
+            if rng.random() < 0.5 and not g.is_game_over():
+                g.start_turn()
+            h = GameEngine.from_bytes(g.to_bytes())
+            self.assertEqual(_state(h), _state(g))
+            self.assertEqual(h.to_bytes(), g.to_bytes())
+
+    def test_reads_concatenated_snapshots_from_mmap(self):
+        games = [_midgame_engine(), GameEngine(["Solo"], rules=RuleSet(school_target=2))]
+        with tempfile.TemporaryFile() as f:
+            f.write(b"".join(g.to_bytes() for g in games))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                off = 0
+                for g in games:
+                    h, off = snapshot.read(m, off)
+                    self.assertEqual(_state(h), _state(g))
+                    del h
+                self.assertEqual(off, len(m))
+
+    def test_reads_version_1(self):
+        g = _midgame_engine()
+        blob = g.to_bytes()
+        rules_at = snapshot._HEADER.size + snapshot._ENGINE.size + len(g.dice)
+        v1 = b"ABK\x01" + blob[4:rules_at] + blob[rules_at + 2:]
+        self.assertEqual(_state(snapshot.loads(v1)), _state(g))
+
+    def test_rejects_foreign_bytes(self):
+        with self.assertRaises(ValueError):
+            snapshot.loads(b"XYZ\x01" + bytes(16))
+
+
+class TestLRUSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sessions.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_eviction_and_transparent_restore(self):
+        store = LRUSessionStore(capacity=2, backing=SQLiteBacking(self.path), write_through=False)
+        engines = {k: _midgame_engine() for k in ("a", "b", "c")}
+        for k, g in engines.items():
+            store.put(k, g)
+        self.assertEqual(len(store), 2)
+        self.assertNotIn("a", store)
+        restored = store.get("a")
+        self.assertIsNotNone(restored)
+        self.assertEqual(restored.players[0].table, engines["a"].players[0].table)
+        self.assertEqual(store.evictions, 2)
+        store.close()
+
+    def test_write_through_survives_restart(self):
+        store = LRUSessionStore(capacity=4, backing=SQLiteBacking(self.path))
+        store.put("g", _midgame_engine())
+        store.close()
+        fresh = LRUSessionStore(capacity=4, backing=SQLiteBacking(self.path))
+        self.assertEqual(fresh.get("g").players[0].school_balance, 5)
+        fresh.delete("g")
+        self.assertIsNone(fresh.get("g"))
+        fresh.close()
+
+    def test_incomplete_backend_fails_on_construction(self):
+        class GetOnly(SessionStore):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            GetOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import Category, Die
+from abaka.sync import SpectatorHub, StateSync, SyncClient, SyncError, flatten_state
+
+
+def _play_sum(g):
+    g.dice = [Die(6), Die(6), Die(5), Die(4), Die(3, is_joker=True)]
+    g.first_roll = False
+    g.record_score(Category.SUM, g.leftmost_slot(g.players[g.current], Category.SUM))
+
+
+class TestStateSync(unittest.TestCase):
+    def test_delta_chain_reproduces_state(self):
+        g = GameEngine(["A", "B"])
+        sync = StateSync(g)
+        client = SyncClient()
+        client.apply(sync.snapshot())
+        for _ in range(4):
+            _play_sum(g)
+            buf = sync.commit()
+            self.assertIsNotNone(buf)
+            client.apply(buf)
+        self.assertEqual(client.version, sync.version)
+        self.assertEqual(client.state, flatten_state(g))
+
+    def test_delta_only_carries_changes(self):
+        g = GameEngine(["A", "B"])
+        sync = StateSync(g)
+        self.assertIsNone(sync.commit())
+        _play_sum(g)
+        buf = sync.commit()
+        self.assertIn(b'"0.SUM.0":24', buf)
+        self.assertNotIn(b"1.PAIR", buf)
+
+    def test_resume_falls_back_to_snapshot(self):
+        g = GameEngine(["A", "B"])
+        sync = StateSync(g, history=2)
+        for _ in range(5):
+            _play_sum(g)
+            sync.commit()
+        self.assertEqual(len(sync.since(3)), 2)
+        msgs = sync.since(1)
+        self.assertEqual(len(msgs), 1)
+        client = SyncClient()
+        client.apply(msgs[0])
+        self.assertEqual(client.state, flatten_state(g))
+
+    def test_out_of_order_delta_rejected(self):
+        g = GameEngine(["A"])
+        sync = StateSync(g)
+        client = SyncClient()
+        client.apply(sync.snapshot())
+        _play_sum(g)
+        sync.commit()
+        _play_sum(g)
+        with self.assertRaises(SyncError):
+            client.apply(sync.commit())
+
+
+class TestSpectatorHub(unittest.TestCase):
+    def test_fanout_shares_buffer_and_drops_slow_clients(self):
+        g = GameEngine(["A", "B"])
+        hub = SpectatorHub(max_pending=2)
+        sync = StateSync(g, hub=hub)
+        fast = hub.subscribe(sync)
+        slow = hub.subscribe(sync)
+        for _ in range(3):
+            fast.drain()
+            _play_sum(g)
+            sync.commit()
+        self.assertTrue(slow.dropped)
+        self.assertFalse(fast.dropped)
+        self.assertEqual(len(hub), 1)
+        self.assertIs(fast.drain()[0], sync.since(sync.version - 1)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from abaka.bots import get_policy, register_policy, POLICIES
+from abaka.tournament import bradley_terry, round_robin, run_tournament, swiss_tables
+
+
+class TestRatings(unittest.TestCase):
+    def test_equal_results_give_equal_ratings(self):
+        r, e = bradley_terry([[0, 50], [50, 0]], [[0, 100], [100, 0]])
+        self.assertAlmostEqual(r[0], r[1], places=6)
+        self.assertAlmostEqual(sum(r) / 2, 1500.0, places=6)
+
+    def test_more_games_shrink_the_interval(self):
+        r1, e1 = bradley_terry([[0, 7], [3, 0]], [[0, 10], [10, 0]])
+        r2, e2 = bradley_terry([[0, 700], [300, 0]], [[0, 1000], [1000, 0]])
+        self.assertGreater(r1[0], r1[1])
+        self.assertLess(e2[0], e1[0])
+        # 70% expected score ~ +147 Elo
+        self.assertAlmostEqual(r2[0] - r2[1], 147, delta=5)
+
+
+class TestPairings(unittest.TestCase):
+    def test_round_robin(self):
+        self.assertEqual(round_robin(3, 2), [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(round_robin(2, 3), [(0, 1, 0)])
+
+    def test_swiss_groups_by_rating(self):
+        tables = swiss_tables([1600, 1400, 1550, 1450], 2, random.Random(0))
+        self.assertEqual(tables, [(0, 2), (3, 1)])
+
+
+class TestTournament(unittest.TestCase):
+    def test_registry(self):
+        with self.assertRaises(KeyError):
+            get_policy("no-such-bot")
+        register_policy("greedy2")(POLICIES["greedy"])
+        try:
+            self.assertIs(get_policy("greedy2"), get_policy("greedy"))
+        finally:
+            del POLICIES["greedy2"]
+
+    def test_inline_round_robin(self):
+        state = random.getstate()
+        res = run_tournament(["greedy", "random"], games=4, workers=1, batch=2, seed=1)
+        self.assertEqual(random.getstate(), state)  # the caller's RNG is left alone
+        self.assertEqual(res.games, [4, 4])
+        self.assertEqual(res.pair_games[0][1], 4)
+        self.assertAlmostEqual(res.wins[0][1] + res.wins[1][0], 4)
+        self.assertGreater(res.ratings[0], res.ratings[1])
+
+    def test_process_pool(self):
+        res = run_tournament(["greedy", "random"], games=4, table_size=3, workers=2, batch=2, seed=2)
+        self.assertEqual(sum(res.games), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
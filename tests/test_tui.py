@@ -0,0 +1,98 @@
+import io
+import random
+import re
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import RandomDice
+from abaka.render import render_scoreboard
+from abaka.sim import apply, greedy_policy, legal_moves
+from abaka.tui import HEADER_LINE, TerminalScoreboard, _player_x
+
+_ESC = re.compile(r"\x1b\[(\d*);?(\d*)([HJK])")
+
+
+class _Screen:
+    """Just enough of an ANSI terminal to replay what TerminalScoreboard writes."""
+
+    def __init__(self, rows=40, cols=200):
+        self.rows = [[" "] * cols for _ in range(rows)]
+        self.y = self.x = 0
+
+    def feed(self, data):
+        pos = 0
+        while pos < len(data):
+            m = _ESC.match(data, pos)
+            if m:
+                a, b, op = m.groups()
+                if op == "H":
+                    self.y, self.x = int(a) - 1, int(b) - 1
+                elif op == "K":
+                    self.rows[self.y][self.x:] = [" "] * (len(self.rows[self.y]) - self.x)
+                else:
+                    self.rows = [[" "] * len(r) for r in self.rows]
+                pos = m.end()
+                continue
+            ch = data[pos]
+            if ch == "\r":
+                self.x = 0
+            elif ch == "\n":
+                self.y += 1
+            else:
+                self.rows[self.y][self.x] = ch
+                self.x += 1
+            pos += 1
+
+    def lines(self, n):
+        return ["".join(r).rstrip() for r in self.rows[:n]]
+
+
+def _expected(engine):
+    lines = render_scoreboard(engine)
+    head = list(lines[HEADER_LINE])
+    head[_player_x(engine.current) - 1] = ">"
+    lines[HEADER_LINE] = "".join(head)
+    return [line.rstrip() for line in lines]
+
+
+class TestTerminalScoreboard(unittest.TestCase):
+    def test_incremental_frames_match_full_render(self):
+        rng = random.Random(4)
+        g = GameEngine(["Ann", "Bob", "Cy"], dice_source=RandomDice(rng))
+        out = io.StringIO()
+        tui = TerminalScoreboard(out)
+        screen = _Screen()
+        tui.draw(g)
+        screen.feed(out.getvalue())
+        self.assertEqual(screen.lines(23), _expected(g))
+        for move in range(60):
+            g.start_turn()
+            while True:
+                action = greedy_policy(g, rng)
+                apply(g, action)
+                if action[0] != "reroll":
+                    break
+            out.seek(0)
+            out.truncate()
+            tui.update(g, (action[1],))
+            screen.feed(out.getvalue())
+            self.assertEqual(screen.lines(23), _expected(g), f"after move {move}")
+        self.assertLess(tui.cells_written, 60 * 12)
+
+    def test_bandwidth_scales_with_change(self):
+        g = GameEngine([f"P{i}" for i in range(8)], dice_source=RandomDice(random.Random(1)))
+        out = io.StringIO()
+        tui = TerminalScoreboard(out)
+        tui.draw(g)
+        full = tui.bytes_written
+        g.start_turn()
+        cat = legal_moves(g)[0][1]
+        g.record_cross(cat, 0)
+        before = tui.bytes_written
+        tui.update(g, (cat,))
+        self.assertLess(tui.bytes_written - before, full / 10)
+        self.assertEqual(tui.update(g, (cat,)), 0)  # nothing changed: nothing written
+
+
+if __name__ == "__main__":
+    unittest.main()
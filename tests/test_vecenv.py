@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import Category, Roll
+from abaka.sim import legal_moves
+from abaka.vecenv import N_ACTIONS, N_CATS, N_WRITES, OBS_SIZE, VectorEnv, legal_mask, observe, to_action
+
+
+def _random_actions(env, rngs):
+    out = []
+    for i, rng in enumerate(rngs):
+        legal = [a for a in range(N_ACTIONS) if env.masks[i, a]]
+        out.append(rng.choice(legal))
+    return out
+
+
+class TestEncoding(unittest.TestCase):
+    def test_mask_matches_legal_moves(self):
+        g = GameEngine(["A", "B"])
+        g.start_turn()
+        g.dice = Roll.of((6, 6, 6, 6, 2), joker=4)
+        mask = legal_mask(g)
+        moves = {to_action(g, a) for a in range(N_WRITES) if mask[a]}
+        self.assertEqual(moves, set(legal_moves(g)))
+        self.assertTrue(all(mask[N_WRITES:]))
+        g.rolls_left = 0
+        self.assertFalse(any(legal_mask(g)[N_WRITES:]))
+        self.assertEqual(to_action(g, N_WRITES + 0b10100 - 1), ("reroll", [2, 4]))
+        self.assertEqual(to_action(g, N_CATS + Category.ABAKA.index), ("cross", Category.ABAKA, 0))
+
+    def test_observation(self):
+        g = GameEngine(["A", "B"])
+        g.start_turn()
+        g.dice = Roll.of((1, 2, 3, 4, 5), joker=0)
+        obs = observe(g)
+        self.assertEqual(len(obs), OBS_SIZE)
+        self.assertEqual(sum(obs[:30]), 5.0)
+        self.assertEqual(obs[30], 1.0)  # joker in position 0
+        self.assertEqual(obs[35 + 2], 1.0)
+
+
+class TestVectorEnv(unittest.TestCase):
+    def _play(self, env, steps, seed):
+        rngs = [random.Random(seed + i) for i in range(env.n_envs)]
+        env.reset()
+        trace = []
+        for _ in range(steps):
+            obs, rewards, dones, masks = env.step(_random_actions(env, rngs))
+            trace.append((obs.tobytes(), rewards.tolist(), dones.tolist()))
+        return trace
+
+    def test_in_process_episodes(self):
+        with VectorEnv(3, workers=0, seed=1) as env:
+            trace = self._play(env, 400, seed=2)
+        self.assertGreater(sum(sum(d) for _, _, d in trace), 0)  # games finish and restart
+        self.assertEqual(env.obs.shape, (3, OBS_SIZE))
+
+    def test_workers_match_in_process(self):
+        # one env per worker with the same seed: identical to a single in-process slice
+        with VectorEnv(2, workers=2, seed=5) as env:
+            multi = self._play(env, 60, seed=3)
+        with VectorEnv(1, workers=0, seed=5) as env:
+            first = self._play(env, 60, seed=3)
+        self.assertEqual([r[0] for _, r, _ in multi], [r[0] for _, r, _ in first])
+
+    def test_dead_worker_fails_the_step(self):
+        env = VectorEnv(2, workers=2, seed=6, timeout=2.0)
+        env.reset()
+        env._procs[1].kill()
+        env._procs[1].join()
+        with self.assertRaisesRegex(RuntimeError, "worker 1 exited"):
+            env.step(_random_actions(env, [random.Random(0)] * 2))
+        with self.assertRaises(RuntimeError):
+            env.reset()  # closed
+
+    def test_win_reward_and_illegal_actions(self):
+        with VectorEnv(2, workers=0, reward="win", seed=4) as env:
+            trace = self._play(env, 300, seed=4)
+            for _, rewards, dones in trace:
+                for r, d in zip(rewards, dones):
+                    self.assertTrue(d or r == 0.0)
+            illegal = [a for a in range(N_ACTIONS) if not env.masks[0, a]]
+            with self.assertRaises(ValueError):
+                env.step([illegal[0], 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
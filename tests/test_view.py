@@ -0,0 +1,102 @@
+import random
+import threading
+import unittest
+
+from abaka import snapshot
+from abaka.engine import GameEngine
+from abaka.models import Category, Roll
+from abaka.sim import greedy_policy, play_turn
+
+
+def _sheet(p):
+    return ({cat: list(slots) for cat, slots in p.table.items()}, list(p.column_bonus),
+            p.school_balance, p.school_balance_loc)
+
+
+class TestGameView(unittest.TestCase):
+    def test_versions_share_unchanged_parts(self):
+        g = GameEngine(["A", "B"])
+        v0 = g.view
+        g.start_turn()
+        v1 = g.view
+        self.assertEqual(v1.version, v0.version + 1)
+        self.assertIs(v1.players, v0.players)
+        self.assertEqual(v1.dice, g.dice)
+
+        g.dice = Roll.of((6, 6, 6, 6, 1))
+        g.record_score(Category.SUM, 0)
+        v2 = g.view
+        self.assertIs(v2.players[1], v1.players[1])  # only the mover is re-frozen
+        a1, a2 = v1.players[0].table, v2.players[0].table
+        self.assertEqual(a2[Category.SUM][0], g.players[0].table[Category.SUM][0])
+        self.assertIsNone(a1[Category.SUM][0])  # the old version is untouched
+        self.assertIs(a2[Category.PAIR], a1[Category.PAIR])
+        self.assertIs(v2.row_bonus_blocked, v1.row_bonus_blocked)
+        self.assertEqual(v2.current, 1)
+
+    def test_views_are_read_only(self):
+        g = GameEngine(["A"])
+        p = g.view.players[0]
+        with self.assertRaises(TypeError):
+            p.record(Category.SUM, 0, 10)
+        with self.assertRaises(TypeError):
+            p.table[Category.SUM] = (1, 2, 3, None)
+        with self.assertRaises(TypeError):
+            p.table[Category.SUM][0] = 1
+
+    def test_failed_write_publishes_nothing(self):
+        g = GameEngine(["A", "B"])
+        g.start_turn()
+        g.dice = Roll.of((1, 2, 3, 4, 6))
+        before = g.view
+        with self.assertRaises(ValueError):
+            g.record_score(Category.KARE, 0)
+        self.assertIs(g.view, before)
+
+    def test_matches_engine_through_a_game(self):
+        g = GameEngine(["A", "B"])
+        rng = random.Random(7)
+        while not g.is_game_over():
+            play_turn(g, greedy_policy, rng)
+            v = g.view
+            self.assertEqual([_sheet(p) for p in v.players], [_sheet(p) for p in g.players])
+            self.assertEqual(dict(v.row_bonus_claimed), g.row_bonus_claimed)
+            self.assertEqual(list(v.col_bonus_claimed), g.col_bonus_claimed)
+            self.assertEqual(dict(v.school_minus_used), g.school_minus_used)
+            self.assertEqual(dict(v.row_bonus_blocked), g.row_bonus_blocked)
+        self.assertTrue(g.view.is_game_over())
+        self.assertEqual(g.view.calculate_final_scores(), g.calculate_final_scores())
+        self.assertEqual(g.view.render(), g.render())
+        self.assertEqual(g.view.to_bytes(), g.to_bytes())
+        self.assertEqual(snapshot.loads(g.to_bytes()).view.to_bytes(), g.to_bytes())
+
+    def test_reader_thread_sees_whole_versions(self):
+        g = GameEngine(["A", "B"])
+        done = threading.Event()
+        seen = []
+
+        def reader():
+            last = -1
+            while not done.is_set():
+                v = g.view
+                if v.version != last:
+                    last = v.version
+                    seen.append((v.version, v.to_bytes(), v.calculate_final_scores()))
+
+        t = threading.Thread(target=reader)
+        t.start()
+        rng = random.Random(3)
+        try:
+            while not g.is_game_over():
+                play_turn(g, greedy_policy, rng)
+        finally:
+            done.set()
+            t.join()
+        versions = [s[0] for s in seen]
+        self.assertEqual(versions, sorted(versions))
+        for _, blob, scores in seen:
+            self.assertEqual(snapshot.loads(blob).calculate_final_scores(), scores)
+
+
+if __name__ == "__main__":
+    unittest.main()
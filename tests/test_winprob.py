@@ -0,0 +1,58 @@
+import time
+import unittest
+
+from abaka.engine import GameEngine
+from abaka.models import Category
+from abaka.winprob import WinProbEstimator, estimate_win_probabilities, rollout_wins, wilson
+from abaka import snapshot
+
+
+def _nearly_done(lead):
+    """Both players one SUM cell from the end; A leads by `lead` points."""
+    g = GameEngine(["A", "B"])
+    for p in g.players:
+        for cat, slots in p.table.items():
+            slots[:3] = ["X", "X", "X"] if cat != Category.SUM else [10, 10, None]
+    g.players[0].table[Category.PAIR][3] = lead
+    return g
+
+
+class TestWinProb(unittest.TestCase):
+    def test_wilson(self):
+        lo, hi = wilson(50, 100)
+        self.assertLess(lo, 0.5)
+        self.assertGreater(hi, 0.5)
+        self.assertEqual(wilson(0, 0), (0.0, 1.0))
+
+    def test_decided_game(self):
+        blob = snapshot.dumps(_nearly_done(100))
+        wins, games = rollout_wins(blob, "greedy", False, time.time() + 60, 5, seed=1)
+        self.assertEqual((wins, games), ([5.0, 0.0], 5))
+
+    def test_in_process_progressive(self):
+        est = WinProbEstimator(workers=0)
+        seen = list(est.iter_estimates(_nearly_done(3), budget_ms=120, slices=3, seed=2))
+        self.assertGreaterEqual(len(seen), 2)
+        self.assertLess(seen[0].games, seen[-1].games)
+        final = seen[-1]
+        self.assertAlmostEqual(sum(final.probs), 1.0)
+        self.assertGreater(final.probs[0], final.probs[1])
+        lo, hi = final.bounds[0]
+        self.assertLessEqual(lo, final.probs[0])
+        self.assertLessEqual(final.probs[0], hi)
+
+    def test_worker_pool_shares_snapshot(self):
+        with WinProbEstimator(workers=2) as est:
+            first = est.estimate(_nearly_done(200), budget_ms=150)
+            second = est.estimate(_nearly_done(-200), budget_ms=150)
+        self.assertEqual(first.probs, [1.0, 0.0])
+        self.assertEqual(second.probs, [0.0, 1.0])
+        self.assertGreater(second.games, 0)
+
+    def test_one_shot_wrapper(self):
+        est = estimate_win_probabilities(_nearly_done(0), budget_ms=50, workers=0)
+        self.assertEqual(set(est.as_dict()), {"A", "B"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+Deferred imports for heavy UI dependencies (streamlit, PIL).
+`st = lazy_module("streamlit")` behaves like the module but only imports it
+on first attribute access, so helpers such as the scoreboard HTML builder can
+be imported and benchmarked without paying for (or having) streamlit.
+"""
+
+import importlib
+
+
+class _LazyModule:
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str) -> None:
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> _LazyModule:
+    return _LazyModule(name)
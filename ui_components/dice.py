@@ -3,10 +3,17 @@ Dice display component for Abaka game interface.
 Handles rendering of dice, selection, and reroll functionality.
 """
 
-import streamlit as st
-from PIL import Image, ImageDraw
+from __future__ import annotations
+
+from ui_components._lazy import lazy_module
 from abaka.engine import GameEngine
 from abaka.models import Category
+from ui_components.hints import current_hints, render_keep_hints
+from ui_components.session_store import save_engine
+
+st = lazy_module("streamlit")
+Image = lazy_module("PIL.Image")
+ImageDraw = lazy_module("PIL.ImageDraw")
 
 
 def render_dice_section(engine: GameEngine) -> None:
@@ -36,6 +43,7 @@ def render_dice_section(engine: GameEngine) -> None:
     # Game info and reroll
     _render_game_info(engine)
     _render_reroll_section(engine)
+    render_keep_hints(engine, current_hints(engine))
 
 
 def _render_game_info(engine: GameEngine) -> None:
@@ -74,6 +82,7 @@ def _render_reroll_section(engine: GameEngine) -> None:
                  key="reroll_btn", 
                  type="secondary"):
         engine.reroll(sorted(st.session_state.selected_dice))
+        save_engine(engine)
         st.session_state.selected_dice.clear()
         st.rerun()
 
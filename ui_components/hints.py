@@ -0,0 +1,79 @@
+"""
+Expected-value hints for the Abaka game interface.
+Hints are computed by a background thread (see abaka.hints) and cached per
+(sheet, dice), so reruns of the same position reuse the answer.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from ui_components._lazy import lazy_module
+from abaka.constants import DENOM, IS_SCHOOL
+from abaka.engine import GameEngine
+from abaka.hints import HintService
+from abaka.models import Category
+from abaka.probability import reroll_indices
+
+st = lazy_module("streamlit")
+
+_SERVICE = None
+
+
+def get_hint_service() -> HintService:
+    """Process-wide hint service shared by all Streamlit sessions."""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = HintService()
+    return _SERVICE
+
+
+def current_hints(engine: GameEngine) -> Optional[dict]:
+    """Hints for the position, or None while they are still being computed."""
+    if not engine.dice or not st.session_state.get("show_hints", True):
+        return None
+    return get_hint_service().lookup(engine)
+
+
+def move_caption(hints: Optional[dict], cat: Category, action: str) -> str:
+    """One-line annotation for a move button."""
+    if hints is None:
+        return "EV: computing…"
+    m = hints["moves"].get(cat)
+    if m is None:
+        return ""
+    if action == "Cross":
+        return f"hit {m['p_hit']:.0%} if chased"
+    now = "—" if m["now"] is None else f"{m['now']:g}"
+    if m["chase_ev"] is None:
+        return f"now {now} · hit {m['p_hit']:.0%}"
+    return f"now {now} · chase EV {m['chase_ev']:.1f} · hit {m['p_hit']:.0%}"
+
+
+def render_keep_hints(engine: GameEngine, hints: Optional[dict], limit: int = 5) -> None:
+    """List the best keep options; choosing one preselects the dice to reroll."""
+    if engine.rolls_left <= 0 or not engine.dice:
+        return
+    with st.expander("Keep hints", expanded=False):
+        if hints is None:
+            st.caption("Computing expected values…")
+            return
+        st.caption(f"Stop now: {hints['stop_ev']:g} · best play: {hints['turn_ev']:.1f} expected")
+        for i, k in enumerate(hints["keeps"][:limit]):
+            kept, keep_joker = k["keep"]
+            faces = " ".join(str(v) for v in kept) or "nothing"
+            if keep_joker:
+                faces += " + joker"
+            top = sorted(k["p_hit"].items(), key=lambda kv: -kv[1])[:3]
+            odds = ", ".join(f"{_short(c)} {p:.0%}" for c, p in top)
+            cols = st.columns([3, 1])
+            cols[0].write(f"Keep **{faces}** — EV {k['ev']:.1f} ({odds})")
+            if cols[1].button("Select", key=f"keep_hint_{i}"):
+                st.session_state.selected_dice = set(reroll_indices(engine.dice, k["keep"]))
+                st.rerun()
+
+
+def _short(cat: Category) -> str:
+    if IS_SCHOOL[cat.index]:
+        return f"S{DENOM[cat.index]}"
+    return cat.name.replace("_", " ").title()
@@ -3,12 +3,14 @@ Main UI orchestrator for Abaka game interface.
 Coordinates all components and handles the main game flow.
 """
 
-import streamlit as st
+from ui_components._lazy import lazy_module
 from abaka.engine import GameEngine
-from abaka.models import roll_dice
 from ui_components.scoreboard import render_scoreboard
 from ui_components.dice import render_dice_section
 from ui_components.move_selection import render_move_selection
+from ui_components.session_store import load_engine, record_result, save_engine, start_new_game
+
+st = lazy_module("streamlit")
 
 
 def render_main_ui(engine: GameEngine) -> None:
@@ -22,6 +24,7 @@ def render_main_ui(engine: GameEngine) -> None:
     # Check if game is over
     if engine.is_game_over():
         st.success("🎉 Game Over! 🎉")
+        record_result(engine)
         final_scores = engine.calculate_final_scores()
         st.subheader("Final Scores:")
         for player_name, score in final_scores.items():
@@ -47,6 +50,7 @@ def render_main_ui(engine: GameEngine) -> None:
         engine.dice = []  # Clear dice so they're not shown
         engine.rolls_left = 2
         engine.first_roll = True
+        save_engine(engine)
         st.session_state.awaiting_turn = False
         st.session_state.dice_rolled = False
         st.rerun()
@@ -54,7 +58,8 @@ def render_main_ui(engine: GameEngine) -> None:
         # Show "Roll Dice" button for first roll
         if st.button("Roll Dice", type="primary"):
             # Actually roll the dice now
-            engine.dice = roll_dice()
+            engine.dice = engine.dice_source.roll()
+            save_engine(engine)
             st.session_state.dice_rolled = True
             st.rerun()
         else:
@@ -73,8 +78,14 @@ def render_main_ui(engine: GameEngine) -> None:
 def initialize_session_state() -> None:
     """Initialize the session state variables."""
     if "engine" not in st.session_state:
-        st.session_state.engine = None
-        st.session_state.awaiting_turn = True  # waiting to start the current player's turn
+        # resume a persisted game (restart or evicted session) when the URL carries its id
+        engine = load_engine()
+        st.session_state.engine = engine
+        st.session_state.awaiting_turn = engine is None or not engine.dice  # waiting to start the current player's turn
+        st.session_state.dice_rolled = engine is not None and bool(engine.dice)
+    elif st.session_state.get("game_id"):
+        # touch the store every rerun so active games stay hot in the LRU
+        st.session_state.engine = load_engine() or st.session_state.engine
 
     if "selected_dice" not in st.session_state:
         st.session_state.selected_dice = set()
@@ -92,7 +103,7 @@ def render_new_game_setup() -> None:
         submitted = st.form_submit_button("Start game")
         if submitted:
             players = [p1.strip() or "P1", p2.strip() or "P2"]
-            st.session_state.engine = GameEngine(players)
+            start_new_game(players)
             st.session_state.awaiting_turn = True
             st.session_state.dice_rolled = False
             st.rerun()
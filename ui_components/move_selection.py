@@ -3,10 +3,15 @@ Move selection component for Abaka game interface.
 Handles the move selection interface with radio buttons and execution.
 """
 
-import streamlit as st
+from ui_components._lazy import lazy_module
+from abaka.constants import DENOM, IS_SCHOOL
 from abaka.engine import GameEngine
 from abaka.models import Category
 from abaka.scoring import score_category
+from ui_components.hints import current_hints, move_caption
+from ui_components.session_store import save_engine
+
+st = lazy_module("streamlit")
 
 
 def render_move_selection(engine: GameEngine):
@@ -92,6 +97,9 @@ def render_move_selection(engine: GameEngine):
         </style>
         """, unsafe_allow_html=True)
         
+        # Expected-value annotations (None while the background thread works)
+        hints = current_hints(engine)
+
         # Create a 3x5 grid for move selection
         cols = st.columns(3)
         
@@ -113,6 +121,8 @@ def render_move_selection(engine: GameEngine):
                     if st.button(label, key=button_key, type="secondary"):
                         st.session_state.selected_move = label
                         st.rerun()
+                if engine.dice:
+                    st.caption(move_caption(hints, cat, action))
         
         # Action button with green color and larger font
         st.markdown('<div style="font-size: 1.5em;">Execute Move:</div>', unsafe_allow_html=True)
@@ -143,6 +153,7 @@ def render_move_selection(engine: GameEngine):
                         engine.record_score(cat, slot)
                     else:
                         engine.record_cross(cat, slot)
+                    save_engine(engine)
                     # Reset the selected move after successful execution
                     st.session_state.selected_move = None
                     st.session_state.awaiting_turn = True  # next player's turn
@@ -163,7 +174,7 @@ def _filter_available_categories(engine: GameEngine, available_categories: list,
     for cat in available_categories:
         if action == "Cross":
             # For crossing out, exclude school categories
-            if cat.name.startswith("SCHOOL_"):
+            if IS_SCHOOL[cat.index]:
                 continue
             filtered.append(cat)
         else:  # Score action
@@ -172,11 +183,10 @@ def _filter_available_categories(engine: GameEngine, available_categories: list,
                 filtered.append(cat)
             else:
                 # For scoring with dice, check if the category can actually be scored
-                if cat.name.startswith("SCHOOL_"):
+                if IS_SCHOOL[cat.index]:
                     # For school categories, check if the current dice can score in this category
                     try:
-                        # Extract the school number from category name (e.g., SCHOOL_1 -> 1)
-                        school_number = int(cat.name.split('_')[1])
+                        school_number = DENOM[cat.index]
                         # Check if any die shows this number
                         can_score = any(d.value == school_number for d in engine.dice)
                         if can_score:
@@ -187,7 +197,7 @@ def _filter_available_categories(engine: GameEngine, available_categories: list,
                 else:
                     # For non-school categories, only include if they would score > 0
                     try:
-                        score = score_category(engine.dice, cat, first_roll=engine.first_roll)
+                        score = score_category(engine.dice, cat, first_roll=engine.first_roll, rules=engine.rules)
                         if score > 0:
                             filtered.append(cat)
                     except:
@@ -205,8 +215,8 @@ def _get_available_rows(engine: GameEngine, player) -> list:
 
 def _get_descriptive_label(cat: Category) -> str:
     """Get a descriptive label for a category."""
-    if cat.name.startswith("SCHOOL_"):
-        return f"School {cat.name.split('_')[1]}"
+    if IS_SCHOOL[cat.index]:
+        return f"School {DENOM[cat.index]}"
     
     # Use a more robust lookup that handles enum values properly
     category_labels = {
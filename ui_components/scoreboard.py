@@ -3,9 +3,18 @@ Scoreboard component for Abaka game interface.
 Handles rendering of the game scoreboard with proper styling and layout.
 """
 
-import streamlit as st
+from typing import Optional, Sequence
+
+from ui_components._lazy import lazy_module
+from abaka.bonus import column_bonus_cells, row_cells
 from abaka.engine import GameEngine
 from abaka.models import Category
+from abaka.render import standings, visible_players
+
+st = lazy_module("streamlit")
+
+# Large tables show one page of players at a time plus a standings summary
+PAGE_SIZE = 6
 
 
 def render_scoreboard(engine: GameEngine) -> None:
@@ -15,9 +24,24 @@ def render_scoreboard(engine: GameEngine) -> None:
     # Custom CSS for the scoreboard table
     _render_scoreboard_css()
     
+    # Page through large tables instead of growing the table with every player
+    window = None
+    n = len(engine.players)
+    if n > PAGE_SIZE:
+        pages = (n + PAGE_SIZE - 1) // PAGE_SIZE
+        start = None  # page holding the current player
+        if not st.checkbox("Follow current player", value=True, key="scoreboard_follow"):
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="scoreboard_page")
+            start = (int(page) - 1) * PAGE_SIZE
+        window = visible_players(engine, PAGE_SIZE, start)
+        st.caption(f"Players {window.start + 1}–{window.stop} of {n}")
+    
     # Create and display the scoreboard
-    html_table = _build_scoreboard_html(engine)
+    html_table = _build_scoreboard_html(engine, window)
     st.markdown(html_table, unsafe_allow_html=True)
+    
+    if window is not None:
+        st.markdown(_build_standings_html(engine), unsafe_allow_html=True)
 
 
 def _render_scoreboard_css() -> None:
@@ -95,8 +119,10 @@ def _render_scoreboard_css() -> None:
     """, unsafe_allow_html=True)
 
 
-def _build_scoreboard_html(engine: GameEngine) -> str:
-    """Build the complete HTML table for the scoreboard."""
+def _build_scoreboard_html(engine: GameEngine, players: Optional[Sequence[int]] = None) -> str:
+    """Build the HTML table for the scoreboard (all players, or the given player indices)."""
+    if players is None:
+        players = range(len(engine.players))
     html_table = """
     <table class="scoreboard-table">
         <thead>
@@ -105,8 +131,9 @@ def _build_scoreboard_html(engine: GameEngine) -> str:
     """
     
     # Add player headers with 4 columns each (3 score + 1 bonus)
-    for i, player in enumerate(engine.players):
-        if player == engine.players[engine.current]:
+    for i in players:
+        player = engine.players[i]
+        if i == engine.current:
             html_table += f'<th colspan="4" class="current-player">→ {player.name} 🎯</th>'
         else:
             html_table += f'<th colspan="4">{player.name}</th>'
@@ -114,34 +141,34 @@ def _build_scoreboard_html(engine: GameEngine) -> str:
     html_table += "</tr><tr><th class='row-header'></th>"
     
     # Add sub-headers for score slots
-    for player in engine.players:
+    for _ in players:
         html_table += '<th>S1</th><th>S2</th><th>S3</th><th class="bonus-header">B</th>'
     
     html_table += "</tr></thead><tbody>"
     
     # Add school categories
-    html_table += _build_school_section(engine)
+    html_table += _build_school_section(engine, players)
     
     # Add combo categories
-    html_table += _build_combo_section(engine)
+    html_table += _build_combo_section(engine, players)
     
     # Add column bonuses
-    html_table += _build_bonus_section(engine)
+    html_table += _build_bonus_section(engine, players)
     
     # Add totals
-    html_table += _build_totals_section(engine)
+    html_table += _build_totals_section(engine, players)
     
     html_table += "</tbody></table>"
     return html_table
 
 
-def _build_school_section(engine: GameEngine) -> str:
+def _build_school_section(engine: GameEngine, players: Sequence[int]) -> str:
     """Build the school categories section of the scoreboard."""
     html = ""
     for i in range(1, 7):
         html += f"<tr><td class='row-header'>{i}</td>"
-        for player_idx, player in enumerate(engine.players):
-            slots = player.table[getattr(Category, f'SCHOOL_{i}')]
+        for col, player_idx in enumerate(players):
+            slots = row_cells(engine, player_idx, getattr(Category, f'SCHOOL_{i}'))
             # 3 score slots
             for j in range(3):
                 if slots[j] is None:
@@ -152,7 +179,7 @@ def _build_school_section(engine: GameEngine) -> str:
                     html += f'<td class="score-slot">{slots[j]}</td>'
             # 1 bonus slot with special styling
             bonus_class = "bonus-column"
-            if player_idx == 0:  # First player
+            if col == 0:  # First visible player
                 bonus_class += " player-separator"
             
             if slots[3] is None:
@@ -165,11 +192,11 @@ def _build_school_section(engine: GameEngine) -> str:
     return html
 
 
-def _build_combo_section(engine: GameEngine) -> str:
+def _build_combo_section(engine: GameEngine, players: Sequence[int]) -> str:
     """Build the combination categories section of the scoreboard."""
     html = ""
     # Section divider
-    html += '<tr><td colspan="' + str(len(engine.players) * 4 + 1) + '" class="section-divider"></td></tr>'
+    html += '<tr><td colspan="' + str(len(players) * 4 + 1) + '" class="section-divider"></td></tr>'
     
     combo_labels = ["D", "DD", "T", "LS", "BS", "F", "C", "A", "Σ"]
     combo_cats = [Category.PAIR, Category.TWO_PAIRS, Category.TRIPS, 
@@ -178,8 +205,8 @@ def _build_combo_section(engine: GameEngine) -> str:
     
     for i, (label, cat) in enumerate(zip(combo_labels, combo_cats)):
         html += f"<tr><td class='row-header'>{label}</td>"
-        for player_idx, player in enumerate(engine.players):
-            slots = player.table[cat]
+        for col, player_idx in enumerate(players):
+            slots = row_cells(engine, player_idx, cat)
             # 3 score slots
             for j in range(3):
                 if slots[j] is None:
@@ -190,7 +217,7 @@ def _build_combo_section(engine: GameEngine) -> str:
                     html += f'<td class="score-slot">{slots[j]}</td>'
             # 1 bonus slot with special styling
             bonus_class = "bonus-column"
-            if player_idx == 0:  # First player
+            if col == 0:  # First visible player
                 bonus_class += " player-separator"
             
             if slots[3] is None:
@@ -203,16 +230,16 @@ def _build_combo_section(engine: GameEngine) -> str:
     return html
 
 
-def _build_bonus_section(engine: GameEngine) -> str:
+def _build_bonus_section(engine: GameEngine, players: Sequence[int]) -> str:
     """Build the column bonuses section of the scoreboard."""
     html = ""
     # Section divider
-    html += '<tr><td colspan="' + str(len(engine.players) * 4 + 1) + '" class="section-divider"></td></tr>'
+    html += '<tr><td colspan="' + str(len(players) * 4 + 1) + '" class="section-divider"></td></tr>'
     
     # Column bonuses row (B)
     html += "<tr><td class='row-header'>B</td>"
-    for player_idx, player in enumerate(engine.players):
-        col_bonuses = player.column_bonus
+    for col, player_idx in enumerate(players):
+        col_bonuses = column_bonus_cells(engine, player_idx)
         # 3 column bonuses
         for bonus in col_bonuses:
             if bonus is None:
@@ -223,23 +250,38 @@ def _build_bonus_section(engine: GameEngine) -> str:
                 html += f'<td class="score-slot">{bonus}</td>'
         # 1 filler cell with special styling
         bonus_class = "bonus-column"
-        if player_idx == 0:  # First player
+        if col == 0:  # First visible player
             bonus_class += " player-separator"
         html += f'<td class="{bonus_class} empty-slot">—</td>'
     html += "</tr>"
     return html
 
 
-def _build_totals_section(engine: GameEngine) -> str:
+def _build_totals_section(engine: GameEngine, players: Sequence[int]) -> str:
     """Build the totals section of the scoreboard."""
     html = ""
     # Section divider
-    html += '<tr><td colspan="' + str(len(engine.players) * 4 + 1) + '" class="section-divider"></td></tr>'
+    html += '<tr><td colspan="' + str(len(players) * 4 + 1) + '" class="section-divider"></td></tr>'
     
     # Totals row
     html += "<tr><td class='row-header'>TOT</td>"
-    for player in engine.players:
-        total_score = player.calculate_score()
+    for player_idx in players:
+        total_score = engine.players[player_idx].calculate_score()
         html += f'<td colspan="4" class="score-slot"><strong>{total_score}</strong></td>'
     html += "</tr>"
     return html
+
+
+def _build_standings_html(engine: GameEngine, top: int = 10) -> str:
+    """Leaderboard of the whole table: the top places and the current player."""
+    table = standings(engine)
+    shown = table[:top]
+    if all(i != engine.current for i, _ in shown):
+        shown = shown + [next(t for t in table if t[0] == engine.current)]
+    ranks = {i: r for r, (i, _) in enumerate(table, 1)}
+    html = '<table class="scoreboard-table"><thead><tr><th>#</th><th>Player</th><th>Total</th></tr></thead><tbody>'
+    for i, total in shown:
+        cls = ' class="current-player"' if i == engine.current else ""
+        html += f"<tr><td{cls}>{ranks[i]}</td><td{cls}>{engine.players[i].name}</td><td{cls}>{total}</td></tr>"
+    html += "</tbody></table>"
+    return html
@@ -0,0 +1,69 @@
+"""
+Session persistence for the Abaka UI.
+Keeps live games in an LRU store backed by SQLite so a server restart or an
+evicted idle session resumes from the `?game=<id>` query parameter.
+"""
+
+import os
+import uuid
+
+from ui_components._lazy import lazy_module
+from abaka.engine import GameEngine
+from abaka.results import open_default
+from abaka.store import LRUSessionStore, SQLiteBacking
+
+st = lazy_module("streamlit")
+
+_STORE = None
+_RESULTS = None
+
+
+def get_session_store() -> LRUSessionStore:
+    """Process-wide store shared by all Streamlit sessions."""
+    global _STORE
+    if _STORE is None:
+        path = os.environ.get("ABAKA_SESSION_DB", ".abaka_sessions.sqlite3")
+        capacity = int(os.environ.get("ABAKA_SESSION_CAPACITY", "256"))
+        _STORE = LRUSessionStore(capacity=capacity, backing=SQLiteBacking(path))
+    return _STORE
+
+
+def load_engine():
+    """Return the engine for this browser session's game id, restoring it if evicted."""
+    game_id = st.session_state.get("game_id") or st.query_params.get("game")
+    if not game_id:
+        return None
+    st.session_state.game_id = game_id
+    return get_session_store().get(game_id)
+
+
+def save_engine(engine: GameEngine) -> None:
+    """Persist the current engine after a mutation."""
+    game_id = st.session_state.get("game_id")
+    if game_id and engine is not None:
+        get_session_store().put(game_id, engine)
+
+
+def start_new_game(players: list) -> GameEngine:
+    """Create a game under a fresh id and expose the id in the URL for resuming."""
+    engine = GameEngine(players)
+    game_id = uuid.uuid4().hex
+    st.session_state.game_id = game_id
+    st.query_params["game"] = game_id
+    st.session_state.engine = engine
+    get_session_store().put(game_id, engine)
+    return engine
+
+
+def record_result(engine: GameEngine) -> None:
+    """Record a finished game in the results database ($ABAKA_RESULTS), once per game id."""
+    global _RESULTS
+    game_id = st.session_state.get("game_id")
+    if st.session_state.get("recorded_game") == game_id:
+        return
+    if _RESULTS is None:
+        _RESULTS = open_default()
+        if _RESULTS is None:
+            return
+    _RESULTS.record(engine, source="ui")
+    st.session_state.recorded_game = game_id
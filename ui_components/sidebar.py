@@ -3,8 +3,10 @@ Sidebar component for Abaka game interface.
 Handles new game functionality and sidebar styling.
 """
 
-import streamlit as st
-from abaka.engine import GameEngine
+from ui_components._lazy import lazy_module
+from ui_components.session_store import start_new_game
+
+st = lazy_module("streamlit")
 
 
 def render_sidebar() -> None:
@@ -29,7 +31,10 @@ def render_sidebar() -> None:
         
         if st.button("Start new game"):
             players = [n.strip() for n in names.split(",") if n.strip()] or ["P1", "P2"]
-            st.session_state.engine = GameEngine(players)
+            start_new_game(players)
             st.session_state.awaiting_turn = True
             st.session_state.dice_rolled = False
             st.rerun()
+
+        st.header("Hints")
+        st.checkbox("Show expected values", value=True, key="show_hints")